@@ -1,13 +1,18 @@
 import streamlit as st
 import os
-import pandas as pd
 import polars as pl
 import tiktoken
-import re
+import asyncio
+import numpy as np
 
-from quake_talk.search import semantic_search
-from quake_talk.gpt    import ask, summarize_with_gpt4o
+from quake_talk.search import semantic_search, hybrid_search, embed_questions, registry
+from quake_talk.gpt    import astream_ask, astream_summary_map_reduce
 from quake_talk.preprocessing.clean_text import extract_sentences, extract_keywords
+from quake_talk.keyword_index import KeywordIndex, keyword_filter
+from quake_talk.context import build_context, chunk_by_tokens, spread, truncate_by_tokens
+from quake_talk.corpus import CorpusStore, Window
+from quake_talk.aggregates import DailyAggregates
+from quake_talk import tracing
 
 # ── Page config: wide mode & favicon ─────────────────────────────────
 st.set_page_config(
@@ -18,11 +23,11 @@ st.set_page_config(
 )
 
 # ── Load data & models ───────────────────────────────────────────────
-@st.cache_data
-def load_data() -> pd.DataFrame:
-    df = pl.read_parquet("artifacts/tweets_cleaned.parquet").to_pandas()
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    return df
+def load_data(corpus: str) -> CorpusStore:
+    # one shared, column-pruned Arrow store per corpus for every session; the
+    # registry caches it process-wide (within SEARCH_MEMORY_MB) and reloads
+    # when ingest.py rewrites the Parquet
+    return registry.store(corpus)
 
 @st.cache_resource
 def get_token_encoder(model_name: str):
@@ -31,8 +36,18 @@ def get_token_encoder(model_name: str):
     except Exception:
         return tiktoken.get_encoding("cl100k_base")
 
-df      = load_data()
-encoder = get_token_encoder(os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+def get_keyword_index(corpus: str, store: CorpusStore) -> KeywordIndex | None:
+    """Prebuilt inverted index (held by the registry), if built from this Parquet."""
+    index = registry.keyword_index(corpus)
+    return index if index is not None and index.built_from(store) else None
+
+# several corpora (CORPORA_FILE) → pick one
+corpora  = registry.names()
+corpus   = st.sidebar.selectbox("Corpus", corpora) if len(corpora) > 1 else corpora[0]
+store    = load_data(corpus)
+tracing.serve_metrics()   # GET /metrics on TRACE_METRICS_PORT, once per process
+encoder  = get_token_encoder(os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+kw_index = get_keyword_index(corpus, store)
 
 # ── Header: title and byline ────────────────────────────────────────────
 col_left, col_right = st.columns([3, 1])
@@ -86,20 +101,45 @@ st.markdown(
 st.divider()
 
 # ── Helpers ────────────────────────────────────────────────────────────
-def truncate_by_tokens(text: str, max_tokens: int, enc) -> str:
-    toks = enc.encode(text)
-    return enc.decode(toks[-max_tokens:]) if len(toks) > max_tokens else text
+async def render_streams(streams) -> None:
+    """Drain (placeholder, token stream) pairs concurrently, re-rendering on each delta."""
+    async def pump(placeholder, stream):
+        text = ""
+        async for delta in stream:
+            text += delta
+            placeholder.markdown(text + "▌")
+        placeholder.markdown(text)
+    await asyncio.gather(*(pump(ph, stream) for ph, stream in streams))
+
+def render_overview(aggs: DailyAggregates, question: str, start, end) -> str:
+    """Show range statistics from the daily aggregates; returns the GPT context."""
+    with tracing.span("overview"):
+        stats = aggs.stats(start, end)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Tweets", f"{stats['tweets']:,}")
+    c2.metric("Distinct per day (summed)", f"{stats['unique']:,}")
+    c3.metric("Days", stats["days"])
+    st.bar_chart(stats["per_day"], x="day", y="n_tweets")
+    with st.expander("🏷️ Top terms", expanded=False):
+        st.dataframe(
+            pl.DataFrame(stats["top_terms"], schema=["term", "count"], orient="row"),
+            use_container_width=True,
+        )
 
-def keyword_filter(df: pd.DataFrame, keywords: list[str]) -> pd.DataFrame:
-    if not keywords:
-        return df
-    pattern = r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")\b"
-    return df[df["content_clean"].str.contains(pattern, case=False, regex=True)]
+    # days closest to the question (centroid similarity) get the context room
+    query = None
+    if question and stats["centroid"] is not None:
+        with tracing.span("embed_question"):
+            query = embed_questions([question], corpus=corpus)[0]
+    return aggs.context(start, end, query=query)
 
 # ── Sidebar controls ─────────────────────────────────────────────────
 st.sidebar.header("Filters & Options")
-min_d = df["date"].dt.date.min()
-max_d = df["date"].dt.date.max()
+try:
+    min_d, max_d = store.min_date, store.max_date
+except ValueError as e:
+    st.error(f"❗ {e}: check the date column of the cleaned Parquet.")
+    st.stop()
 raw_dates = st.sidebar.date_input(
     "Date range", value=(min_d, max_d), min_value=min_d, max_value=max_d
 )
@@ -109,10 +149,11 @@ else:
     start_date = end_date = raw_dates
 
 max_sents = st.sidebar.slider("Max sentences", 50, 1000, 300, 50)
-filter_method    = st.sidebar.selectbox("Filtering method", ["Semantic", "Keyword"])
+filter_method    = st.sidebar.selectbox("Filtering method", ["Semantic", "Hybrid", "Keyword", "Overview"])
 show_context     = st.sidebar.checkbox("Show context", value=False)
 generate_summary = st.sidebar.checkbox("Generate summary", value=False)
 temperature      = st.sidebar.slider("GPT Temperature", 0.0, 1.0, 0.4, 0.01)
+show_timings     = tracing.ENABLED and st.sidebar.checkbox("Show timings", value=False)
 max_context_tokens = st.sidebar.slider(
     "Max context tokens",
     min_value=100,
@@ -128,52 +169,129 @@ run = st.button("🔍 Ask GPT-4o")
 if not run:
     st.info("Enter a question above and click “🔍 Ask GPT-4o” to begin.")
 else:
-    # 1) date filter
-    mask   = (df["date"].dt.date >= start_date) & (df["date"].dt.date <= end_date)
-    subset = df.loc[mask]
-
-    if subset.empty:
-        st.warning("No tweets in that date range.")
-    else:
-        # 2) content filter
-        if filter_method == "Semantic":
-            candidate_k = max_sents * 2
-            idxs, dists = semantic_search(question, top_k=candidate_k)
-            valid = [i for i in idxs if mask.iat[i]]
-            if not valid:
-                st.warning("No semantically-relevant tweets in that date range.")
-                subset = subset.iloc[0:0]
+    with tracing.trace() as trace, tracing.span("query"):
+        # 1) date filter: binary search on the day ordinal → row-ID window
+        with tracing.span("date_window"):
+            window = store.date_window(start_date, end_date)
+
+        if filter_method == "Overview":
+            # answered from the per-day aggregates; no tweet is read
+            aggs = registry.aggregates(corpus)
+            if aggs is None:
+                st.warning("No daily aggregates yet; run scripts/build_daily_aggregates.py.")
+            elif not len(aggs.days(start_date, end_date)):
+                st.warning("No tweets in that date range.")
             else:
-                subset = df.iloc[valid[:max_sents]]
+                ctx = truncate_by_tokens(
+                    render_overview(aggs, question, start_date, end_date), max_context_tokens, encoder
+                )
+                if show_context:
+                    with st.expander("🔍 Context", expanded=False):
+                        st.write(ctx)
+                if generate_summary:
+                    with st.expander("📝 Daily summaries", expanded=False):
+                        for row in aggs.days(start_date, end_date).filter(pl.col("summary").is_not_null()).iter_rows(named=True):
+                            st.markdown(f"**{row['day']}** – {row['summary']}")
+                with st.expander("💬 Answer", expanded=True), st.spinner("Querying GPT-4o…"), tracing.span("gpt"):
+                    asyncio.run(render_streams([(st.empty(), astream_ask(question, ctx, temperature=temperature))]))
+        elif store.window_size(window) == 0:
+            st.warning("No tweets in that date range.")
         else:
-            kw     = extract_keywords(question)
-            subset = keyword_filter(subset, kw)
+            # 2) content filter
+            if filter_method == "Semantic":
+                # push the date window into FAISS as an ID range / ID set
+                with tracing.span("semantic_search"):
+                    idxs, dists = semantic_search(question, top_k=max_sents, corpus=corpus, **store.id_filter(window))
+                if not idxs:
+                    st.warning("No semantically-relevant tweets in that date range.")
+                # only representatives are indexed; one hit per duplicate cluster
+                idxs = store.collapse(idxs, "cluster_id")
+            elif filter_method == "Hybrid":
+                # vector + BM25 in parallel, rank-fused, same date window
+                with tracing.span("hybrid_search"):
+                    idxs, _ = hybrid_search(question, top_k=max_sents, corpus=corpus, **store.id_filter(window))
+                if not idxs:
+                    st.warning("No relevant tweets in that date range.")
+                idxs = store.collapse(idxs, "cluster_id")
+            else:
+                with tracing.span("keyword_filter"):
+                    kw   = extract_keywords(question)
+                    idxs = store.collapse(keyword_filter(store, window, kw, kw_index), "rep_id")
+                # most-shared tweets first, so the context budget goes to them
+                idxs = idxs[np.argsort(-store.weights(idxs).astype(np.int64), kind="stable")]
+            subset = store.take(idxs)
 
-        if subset.empty:
-            st.warning("No tweets matched your filter.")
-        else:
-            # 3) show filtered tweets
-            with st.expander("📋 Show filtered tweets", expanded=False):
-                st.dataframe(subset, use_container_width=True)
-
-            # 4) build & show context
-            texts   = subset["content_clean"].tolist()
-            raw_ctx = " ".join(extract_sentences(texts, max_sents))
-            ctx     = truncate_by_tokens(raw_ctx, max_context_tokens, encoder)
-
-            if show_context:
-                with st.expander("🔍 Context", expanded=False):
-                    st.write(raw_ctx)
-
-            # 5) summary
-            if generate_summary:
-                with st.expander("📝 Summary", expanded=False):
-                    with st.spinner("Summarizing…"):
-                        summ = summarize_with_gpt4o(ctx)
-                    st.write(summ)
-
-            # 6) final answer
-            with st.spinner("Querying GPT-4o…"):
-                answer = ask(question, ctx, temperature=temperature)
-            with st.expander("💬 Answer", expanded=True):
-                st.write(answer)
\ No newline at end of file
+            if subset.is_empty():
+                st.warning("No tweets matched your filter.")
+            else:
+                # 3) show filtered tweets
+                with st.expander("📋 Show filtered tweets", expanded=False):
+                    st.dataframe(subset, use_container_width=True)
+
+                # 4) build & show context
+                if "sent_tokens" in subset.columns:
+                    # precomputed boundaries/counts: stop at the budget
+                    with tracing.span("build_context"):
+                        rows    = subset.select("content_clean", "sent_ends", "sent_tokens").iter_rows()
+                        raw_ctx = ctx = build_context(rows, max_sents, max_context_tokens, encoder)
+                else:
+                    texts   = subset["content_clean"].to_list()
+                    with tracing.span("extract_sentences"):
+                        raw_ctx = " ".join(extract_sentences(texts, max_sents))
+                    with tracing.span("truncate_by_tokens"):
+                        ctx     = truncate_by_tokens(raw_ctx, max_context_tokens, encoder)
+
+                if show_context:
+                    with st.expander("🔍 Context", expanded=False):
+                        st.write(raw_ctx)
+
+                # 5–6) summary & answer: both requests start at once and
+                #      tokens stream into their expanders as they arrive
+                streams = []
+                if generate_summary:
+                    # map-reduce over every filtered tweet, not just the context
+                    texts  = subset["content_clean"].to_list()
+                    counts = (
+                        subset["n_tokens"].to_list() if "n_tokens" in subset.columns
+                        else [len(toks) for toks in encoder.encode_ordinary_batch(texts)]
+                    )
+                    chunks = chunk_by_tokens(texts, counts, int(os.getenv("SUMMARY_CHUNK_TOKENS", 3000)))
+                    n_all  = len(chunks)
+                    chunks = spread(chunks, int(os.getenv("SUMMARY_MAX_CHUNKS") or 0))   # optional API-cost cap
+                    with st.expander(f"📝 Summary ({len(chunks)} of {n_all} batches of tweets)", expanded=False):
+                        if len(chunks) < n_all:
+                            st.warning(
+                                f"SUMMARY_MAX_CHUNKS={len(chunks)}: {n_all - len(chunks)} of {n_all} batches "
+                                f"(~{len(texts) * (n_all - len(chunks)) // n_all:,} tweets) were left out, "
+                                "sampled evenly across the date range."
+                            )
+                        streams.append((st.empty(), astream_summary_map_reduce(chunks)))
+                with st.expander("💬 Answer", expanded=True):
+                    streams.append((st.empty(), astream_ask(question, ctx, temperature=temperature)))
+
+                with st.spinner("Querying GPT-4o…"), tracing.span("gpt"):
+                    asyncio.run(render_streams(streams))
+
+    # 7) timings: this question's stages + rolling percentiles
+    tracing.dump_metrics()
+    if show_timings:
+        with st.sidebar.expander("⏱️ Timings", expanded=True):
+            st.caption(
+                f"This question: {trace.tokens['prompt']} prompt / "
+                f"{trace.tokens['completion']} completion tokens"
+            )
+            st.dataframe(
+                pl.DataFrame(
+                    {"stage": list(trace.totals()), "ms": [v * 1e3 for v in trace.totals().values()]},
+                    schema={"stage": pl.Utf8, "ms": pl.Float64},
+                ),
+                use_container_width=True,
+            )
+            st.caption("Rolling percentiles (ms)")
+            st.dataframe(
+                pl.DataFrame(
+                    [{"stage": name, **{k: v * 1e3 for k, v in s.items() if k.startswith("p")}, "n": s["count"]}
+                     for name, s in tracing.snapshot().items()]
+                ),
+                use_container_width=True,
+            )
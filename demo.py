@@ -1,13 +1,11 @@
 # demo.py
 import gradio as gr
-from quake_talk.search import semantic_search
+from quake_talk.search import semantic_search, registry
 from quake_talk.gpt    import ask
-import polars as pl
 
 def chat_fn(question, temp):
     idxs, _ = semantic_search(question, top_k=5)
-    df = pl.read_parquet("artifacts/tweets_cleaned.parquet")
-    context = "\n".join(df["content_clean"].take(idxs).to_list())
+    context = "\n".join(registry.store().texts(idxs))
     return ask(question, context, temperature=temp)
 
 demo = gr.Interface(
@@ -6,21 +6,36 @@ Quake_Talk package
 
 Provides:
   - clean_tweet       (text cleaning)
+  - clean_tweets      (batch text cleaning)
   - semantic_search   (FAISS-powered similarity search)
+  - semantic_search_many (batched multi-question search)
+  - hybrid_search     (vector + BM25 with rank fusion)
   - ask               (GPT query wrapper)
+
+Submodules are imported on first attribute access, so `import quake_talk`
+does not load spaCy, NLTK, FAISS, sentence-transformers or OpenAI.
 """
 
+import importlib
+
 __version__ = "0.1.0"
 
-# Core cleaning utility
-from .preprocessing.clean_text import clean_tweet
+_EXPORTS = {
+    # Core cleaning utility
+    "clean_tweet":     ".preprocessing.clean_text",
+    "clean_tweets":    ".preprocessing.clean_text",
+    # Phase 2 modules
+    "semantic_search": ".search",
+    "semantic_search_many": ".search",
+    "hybrid_search":   ".search",
+    "ask":             ".gpt",
+}
 
-# Phase 2 modules
-from .search import semantic_search
-from .gpt    import ask
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    "clean_tweet",
-    "semantic_search",
-    "ask",
-]
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
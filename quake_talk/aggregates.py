@@ -0,0 +1,209 @@
+# quake_talk/aggregates.py
+
+"""
+Per-day aggregates of the cleaned corpus, materialized by
+scripts/build_daily_aggregates.py into one small Parquet (one row per day):
+
+  - day          date
+  - n_tweets     u32         – rows dated that day
+  - n_unique     u32         – distinct duplicate clusters (distinct texts
+                               before dedup_dataset.py has run)
+  - n_tokens     u64         – sum of per-tweet token counts (0 if unknown)
+  - terms        list[str]   – the day's AGG_TOP_TERMS most frequent terms
+  - term_counts  list[u32]   – their counts
+  - emb_sum      list[f32]   – sum of the day's tweet embeddings (null
+                               without EMBEDDING_FILE)
+  - summary      str         – optional cached GPT summary of the day
+
+Date-range statistics are sums over these rows (a few dozen), so the
+Overview mode never reads the tweets. Merged term counts only see each
+day's top terms, i.e. they are lower bounds for terms that miss a day's
+cut.
+"""
+
+import os
+import datetime as dt
+
+import numpy as np
+import polars as pl
+
+from .keyword_index import TOKEN_RE
+
+AGGREGATES_FILE = os.getenv("DAILY_AGGREGATES_FILE", "artifacts/daily_aggregates.parquet")
+TOP_TERMS       = int(os.getenv("AGG_TOP_TERMS", 50))
+MIN_TERM_LEN    = 3
+EMB_BLOCK       = 65_536   # embedding rows summed per step
+
+
+def day_expr(dtype: pl.DataType) -> pl.Expr:
+    """`date` (string or datetime column of `dtype`) as a calendar `day`."""
+    date = pl.col("date")
+    if dtype == pl.Utf8:
+        date = date.str.to_datetime(strict=False)
+    return date.dt.date().alias("day")
+
+def build_daily_aggregates(
+    df: pl.DataFrame,
+    embeddings: np.ndarray | None = None,
+    top_terms: int = TOP_TERMS,
+) -> pl.DataFrame:
+    """
+    Aggregate a cleaned corpus (`date`, `content_clean`, optionally
+    `cluster_id` / `n_tokens`) per day. `embeddings` (e.g. a memory-mapped
+    EMBEDDING_FILE) are row-aligned with `df`; rows without a date are
+    skipped.
+    """
+    base = df.with_columns(day_expr(df["date"].dtype)).with_row_index("_row").filter(pl.col("day").is_not_null())
+
+    distinct = "cluster_id" if "cluster_id" in df.columns else "content_clean"
+    counts = base.group_by("day").agg(
+        pl.len().cast(pl.UInt32).alias("n_tweets"),
+        pl.col(distinct).n_unique().cast(pl.UInt32).alias("n_unique"),
+        (pl.col("n_tokens").sum() if "n_tokens" in df.columns else pl.lit(0)).cast(pl.UInt64).alias("n_tokens"),
+    )
+
+    terms = (
+        base.select("day", pl.col("content_clean").str.to_lowercase().str.extract_all(TOKEN_RE).alias("term"))
+            .explode("term")
+            .filter(pl.col("term").str.len_chars() >= MIN_TERM_LEN, ~pl.col("term").str.contains(r"^\d+$"))
+            .group_by("day", "term").len("count")
+            .sort(["day", "count", "term"], descending=[False, True, False])
+            .group_by("day", maintain_order=True)
+            .agg(pl.col("term").head(top_terms).alias("terms"), pl.col("count").head(top_terms).cast(pl.UInt32).alias("term_counts"))
+    )
+
+    out = counts.join(terms, on="day", how="left", coalesce=True).sort("day")
+    emb = None
+    if embeddings is not None:
+        emb = _embedding_sums(base["day"].to_physical().to_numpy(), base["_row"].to_numpy(), embeddings)
+    return out.with_columns(
+        pl.Series("emb_sum", list(emb) if emb is not None else [None] * out.height, dtype=pl.List(pl.Float32)),
+        pl.lit(None, dtype=pl.Utf8).alias("summary"),
+    )
+
+def _embedding_sums(day: np.ndarray, rows: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+    """(n_days, dim) float32 sums of `embeddings[rows]` per day, in day order."""
+    order = np.argsort(day, kind="stable")
+    day, rows = day[order], rows[order]
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    code   = np.cumsum(np.r_[False, day[1:] != day[:-1]])
+    sums   = np.zeros((len(starts), embeddings.shape[1]), dtype=np.float64)
+
+    for lo in range(0, len(rows), EMB_BLOCK):
+        hi    = min(lo + EMB_BLOCK, len(rows))
+        block = rows[lo:hi]
+        # date-sorted corpora: each block is a plain slice of the (mmapped) file
+        if np.all(np.diff(block) == 1):
+            vecs = np.asarray(embeddings[block[0]:block[-1] + 1], dtype=np.float64)
+        else:
+            vecs = np.asarray(embeddings[block], dtype=np.float64)
+        c     = code[lo:hi]
+        first = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+        sums[c[first]] += np.add.reduceat(vecs, first, axis=0)
+    return sums.astype(np.float32)
+
+def carry_summaries(new: pl.DataFrame, old: pl.DataFrame) -> pl.DataFrame:
+    """Reuse `old` summaries for days whose tweet count did not change."""
+    keep = old.filter(pl.col("summary").is_not_null()).select("day", "n_tweets", pl.col("summary").alias("_old"))
+    return (
+        new.join(keep, on=["day", "n_tweets"], how="left", coalesce=True)
+           .with_columns(pl.coalesce("summary", "_old").alias("summary"))
+           .drop("_old")
+    )
+
+
+class DailyAggregates:
+    def __init__(self, frame: pl.DataFrame):
+        self.frame = frame
+        self._day  = frame["day"].to_physical().to_numpy()
+
+    @classmethod
+    def load(cls, path: str = AGGREGATES_FILE) -> "DailyAggregates":
+        return cls(pl.read_parquet(path).sort("day"))
+
+    def __len__(self) -> int:
+        return self.frame.height
+
+    @property
+    def min_date(self) -> dt.date:
+        return self.frame["day"][0]
+
+    @property
+    def max_date(self) -> dt.date:
+        return self.frame["day"][-1]
+
+    def days(self, start: dt.date, end: dt.date) -> pl.DataFrame:
+        """Aggregate rows for [start, end] (inclusive); a zero-copy slice."""
+        lo = np.searchsorted(self._day, (start - dt.date(1970, 1, 1)).days, side="left")
+        hi = np.searchsorted(self._day, (end - dt.date(1970, 1, 1)).days, side="right")
+        return self.frame.slice(int(lo), int(hi - lo))
+
+    def stats(self, start: dt.date, end: dt.date, top_terms: int = 20) -> dict:
+        """
+        Totals, top terms and (unit-length) embedding centroid of the range,
+        summed from the per-day rows.
+        """
+        days = self.days(start, end)
+        top  = (
+            days.select(pl.col("terms").explode().alias("term"), pl.col("term_counts").explode().alias("count"))
+                .drop_nulls("term")
+                .group_by("term").agg(pl.col("count").sum())
+                .sort(["count", "term"], descending=[True, False])
+                .head(top_terms)
+        )
+        centroid = None
+        sums = days.filter(pl.col("emb_sum").is_not_null())
+        if sums.height:
+            c = np.asarray(sums["emb_sum"].to_list(), dtype=np.float64).sum(axis=0)
+            centroid = (c / max(np.linalg.norm(c), 1e-12)).astype(np.float32)
+        return {
+            "days": days.height,
+            "tweets": int(days["n_tweets"].sum() or 0),
+            "unique": int(days["n_unique"].sum() or 0),      # distinct per day, summed
+            "tokens": int(days["n_tokens"].sum() or 0),
+            "per_day": days.select("day", "n_tweets"),
+            "top_terms": list(zip(top["term"].to_list(), top["count"].to_list())),
+            "centroid": centroid,
+        }
+
+    def relevance(self, days: pl.DataFrame, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of `query` to each day's centroid (0 without embeddings)."""
+        out = np.zeros(days.height, dtype=np.float32)
+        has = days["emb_sum"].is_not_null().to_numpy()
+        if has.any():
+            sums = np.asarray(days["emb_sum"].filter(pl.Series(has)).to_list(), dtype=np.float32)
+            sums /= np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+            out[has] = sums @ (query / max(np.linalg.norm(query), 1e-12))
+        return out
+
+    def context(
+        self,
+        start: dt.date,
+        end: dt.date,
+        query: np.ndarray | None = None,
+        max_days: int = int(os.getenv("AGG_CONTEXT_DAYS", 14)),
+        terms_per_day: int = 10,
+    ) -> str:
+        """
+        Compact GPT context for an overview question: range totals and top
+        terms, then one line per day (its top terms and cached summary) for
+        at most `max_days` days – the ones closest to `query` when given,
+        otherwise the busiest – listed in date order.
+        """
+        stats = self.stats(start, end)
+        days  = self.days(start, end)
+        score = self.relevance(days, query) if query is not None else days["n_tweets"].to_numpy()
+        pick  = np.sort(np.argsort(-score, kind="stable")[:max_days])
+
+        lines = [
+            f"Daily aggregates of {stats['tweets']:,} tweets ({stats['unique']:,} distinct per day, summed) "
+            f"from {start} to {end}, not the tweets themselves.",
+            "Most frequent terms: " + ", ".join(f"{t} ({c:,})" for t, c in stats["top_terms"]),
+        ]
+        for row in days[pl.Series(pick, dtype=pl.UInt32)].iter_rows(named=True):
+            line = f"{row['day']} – {row['n_tweets']:,} tweets; terms: " + ", ".join((row["terms"] or [])[:terms_per_day])
+            if row["summary"]:
+                line += f"\nSummary: {row['summary']}"
+            lines.append(line)
+        return "\n".join(lines)
+
@@ -0,0 +1,147 @@
+# quake_talk/bm25.py
+
+"""
+Sparse BM25 index over `content_clean`, stored as CSR arrays in one .npz:
+  - terms    uint8    – "\\n"-joined UTF-8 vocabulary, sorted
+  - indptr   int64    – row t of the term × doc matrix is [indptr[t], indptr[t+1])
+  - doc_ids  int32    – sorted row IDs (Parquet row order = FAISS IDs)
+  - weights  float32  – precomputed BM25 term-document scores
+  - n_docs   int64    – rows of the Parquet the index was built from
+
+Scores are precomputed at build time, so a query is a gather of a few
+posting slices plus one bincount.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import polars as pl
+
+from .keyword_index import TOKEN_RE
+
+
+class BM25Index:
+    def __init__(
+        self,
+        terms: list[str],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        weights: np.ndarray,
+        n_docs: int,
+    ):
+        self.terms   = terms
+        self.indptr  = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.n_docs  = n_docs
+        self._term_ids = {t: i for i, t in enumerate(terms)}
+
+    @classmethod
+    def build(
+        cls,
+        texts: pl.Series,
+        ids: np.ndarray | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        """
+        Index `texts` (row IDs = positions), or only the rows in `ids`
+        (e.g. dedup representatives) while keeping row IDs global.
+        """
+        df = pl.DataFrame({"text": texts.fill_null("")}).with_row_index("id")
+        if ids is not None:
+            df = df.filter(pl.col("id").is_in(pl.Series(ids, dtype=pl.UInt32)))
+        tokens = df.select(
+            pl.col("id").cast(pl.Int32),
+            pl.col("text").str.to_lowercase().str.extract_all(TOKEN_RE).alias("term"),
+        )
+        doc_len = tokens.select("id", pl.col("term").list.len().alias("dl"))
+        avgdl   = max(float(doc_len["dl"].mean() or 0.0), 1e-9)
+        n       = df.height
+
+        tf = (
+            tokens.explode("term")
+                  .drop_nulls("term")
+                  .group_by("term", "id").len("tf")
+                  .join(doc_len, on="id")
+                  .with_columns(pl.len().over("term").alias("df"))
+                  .sort(["term", "id"])
+        )
+        idf = ((n - pl.col("df") + 0.5) / (pl.col("df") + 0.5) + 1).log()
+        tf  = tf.with_columns(
+            (idf * pl.col("tf") * (k1 + 1)
+             / (pl.col("tf") + k1 * (1 - b + b * pl.col("dl") / avgdl))).cast(pl.Float32).alias("w")
+        )
+
+        counts = tf.group_by("term", maintain_order=True).len()
+        indptr = np.zeros(counts.height + 1, dtype=np.int64)
+        np.cumsum(counts["len"].to_numpy(), out=indptr[1:])
+        return cls(
+            counts["term"].to_list(),
+            indptr,
+            tf["id"].to_numpy().astype(np.int32),
+            tf["w"].to_numpy(),
+            len(texts),
+        )
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            terms=np.frombuffer("\n".join(self.terms).encode("utf-8"), dtype=np.uint8),
+            indptr=self.indptr,
+            doc_ids=self.doc_ids,
+            weights=self.weights,
+            n_docs=np.int64(self.n_docs),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path) as z:
+            blob = z["terms"].tobytes().decode("utf-8")
+            return cls(
+                blob.split("\n") if blob else [],
+                z["indptr"],
+                z["doc_ids"],
+                z["weights"],
+                int(z["n_docs"]),
+            )
+
+    def search(
+        self,
+        terms: Sequence[str],
+        k: int = 10,
+        id_range: tuple[int, int] | None = None,
+        ids: Sequence[int] | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-`k` (row IDs, BM25 scores) for the query `terms`, optionally
+        restricted to a half-open `id_range` or a sorted set of `ids`.
+        """
+        rows = [self._term_ids[t] for t in {t.lower() for t in terms} if t.lower() in self._term_ids]
+        if not rows:
+            return self.doc_ids[:0].astype(np.int64), self.weights[:0]
+        docs = np.concatenate([self.doc_ids[self.indptr[t]:self.indptr[t + 1]] for t in rows])
+        w    = np.concatenate([self.weights[self.indptr[t]:self.indptr[t + 1]] for t in rows])
+
+        if id_range is not None:
+            keep = (docs >= id_range[0]) & (docs < id_range[1])
+            docs, w = docs[keep], w[keep]
+        elif ids is not None:
+            allowed = np.asarray(ids, dtype=np.int64)
+            pos  = np.searchsorted(allowed, docs).clip(max=len(allowed) - 1)
+            keep = allowed[pos] == docs if len(allowed) else np.zeros(len(docs), dtype=bool)
+            docs, w = docs[keep], w[keep]
+
+        uniq, inv = np.unique(docs, return_inverse=True)
+        scores    = np.bincount(inv, weights=w).astype(np.float32)
+        if len(uniq) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(uniq))
+        top = top[np.lexsort((uniq[top], -scores[top]))]   # score desc, then row ID
+        return uniq[top].astype(np.int64), scores[top]
+
+
+def tokenize(text: str) -> list[str]:
+    """Query terms, split the same way documents were."""
+    return pl.Series([text]).str.to_lowercase().str.extract_all(TOKEN_RE)[0].to_list() or []
@@ -0,0 +1,117 @@
+# quake_talk/context.py
+
+"""
+Token-budgeted GPT context assembly.
+
+The cleaning pipeline stores, per tweet, where each sentence of
+`content_clean` ends (`sent_ends`) and how many tokens it costs
+(`sent_tokens`). build_context() then walks tweets in rank order and stops
+as soon as the sentence or token budget is reached, so its cost depends
+on the budget rather than on how many tweets matched.
+"""
+
+import os
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+from .preprocessing.clean_text import sentence_ends
+
+if TYPE_CHECKING:
+    import polars as pl
+
+TOKEN_ENCODING = os.getenv("TOKEN_ENCODING", "cl100k_base")
+
+
+def annotate_budget(df: "pl.DataFrame", encoding: str = TOKEN_ENCODING) -> "pl.DataFrame":
+    """
+    Add `sent_ends` (list[u32] char offsets), `sent_tokens` (list[u32]) and
+    `n_tokens` (u32) columns computed from `content_clean`.
+    """
+    import polars as pl
+    import tiktoken
+
+    enc   = tiktoken.get_encoding(encoding)
+    texts = df["content_clean"].fill_null("").to_list()
+
+    ends  = [sentence_ends(t) for t in texts]
+    sents = [t[s:e].strip() for t, es in zip(texts, ends) for s, e in zip([0] + es[:-1], es)]
+    lens  = iter(len(toks) for toks in enc.encode_ordinary_batch(sents))
+    toks  = [[next(lens) for _ in es] for es in ends]
+
+    return df.with_columns(
+        pl.Series("sent_ends",   ends, dtype=pl.List(pl.UInt32)),
+        pl.Series("sent_tokens", toks, dtype=pl.List(pl.UInt32)),
+        pl.Series("n_tokens",    [sum(t) for t in toks], dtype=pl.UInt32),
+    )
+
+
+def build_context(
+    rows: Iterable[tuple[str, Sequence[int], Sequence[int]]],
+    max_sents: int,
+    max_tokens: int,
+    enc=None,
+) -> str:
+    """
+    Join sentences from ranked `(content_clean, sent_ends, sent_tokens)` rows
+    until `max_sents` sentences or (approximately, since sentences are
+    counted separately) `max_tokens` tokens. Rows past the budget are
+    never read. A first sentence longer than the whole budget is cut to
+    `max_tokens` tokens with `enc` (by character share without one), so
+    the context is never empty while any row matched.
+    """
+    parts, n_tokens = [], 0
+    for text, ends, toks in rows:
+        start = 0
+        for end, cost in zip(ends, toks):
+            if not parts and cost > max_tokens and max_sents > 0:
+                return _head(text[start:end].strip(), max_tokens, int(cost), enc)
+            if len(parts) >= max_sents or n_tokens + cost > max_tokens:
+                return " ".join(parts)
+            parts.append(text[start:end].strip())
+            n_tokens += int(cost)
+            start = int(end)
+    return " ".join(parts)
+
+
+def _head(sentence: str, max_tokens: int, cost: int, enc=None) -> str:
+    """The first `max_tokens` tokens of a sentence that costs `cost`."""
+    if enc is not None:
+        return enc.decode(enc.encode(sentence)[:max_tokens])
+    return sentence[:len(sentence) * max(max_tokens, 0) // max(cost, 1)].strip()
+
+
+def truncate_by_tokens(text: str, max_tokens: int, enc) -> str:
+    toks = enc.encode(text)
+    return enc.decode(toks[-max_tokens:]) if len(toks) > max_tokens else text
+
+def chunk_by_tokens(
+    texts: Iterable[str],
+    token_counts: Iterable[int],
+    max_tokens: int,
+) -> list[str]:
+    """
+    Greedily pack tweets, in order, into newline-joined chunks of at most
+    `max_tokens` tokens each (a single longer tweet gets its own chunk).
+    Used to summarize a whole filtered set rather than one truncated context.
+    """
+    chunks, current, n_tokens = [], [], 0
+    for text, cost in zip(texts, token_counts):
+        if current and n_tokens + cost > max_tokens:
+            chunks.append("\n".join(current))
+            current, n_tokens = [], 0
+        current.append(text)
+        n_tokens += int(cost)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def spread(items: Sequence, k: int) -> list:
+    """
+    `k` items evenly spaced over the sequence, in order (all of them when
+    `k` <= 0 or there are no more than `k`), so a cap on date-sorted chunks
+    still covers the whole date range.
+    """
+    if k <= 0 or len(items) <= k:
+        return list(items)
+    step = len(items) / k
+    return [items[int(i * step)] for i in range(k)]
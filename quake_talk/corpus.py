@@ -0,0 +1,145 @@
+# quake_talk/corpus.py
+
+"""
+Read-only, column-pruned view of the cleaned tweet Parquet, shared by the
+Streamlit and Gradio front ends.
+
+Text stays in Polars' Arrow buffers (no per-row Python objects). Dates are
+held as an int32 day ordinal, so a date range is a binary search: a
+contiguous row-ID slice when the Parquet is date-sorted (as written by
+clean_dataset.py), a sorted row-ID array otherwise.
+"""
+
+import os
+import hashlib
+import datetime as dt
+from functools import cached_property
+from typing import Iterable, Sequence
+
+import numpy as np
+import polars as pl
+
+CORPUS_FILE = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+
+# Columns the apps read; anything else in the Parquet is never loaded
+COLUMNS = (
+    "date", "content", "content_clean", "sent_ends", "sent_tokens", "n_tokens",
+    "cluster_id", "rep_id", "dup_count",   # present once dedup_dataset.py has run
+)
+
+_EPOCH    = dt.date(1970, 1, 1)
+_NO_DATE  = np.iinfo(np.int32).min   # unparseable dates sort first, match no range
+
+Window = slice | np.ndarray
+
+
+def text_digest(texts: pl.Series) -> str:
+    """
+    Content hash of a text column, in row order: any edited, added, removed
+    or reordered row changes it (nulls hash like "").
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\x00".join(texts.fill_null("").to_list()).encode("utf-8"))
+    return h.hexdigest()
+
+
+class CorpusStore:
+    def __init__(self, frame: pl.DataFrame, day: np.ndarray):
+        self.frame = frame
+        self.day   = day
+        self.date_sorted = bool(np.all(day[1:] >= day[:-1]))
+        # for unsorted corpora, binary search runs over a day-sorted permutation
+        self._order = None if self.date_sorted else np.argsort(day, kind="stable")
+        self._sorted_day = day if self.date_sorted else day[self._order]
+
+    @classmethod
+    def load(cls, path: str = CORPUS_FILE, columns: Sequence[str] = COLUMNS) -> "CorpusStore":
+        schema = pl.read_parquet_schema(path)
+        frame  = pl.read_parquet(path, columns=[c for c in columns if c in schema], memory_map=True)
+        date   = frame["date"]
+        if date.dtype == pl.Utf8:
+            date = date.str.to_datetime(strict=False)
+        day = date.dt.date().cast(pl.Int32).fill_null(_NO_DATE).to_numpy()
+        return cls(frame, day)
+
+    def __len__(self) -> int:
+        return self.frame.height
+
+    def _dated_day(self, i: int) -> dt.date:
+        """Day of the i-th dated row in date order (undated rows sort first)."""
+        first = int(np.searchsorted(self._sorted_day, _NO_DATE, side="right"))
+        if first == len(self._sorted_day):
+            raise ValueError("no row of the corpus has a parseable date")
+        return _EPOCH + dt.timedelta(days=int(self._sorted_day[first + i if i >= 0 else i]))
+
+    @property
+    def min_date(self) -> dt.date:
+        return self._dated_day(0)
+
+    @property
+    def max_date(self) -> dt.date:
+        return self._dated_day(-1)
+
+    def date_window(self, start: dt.date, end: dt.date) -> Window:
+        """Rows dated within [start, end] (inclusive)."""
+        lo = np.searchsorted(self._sorted_day, (start - _EPOCH).days, side="left")
+        hi = np.searchsorted(self._sorted_day, (end - _EPOCH).days, side="right")
+        if self.date_sorted:
+            return slice(int(lo), int(hi))
+        return np.sort(self._order[lo:hi])
+
+    @staticmethod
+    def window_size(window: Window) -> int:
+        return window.stop - window.start if isinstance(window, slice) else len(window)
+
+    @staticmethod
+    def id_filter(window: Window) -> dict:
+        """semantic_search() keyword arguments restricting hits to `window`."""
+        if isinstance(window, slice):
+            return {"id_range": (window.start, window.stop)}
+        return {"ids": window}
+
+    def restrict(self, ids: np.ndarray, window: Window) -> np.ndarray:
+        """Keep only the row IDs inside `window` (order preserved)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if isinstance(window, slice):
+            return ids[(ids >= window.start) & (ids < window.stop)]
+        return ids[np.isin(ids, window, assume_unique=True)]
+
+    def window_frame(self, window: Window) -> pl.DataFrame:
+        """Rows of `window`; a zero-copy slice for date-sorted corpora."""
+        if isinstance(window, slice):
+            return self.frame.slice(window.start, window.stop - window.start)
+        return self.take(window)
+
+    def take(self, ids: Iterable[int]) -> pl.DataFrame:
+        """Rows by row / FAISS ID, in the given order, gathered in Arrow memory."""
+        return self.frame[pl.Series("ids", np.asarray(ids, dtype=np.int64), dtype=pl.UInt32)]
+
+    def collapse(self, ids: Iterable[int], column: str = "rep_id") -> np.ndarray:
+        """
+        Keep the first row ID per distinct `column` value (order preserved),
+        so a duplicate cluster contributes one row. A no-op on corpora that
+        were never deduplicated.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if column not in self.frame.columns or not len(ids):
+            return ids
+        _, first = np.unique(self.frame[column].to_numpy()[ids], return_index=True)
+        return ids[np.sort(first)]
+
+    def weights(self, ids: Iterable[int]) -> np.ndarray:
+        """dup_count per row: how many tweets each (representative) row stands for."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if "dup_count" not in self.frame.columns:
+            return np.ones(len(ids), dtype=np.uint32)
+        return self.frame["dup_count"].to_numpy()[ids]
+
+    def texts(self, ids: Iterable[int], column: str = "content_clean") -> list[str]:
+        return self.take(ids)[column].to_list()
+
+    @cached_property
+    def digest(self) -> str:
+        """text_digest of content_clean, computed once per loaded store."""
+        return text_digest(self.frame["content_clean"])
+
@@ -0,0 +1,117 @@
+# quake_talk/embedding_cache.py
+
+"""
+Content-addressed store of sentence embeddings.
+
+Each vector is keyed by blake2b(model name + cleaned text), so a rebuild
+only has to encode texts it has never seen under that model. The cache is
+a directory of append-only shards:
+
+    keys-00000.npy   (n,)     |S16  – digests
+    vecs-00000.npy   (n, dim) f32   – embeddings, opened with mmap
+"""
+
+import os
+import glob
+import hashlib
+from typing import Sequence
+
+import numpy as np
+
+KEY_DTYPE = "S16"
+
+
+class EmbeddingCache:
+    def __init__(self, cache_dir: str, model_name: str):
+        self.cache_dir  = cache_dir
+        self.model_name = model_name
+        self.hits   = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._shards: list[np.ndarray] = []
+        keys, shard_ids, rows = [], [], []
+        for i, key_file in enumerate(sorted(glob.glob(os.path.join(cache_dir, "keys-*.npy")))):
+            k = np.load(key_file)
+            self._shards.append(np.load(key_file.replace("keys-", "vecs-"), mmap_mode="r"))
+            keys.append(k)
+            shard_ids.append(np.full(len(k), i, dtype=np.int32))
+            rows.append(np.arange(len(k), dtype=np.int64))
+        self._set_lookup(
+            np.concatenate(keys) if keys else np.empty(0, dtype=KEY_DTYPE),
+            np.concatenate(shard_ids) if keys else np.empty(0, dtype=np.int32),
+            np.concatenate(rows) if keys else np.empty(0, dtype=np.int64),
+        )
+
+    def _set_lookup(self, keys: np.ndarray, shard_ids: np.ndarray, rows: np.ndarray) -> None:
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._shard_ids, self._rows = keys[order], shard_ids[order], rows[order]
+
+    def key(self, text: str) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(self.model_name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(text.encode("utf-8"))
+        return h.digest()
+
+    def keys(self, texts: Sequence[str]) -> np.ndarray:
+        return np.array([self.key(t or "") for t in texts], dtype=KEY_DTYPE)
+
+    def lookup(self, keys: np.ndarray, dim: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (hit_mask, vectors); rows of `vectors` where hit_mask is
+        False are left as zeros for the caller to fill.
+        """
+        vecs = np.zeros((len(keys), dim), dtype="float32")
+        if len(self._keys) == 0:
+            return np.zeros(len(keys), dtype=bool), vecs
+
+        pos = np.searchsorted(self._keys, keys)
+        pos[pos == len(self._keys)] = 0
+        hit = self._keys[pos] == keys
+        for shard in np.unique(self._shard_ids[pos[hit]]):
+            sel = np.flatnonzero(hit)[self._shard_ids[pos[hit]] == shard]
+            rows = self._rows[pos[sel]]
+            order = np.argsort(rows)                     # sequential reads
+            vecs[sel[order]] = self._shards[shard][rows[order]]
+        return hit, vecs
+
+    def add(self, keys: np.ndarray, vecs: np.ndarray) -> None:
+        """Persist a new shard and make it visible to later lookups."""
+        if len(keys) == 0:
+            return
+        shard = len(self._shards)
+        np.save(os.path.join(self.cache_dir, f"vecs-{shard:05d}.npy"), vecs.astype("float32"))
+        np.save(os.path.join(self.cache_dir, f"keys-{shard:05d}.npy"), keys.astype(KEY_DTYPE))
+        self._shards.append(np.load(os.path.join(self.cache_dir, f"vecs-{shard:05d}.npy"), mmap_mode="r"))
+        self._set_lookup(
+            np.concatenate([self._keys, keys.astype(KEY_DTYPE)]),
+            np.concatenate([self._shard_ids, np.full(len(keys), shard, dtype=np.int32)]),
+            np.concatenate([self._rows, np.arange(len(keys), dtype=np.int64)]),
+        )
+
+    def encode(self, texts: Sequence[str], encode_fn, dim: int) -> np.ndarray:
+        """
+        Embeds `texts`, calling `encode_fn(list[str]) -> ndarray` only for
+        texts that are neither cached nor duplicated earlier in the batch.
+        Null texts are embedded as "" (like a tweet that cleans to nothing).
+        """
+        texts = [t or "" for t in texts]
+        keys  = self.keys(texts)
+        uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        hit, vecs = self.lookup(uniq, dim)
+
+        miss = np.flatnonzero(~hit)
+        if len(miss):
+            new = np.asarray(encode_fn([texts[first[j]] for j in miss]), dtype="float32")
+            vecs[miss] = new
+            self.add(uniq[miss], new)
+
+        self.hits   += len(texts) - len(miss)
+        self.misses += len(miss)
+        return vecs[inverse.reshape(-1)]
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,65 @@
+# quake_talk/fast_encoder.py
+
+"""
+Int8 query encoder for CPU-only deployments.
+
+load_fast_encoder() loads a SentenceTransformer and swaps its nn.Linear
+layers for dynamically quantized ones: int8 weights, activations quantized
+per call. Those matmuls are most of a short question's forward pass on
+CPU. The embeddings drift slightly from full precision;
+scripts/validate_fast_encoder.py measures the speedup and the top-k
+overlap on real questions and the real index before FAST_ENCODER=true is
+switched on.
+
+Only query encoding uses it (quake_talk.search). Tweet embeddings stay
+full precision, so the index needs no rebuild.
+"""
+
+import io
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+FAST_ENCODER    = os.getenv("FAST_ENCODER", "false").lower() == "true"
+ENCODER_THREADS = int(os.getenv("ENCODER_THREADS", 0))   # 0 → torch default (one per core)
+
+
+def set_threads(n: int = ENCODER_THREADS) -> None:
+    """
+    Torch intra-op threads (process-wide). Fewer threads per encode keeps
+    concurrent sessions from oversubscribing the cores.
+    """
+    if n > 0:
+        import torch
+        torch.set_num_threads(n)
+
+def quantize(model: "torch.nn.Module") -> "torch.nn.Module":
+    """Dynamic int8 quantization of `model`'s Linear layers, in place."""
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    qengine = torch.backends.quantized
+    if qengine.engine == "none":
+        # e.g. ARM builds: use whichever int8 kernels this torch ships
+        qengine.engine = next(e for e in qengine.supported_engines if e != "none")
+    return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+def load_fast_encoder(name: str) -> "SentenceTransformer":
+    """`name` on CPU, in eval mode, with int8 Linear layers."""
+    from sentence_transformers import SentenceTransformer
+
+    set_threads()
+    model = SentenceTransformer(name, device="cpu")
+    model.eval()
+    return quantize(model)
+
+def model_bytes(model: "torch.nn.Module") -> int:
+    """Serialized size of the model's weights (packed int8 ones included)."""
+    import torch
+
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return buf.tell()
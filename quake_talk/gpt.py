@@ -1,40 +1,82 @@
 # quake_talk/gpt.py
 import os
+import time
+import random
+import asyncio
+import weakref
 from dotenv import load_dotenv
 
 load_dotenv()   # <— this will read .env file into os.environ
 
-from openai import OpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator
+from . import tracing
+from .llm_cache import ResponseCache
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
 
-def ask(
+@lru_cache(maxsize=1)
+def _client() -> "OpenAI":
+    """Create the OpenAI client on first use (the SDK is slow to import)."""
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+def __getattr__(name: str):
+    # `gpt.client` kept for callers of the eager-loading version
+    if name == "client":
+        return _client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# One AsyncOpenAI (and its connection pool) per event loop: Streamlit runs
+# a fresh asyncio.run() per rerun, and pooled connections can't cross loops.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+def _async_client() -> "AsyncOpenAI":
+    from openai import AsyncOpenAI
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_clients[loop]
+
+@lru_cache(maxsize=1)
+def response_cache() -> ResponseCache | None:
+    """Open & cache the on-disk response cache (GPT_CACHE_FILE="" disables it)."""
+    path = os.getenv("GPT_CACHE_FILE", "artifacts/gpt_cache.sqlite")
+    if not path:
+        return None
+    return ResponseCache(
+        path,
+        max_entries=int(os.getenv("GPT_CACHE_MAX_ENTRIES", 10_000)),
+        max_age=float(os.getenv("GPT_CACHE_MAX_AGE", 7 * 24 * 3600)),
+    )
+
+def _cache_for(temperature: float) -> ResponseCache | None:
+    """The cache, unless bypassed for sampled (temperature > 0) calls."""
+    if temperature > 0 and os.getenv("GPT_CACHE_ZERO_TEMP_ONLY", "false").lower() == "true":
+        return None
+    return response_cache()
+
+def _ask_request(
     question: str,
     context: str,
     temperature: float | None = None,
     max_tokens: int | None = None
-) -> str:
-    """
-    Query GPT-4o using only the provided context.
-    """
+) -> dict:
     system_prompt = (
         "You are a research assistant analyzing tweets about the 2023 Turkey-Syria earthquake. "
         "Your response must be rooted in the provided context. "
         "If there is not enough information in the context to answer the question, say so. "
         "If you add any external knowledge, preface it with 'Beyond the provided data…'."
     )
-    return _call_gpt(
+    return dict(
         system=system_prompt,
         user=f"Context:\n{context}\n\nQuestion:\n{question}",
         temperature=temperature or float(os.getenv("GPT_TEMPERATURE", 0.4)),
         max_tokens=max_tokens or int(os.getenv("GPT_MAX_TOKENS", 1000)),
     )
 
-def summarize_with_gpt4o(text_chunk: str) -> str:
-    """
-    Summarize the key concerns, themes, and sentiments in the tweets.
-    Uses its own system prompt, higher creativity, and larger token budget.
-    """
+def _summary_request(text_chunk: str, max_tokens: int | None = None) -> dict:
     system_prompt = (
         "You are a helpful assistant summarizing tweets related to the Turkey-Syria earthquake."
     )
@@ -42,24 +84,255 @@ def summarize_with_gpt4o(text_chunk: str) -> str:
         f"{text_chunk}\n\n"
         "Please summarize the key concerns, themes, and sentiments expressed in these tweets."
     )
-    return _call_gpt(
+    return dict(
+        system=system_prompt,
+        user=user_prompt,
+        temperature=float(os.getenv("SUMMARY_TEMPERATURE", 0.7)),
+        max_tokens=max_tokens or int(os.getenv("SUMMARY_MAX_TOKENS", 4000)),
+    )
+
+def _reduce_request(summaries: list[str], max_tokens: int | None = None) -> dict:
+    system_prompt = (
+        "You are a helpful assistant combining partial summaries of tweets "
+        "related to the Turkey-Syria earthquake."
+    )
+    parts = "\n\n".join(f"Summary {i + 1}:\n{s}" for i, s in enumerate(summaries))
+    user_prompt = (
+        f"{parts}\n\n"
+        "Each summary above covers a different batch of tweets. Merge them into one summary "
+        "of the key concerns, themes, and sentiments, giving more weight to points that "
+        "recur across batches."
+    )
+    return dict(
         system=system_prompt,
         user=user_prompt,
         temperature=float(os.getenv("SUMMARY_TEMPERATURE", 0.7)),
-        max_tokens=int(os.getenv("SUMMARY_MAX_TOKENS", 4000)),
+        max_tokens=max_tokens or int(os.getenv("SUMMARY_MAX_TOKENS", 4000)),
     )
 
+def ask(
+    question: str,
+    context: str,
+    temperature: float | None = None,
+    max_tokens: int | None = None
+) -> str:
+    """
+    Query GPT-4o using only the provided context.
+    """
+    return _call_gpt(**_ask_request(question, context, temperature, max_tokens))
+
+def summarize_with_gpt4o(text_chunk: str) -> str:
+    """
+    Summarize the key concerns, themes, and sentiments in the tweets.
+    Uses its own system prompt, higher creativity, and larger token budget.
+    """
+    return _call_gpt(**_summary_request(text_chunk))
+
+async def ask_async(
+    question: str,
+    context: str,
+    temperature: float | None = None,
+    max_tokens: int | None = None
+) -> str:
+    """Async variant of ask()."""
+    return await _acall_gpt(**_ask_request(question, context, temperature, max_tokens))
+
+async def summarize_with_gpt4o_async(text_chunk: str) -> str:
+    """Async variant of summarize_with_gpt4o()."""
+    return await _acall_gpt(**_summary_request(text_chunk))
+
+def astream_ask(
+    question: str,
+    context: str,
+    temperature: float | None = None,
+    max_tokens: int | None = None
+) -> AsyncIterator[str]:
+    """Like ask(), but yields response text deltas as they arrive."""
+    return _astream_gpt(**_ask_request(question, context, temperature, max_tokens))
+
+def astream_summary(text_chunk: str) -> AsyncIterator[str]:
+    """Like summarize_with_gpt4o(), but yields response text deltas as they arrive."""
+    return _astream_gpt(**_summary_request(text_chunk))
+
+async def summarize_map_reduce(chunks: list[str]) -> str:
+    """
+    Summarize every chunk (see context.chunk_by_tokens) concurrently, then
+    merge the partial summaries SUMMARY_FAN_IN at a time until one is left.
+    """
+    parts = [delta async for delta in astream_summary_map_reduce(chunks)]
+    return "".join(parts).strip()
+
+def astream_summary_map_reduce(chunks: list[str]) -> AsyncIterator[str]:
+    """Like summarize_map_reduce(), but streams the final merge step."""
+    return _astream_map_reduce(chunks)
+
+async def _astream_map_reduce(chunks: list[str]) -> AsyncIterator[str]:
+    if len(chunks) <= 1:
+        async for delta in _astream_gpt(**_summary_request(chunks[0] if chunks else "")):
+            yield delta
+        return
+
+    fan_in  = max(2, int(os.getenv("SUMMARY_FAN_IN", 8)))
+    partial = int(os.getenv("SUMMARY_PARTIAL_MAX_TOKENS", 600))
+    limit   = asyncio.Semaphore(int(os.getenv("SUMMARY_CONCURRENCY", 8)))
+
+    async def run(request: dict) -> str:
+        async with limit:
+            return await _acomplete(**request)
+
+    # map: one bounded-length summary per chunk
+    requests = [_summary_request(c, max_tokens=partial) for c in chunks]
+    failed   = [0, 0]   # map batches, merge steps
+    level    = 0
+    while True:
+        results   = await asyncio.gather(*(run(r) for r in requests), return_exceptions=True)
+        summaries = [r for r in results if isinstance(r, str) and r]
+        errors    = [r for r in results if isinstance(r, BaseException)]
+        failed[min(level, 1)] += len(errors)
+        if not summaries:
+            yield f"❗ GPT API error: {errors[0] if errors else 'empty response'}"
+            return
+        if len(summaries) <= fan_in:
+            break
+        # reduce: merge groups of `fan_in` partial summaries, level by level
+        requests = [
+            _reduce_request(summaries[i:i + fan_in], max_tokens=partial)
+            for i in range(0, len(summaries), fan_in)
+        ]
+        level += 1
+
+    # failures at any level mean part of the tweets are missing from the summary
+    if failed[0]:
+        yield f"_({failed[0]} of {len(chunks)} batches could not be summarized.)_\n\n"
+    if failed[1]:
+        yield f"_({failed[1]} merge steps failed; their batches are missing from this summary.)_\n\n"
+    async for delta in _astream_gpt(**_reduce_request(summaries)):
+        yield delta
+
+def _messages(system: str, user: str) -> list[dict]:
+    return [
+        {"role": "system",  "content": system},
+        {"role": "user",    "content": user},
+    ]
+
 def _call_gpt(system: str, user: str, temperature: float, max_tokens: int) -> str:
+    model = os.getenv("GPT_MODEL", "gpt-4o")
+    cache = _cache_for(temperature)
+    key   = ResponseCache.key(model, system, user, temperature, max_tokens)
+    if cache is not None and (hit := cache.get(key)) is not None:
+        return hit
+
+    try:
+        with tracing.span("gpt.call"):
+            resp = _client().chat.completions.create(
+                model=model,
+                messages=_messages(system, user),
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        _record_usage(model, resp)
+        answer = resp.choices[0].message.content.strip()
+    except Exception as e:
+        return f"❗ GPT API error: {e}"
+
+    if cache is not None:
+        cache.put(key, answer)   # errors above are returned, never cached
+    return answer
+
+def _record_usage(model: str, resp) -> None:
+    """Token counts of a response (or of the final streamed chunk) for tracing."""
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        tracing.record_usage(model, usage.prompt_tokens, usage.completion_tokens)
+
+def _retryable(e: Exception) -> bool:
+    """Rate limits, timeouts, dropped connections and 5xx are worth retrying."""
+    import openai
+    if isinstance(e, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(e, openai.APIStatusError) and e.status_code >= 500
+
+async def _acomplete(system: str, user: str, temperature: float, max_tokens: int) -> str:
+    """
+    Non-streaming async call with up to GPT_MAX_RETRIES retries, backing off
+    exponentially (GPT_BACKOFF_S × 2^attempt, with jitter). Raises once the
+    retries are exhausted, so callers decide how to degrade.
+    """
+    model = os.getenv("GPT_MODEL", "gpt-4o")
+    cache = _cache_for(temperature)
+    key   = ResponseCache.key(model, system, user, temperature, max_tokens)
+    if cache is not None and (hit := cache.get(key)) is not None:
+        return hit
+
+    retries = int(os.getenv("GPT_MAX_RETRIES", 4))
+    backoff = float(os.getenv("GPT_BACKOFF_S", 1.0))
+    client  = _async_client().with_options(max_retries=0)   # retries are handled here
+    # gpt.call times the whole call, back-offs included; each failed attempt
+    # is also recorded as gpt.retry, so quick 429s don't pass for fast calls
+    with tracing.span("gpt.call"):
+        for attempt in range(retries + 1):
+            start = time.perf_counter()
+            try:
+                resp = await client.chat.completions.create(
+                    model=model,
+                    messages=_messages(system, user),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                break
+            except Exception as e:
+                if tracing.ENABLED:
+                    tracing.observe("gpt.retry", time.perf_counter() - start)
+                if attempt == retries or not _retryable(e):
+                    raise
+                await asyncio.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    _record_usage(model, resp)
+    answer = (resp.choices[0].message.content or "").strip()
+    if cache is not None:
+        cache.put(key, answer)
+    return answer
+
+async def _acall_gpt(system: str, user: str, temperature: float, max_tokens: int) -> str:
+    parts = [delta async for delta in _astream_gpt(system, user, temperature, max_tokens)]
+    return "".join(parts).strip()
+
+async def _astream_gpt(system: str, user: str, temperature: float, max_tokens: int) -> AsyncIterator[str]:
+    model = os.getenv("GPT_MODEL", "gpt-4o")
+    cache = _cache_for(temperature)
+    key   = ResponseCache.key(model, system, user, temperature, max_tokens)
+    if cache is not None and (hit := cache.get(key)) is not None:
+        yield hit
+        return
+
+    parts = []
+    start, first = time.perf_counter(), None
+    # the final chunk carries usage only when asked for; some OpenAI-compatible
+    # servers reject the option, so it is only sent while tracing
+    extra = {"stream_options": {"include_usage": True}} if tracing.ENABLED else {}
     try:
-        resp = client.chat.completions.create(
-            model=os.getenv("GPT_MODEL", "gpt-4o"),
-            messages=[
-                {"role": "system",  "content": system},
-                {"role": "user",    "content": user},
-            ],
+        stream = await _async_client().chat.completions.create(
+            model=model,
+            messages=_messages(system, user),
             temperature=temperature,
             max_tokens=max_tokens,
+            stream=True,
+            **extra,
         )
-        return resp.choices[0].message.content.strip()
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                if first is None:
+                    first = time.perf_counter() - start
+                parts.append(delta)
+                yield delta
+            _record_usage(model, chunk)
     except Exception as e:
-        return f"❗ GPT API error: {e}"
\ No newline at end of file
+        yield f"\n❗ GPT API error: {e}"
+        return
+
+    if tracing.ENABLED:
+        tracing.observe("gpt.first_token", first if first is not None else time.perf_counter() - start)
+        tracing.observe("gpt.stream", time.perf_counter() - start)
+    if cache is not None:
+        cache.put(key, "".join(parts).strip())
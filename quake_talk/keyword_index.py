@@ -0,0 +1,143 @@
+# quake_talk/keyword_index.py
+
+"""
+Inverted index over `content_clean` tokens.
+
+Persisted as a single .npz of numpy arrays:
+  - terms      uint8  – "\\n"-joined UTF-8 vocabulary, sorted
+  - offsets    int64  – postings[offsets[t]:offsets[t+1]] belong to term t
+  - postings   int32  – sorted row IDs (Parquet row order)
+  - n_docs     int64  – number of rows the index was built from
+  - digest     str    – corpus.text_digest of the texts it was built from
+"""
+
+import re
+from typing import TYPE_CHECKING
+
+import numpy as np
+import polars as pl
+
+from .corpus import text_digest
+
+if TYPE_CHECKING:
+    from .corpus import CorpusStore, Window
+
+# Same notion of "word" as the \b…\b regex the app used before
+TOKEN_RE = r"\w+"
+
+
+class KeywordIndex:
+    def __init__(
+        self,
+        terms: list[str],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        n_docs: int,
+        digest: str = "",
+    ):
+        self.terms    = terms
+        self.offsets  = offsets
+        self.postings = postings
+        self.n_docs   = n_docs
+        self.digest   = digest
+        self._term_ids = {t: i for i, t in enumerate(terms)}
+
+    @classmethod
+    def build(cls, texts: pl.Series) -> "KeywordIndex":
+        """Tokenize, lowercase and invert a Series of cleaned texts."""
+        pairs = (
+            pl.DataFrame({"text": texts.fill_null("")})
+              .with_row_index("id")
+              .select(
+                  pl.col("id").cast(pl.Int32),
+                  pl.col("text").str.to_lowercase().str.extract_all(TOKEN_RE).alias("term"),
+              )
+              .explode("term")
+              .drop_nulls("term")
+              .unique(["term", "id"])
+              .sort(["term", "id"])
+        )
+        counts = pairs.group_by("term", maintain_order=True).len()
+        offsets = np.zeros(counts.height + 1, dtype=np.int64)
+        np.cumsum(counts["len"].to_numpy(), out=offsets[1:])
+        return cls(
+            counts["term"].to_list(),
+            offsets,
+            pairs["id"].to_numpy().astype(np.int32),
+            len(texts),
+            text_digest(texts),
+        )
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            terms=np.frombuffer("\n".join(self.terms).encode("utf-8"), dtype=np.uint8),
+            offsets=self.offsets,
+            postings=self.postings,
+            n_docs=np.int64(self.n_docs),
+            digest=np.str_(self.digest),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "KeywordIndex":
+        with np.load(path) as z:
+            blob = z["terms"].tobytes().decode("utf-8")
+            return cls(
+                blob.split("\n") if blob else [],
+                z["offsets"],
+                z["postings"],
+                int(z["n_docs"]),
+                str(z["digest"]) if "digest" in z.files else "",
+            )
+
+    def built_from(self, store: "CorpusStore") -> bool:
+        """
+        Whether the row IDs are valid for `store`: same texts in the same
+        order. Indexes saved without a digest cannot tell, so they never are.
+        """
+        return bool(self.digest) and self.n_docs == len(store) and self.digest == store.digest
+
+    def lookup(self, term: str) -> np.ndarray:
+        """Sorted row IDs containing `term` (empty if unseen)."""
+        t = self._term_ids.get(term.lower())
+        if t is None:
+            return self.postings[:0]
+        return self.postings[self.offsets[t]:self.offsets[t + 1]]
+
+    def match(self, keywords: list[str], mode: str = "any") -> np.ndarray:
+        """
+        Union ("any") or intersection ("all") of the keywords' posting lists.
+        """
+        lists = [self.lookup(k) for k in keywords]
+        if not lists:
+            return self.postings[:0]
+        if mode == "all":
+            out = lists[0]
+            for p in lists[1:]:
+                out = np.intersect1d(out, p, assume_unique=True)
+            return out
+        return np.unique(np.concatenate(lists))
+
+    def mask(self, keywords: list[str], mode: str = "any") -> np.ndarray:
+        """Boolean row mask of length n_docs, ready to AND with a date mask."""
+        hits = np.zeros(self.n_docs, dtype=bool)
+        hits[self.match(keywords, mode)] = True
+        return hits
+
+
+def keyword_filter(
+    store: "CorpusStore",
+    window: "Window",
+    keywords: list[str],
+    index: KeywordIndex | None = None,
+) -> np.ndarray:
+    """Row IDs inside the date `window` whose text contains any keyword."""
+    if not keywords:
+        return np.arange(len(store))[window]
+    if index is not None:
+        # posting-list union, restricted to the date window
+        return store.restrict(index.match(keywords), window)
+    pattern = r"(?i)\b(?:" + "|".join(re.escape(k) for k in keywords) + r")\b"
+    frame   = store.window_frame(window).with_row_index("_pos")
+    hits    = frame.filter(pl.col("content_clean").str.contains(pattern))["_pos"].to_numpy()
+    return np.arange(len(store))[window][hits]
@@ -0,0 +1,90 @@
+# quake_talk/llm_cache.py
+
+"""
+On-disk cache of chat-completion responses (SQLite).
+
+Entries are keyed by a hash of everything that determines the response:
+model, system prompt, user prompt, temperature and max_tokens. Eviction is
+by age (`max_age` seconds since the response was stored) and by size
+(least recently used beyond `max_entries`).
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class ResponseCache:
+    def __init__(self, path: str, max_entries: int = 10_000, max_age: float = 7 * 24 * 3600):
+        self.path        = path
+        self.max_entries = max_entries
+        self.max_age     = max_age
+        self.hits   = 0
+        self.misses = 0
+        self._lock  = threading.Lock()
+        self._conn  = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "  key TEXT PRIMARY KEY,"
+            "  response TEXT NOT NULL,"
+            "  created REAL NOT NULL,"
+            "  accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model: str, system: str, user: str, temperature: float, max_tokens: int) -> str:
+        payload = json.dumps([model, system, user, float(temperature), int(max_tokens)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created >= ?",
+                (key, now - self.max_age),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "  SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": size,
+        }
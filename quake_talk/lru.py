@@ -0,0 +1,82 @@
+# quake_talk/lru.py
+
+"""
+Thread-safe in-memory LRU cache bounded by entry count and/or bytes.
+
+Values are sized with `sizeof` (numpy `.nbytes` by default, else
+sys.getsizeof); an entry larger than `max_bytes` on its own is not stored.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+def _nbytes(value: Any) -> int:
+    return int(getattr(value, "nbytes", 0)) or sys.getsizeof(value)
+
+
+class LRUCache:
+    def __init__(
+        self,
+        max_entries: int | None = 1024,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = _nbytes,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.sizeof      = sizeof
+        self.hits   = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._lock  = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._data[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, (_, size) = self._data.popitem(last=False)
+            self.nbytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": len(self._data),
+            "bytes": self.nbytes,
+        }
@@ -6,32 +6,150 @@ including HTML unescaping, punctuation control, and optional
 context-aware lemmatization via spaCy.
 """
 
+import os
 import re
 import html
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# Heavy dependencies (spaCy, NLTK, Polars) are imported on first use, so
+# `import quake_talk` stays fast and works on hosts without network access.
 
 # 1) spaCy for context-aware tokenization & lemmatization
-try:
-    import spacy
-    nlp = spacy.load("en_core_web_sm", disable=["parser", "ner"])
-except (ImportError, OSError):
-    nlp = None
-
-# 2) NLTK for fallback lemmatizer & stopwords
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import sent_tokenize
-
-# Download only the NLTK data we need
-nltk.download("stopwords", quiet=True)
-nltk.download("wordnet", quiet=True)
-nltk.download("omw-1.4", quiet=True)
-nltk.download("punkt", quiet=True)
-nltk.download("punkt_tab", quiet=True)  
-
-STOPWORDS = set(stopwords.words("english"))
-NLTK_LEMMATIZER = WordNetLemmatizer()
+@lru_cache(maxsize=1)
+def _nlp():
+    """Load & cache the spaCy pipeline, or None if spaCy / the model is missing."""
+    try:
+        import spacy
+        return spacy.load("en_core_web_sm", disable=["parser", "ner"])
+    except (ImportError, OSError):
+        return None
+
+# 2) NLTK for fallback lemmatizer, stopwords & sentence splitting.
+#    Resources are looked up locally; downloading is opt-in.
+NLTK_RESOURCES = {
+    "stopwords": "corpora/stopwords",
+    "wordnet":   "corpora/wordnet",
+    "punkt_tab": "tokenizers/punkt_tab/english",
+}
+
+def _require_nltk(name: str) -> None:
+    import nltk
+    try:
+        nltk.data.find(NLTK_RESOURCES[name])
+    except LookupError:
+        if os.getenv("NLTK_AUTO_DOWNLOAD", "false").lower() == "true" and nltk.download(name, quiet=True):
+            return
+        raise LookupError(
+            f"NLTK resource '{name}' is not installed. "
+            f"Install it once with: python -m nltk.downloader {name}"
+        ) from None
+
+@lru_cache(maxsize=1)
+def _stopwords() -> frozenset[str]:
+    _require_nltk("stopwords")
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words("english"))
+
+@lru_cache(maxsize=1)
+def _lemmatizer():
+    _require_nltk("wordnet")
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+@lru_cache(maxsize=1)
+def _punkt():
+    _require_nltk("punkt_tab")
+    from nltk.tokenize.punkt import PunktTokenizer
+    return PunktTokenizer("english")
+
+def __getattr__(name: str):
+    # module-level names kept for callers of the eager-loading version
+    if name == "nlp":
+        return _nlp()
+    if name == "STOPWORDS":
+        return _stopwords()
+    if name == "NLTK_LEMMATIZER":
+        return _lemmatizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Noise patterns, compiled once and shared by clean_tweet / clean_tweets
+HASHTAG_RE    = r"#\w+"
+URL_RE        = r"http\S+|www\S+"
+EMAIL_RE      = r"\S*@\S*"
+PUNCT_RE      = r"[^a-zA-Z0-9\s]"
+WHITESPACE_RE = r"\s+"
+
+_HASHTAG    = re.compile(HASHTAG_RE)
+_URL        = re.compile(URL_RE)
+_EMAIL      = re.compile(EMAIL_RE)
+_PUNCT      = re.compile(PUNCT_RE)
+_WHITESPACE = re.compile(WHITESPACE_RE)
+_WORD       = re.compile(r"\w+")
+
+# Rows containing anything outside printable ASCII (plus \t\n\v\f\r) go
+# through the Python regex path in clean_tweets: Python's `re` and Polars'
+# Rust regex disagree on what \w and \s mean for some non-ASCII characters.
+_NON_ASCII_SAFE = r"[^\x20-\x7E\t\n\r\x0B\x0C]"
+
+def _normalize(text: str) -> str:
+    """Steps 2–6 of clean_tweet: unescape, strip noise & punctuation, lowercase."""
+    # 2. HTML unescape
+    text = html.unescape(text)
+
+    # 3. Remove noise
+    text = _HASHTAG.sub("", text)
+    text = _URL.sub("", text)
+    text = _EMAIL.sub("", text)
+
+    # 4. Remove all punctuation (leave only letters, numbers, whitespace)
+    text = _PUNCT.sub("", text)
+
+    # 5. Normalize whitespace
+    text = _WHITESPACE.sub(" ", text).strip()
+
+    # 6. Lowercase
+    return text.lower()
+
+def _normalize_expr(col: "pl.Expr") -> "pl.Expr":
+    """Polars equivalent of steps 3–6 for ASCII-safe, already-unescaped text."""
+    return (
+        col.str.replace_all(HASHTAG_RE, "")
+           .str.replace_all(URL_RE, "")
+           .str.replace_all(EMAIL_RE, "")
+           .str.replace_all(PUNCT_RE, "")
+           .str.replace_all(WHITESPACE_RE, " ")
+           .str.strip_chars(" ")
+           .str.to_lowercase()
+    )
+
+def _normalize_batch(texts: "pl.Series") -> list[str]:
+    """Vectorized steps 2–6 over a Series of raw tweets (nulls → "")."""
+    import polars as pl
+
+    raw = texts.cast(pl.Utf8).fill_null("")
+
+    # 2. HTML unescape – only rows that actually contain an entity
+    s = raw
+    has_amp = raw.str.contains("&", literal=True)
+    if has_amp.any():
+        s = raw.clone().scatter(
+            has_amp.arg_true(),
+            [html.unescape(t) for t in raw.filter(has_amp).to_list()],
+        )
+
+    # 3–6. Native string kernels for the bulk; Python `re` for the rest
+    out = s.to_frame("text").select(_normalize_expr(pl.col("text"))).to_series()
+    unsafe = s.str.contains(_NON_ASCII_SAFE)
+    if unsafe.any():
+        out = out.scatter(
+            unsafe.arg_true(),
+            [_normalize(t) for t in raw.filter(unsafe).to_list()],
+        )
+    return out.to_list()
 
 def clean_tweet(
     text: Optional[str],
@@ -52,34 +170,22 @@ def clean_tweet(
     if not text:
         return ""
 
-    # 2. HTML unescape
-    text = html.unescape(text)
-
-    # 3. Remove noise
-    text = re.sub(r"#\w+", "", text)
-    text = re.sub(r"http\S+|www\S+", "", text)
-    text = re.sub(r"\S*@\S*", "", text)
-
-    # 4. Remove all punctuation (leave only letters, numbers, whitespace)
-    text = re.sub(r"[^a-zA-Z0-9\s]", "", text)
-
-    # 5. Normalize whitespace
-    text = re.sub(r"\s+", " ", text).strip()
-
-    # 6. Lowercase
-    text = text.lower()
+    # 2–6. Unescape, strip noise & punctuation, normalize, lowercase
+    text = _normalize(text)
 
     # 7. Tokenize
+    nlp = _nlp()
     if nlp is not None:
         doc = nlp(text)
         tokens = [tok.text for tok in doc if not tok.is_space]
     else:
         # simple regex fallback
-        tokens = re.findall(r"\w+", text)
+        tokens = _WORD.findall(text)
 
     # 8. Remove stopwords
     if remove_stopwords:
-        tokens = [t for t in tokens if t not in STOPWORDS]
+        stops = _stopwords()
+        tokens = [t for t in tokens if t not in stops]
 
     # 9. Lemmatize if requested
     if lemmatize:
@@ -87,22 +193,79 @@ def clean_tweet(
             doc = nlp(" ".join(tokens))
             tokens = [tok.lemma_ for tok in doc]
         else:
-            tokens = [NLTK_LEMMATIZER.lemmatize(t) for t in tokens]
+            tokens = [_lemmatizer().lemmatize(t) for t in tokens]
 
     return " ".join(tokens)
 
+def clean_tweets(
+    texts: Iterable[Optional[str]],
+    remove_stopwords: bool = True,
+    lemmatize: bool = False,
+    n_process: int = 1,
+    batch_size: int = 1000,
+) -> list[str]:
+    """
+    Batch version of clean_tweet; returns exactly what
+    [clean_tweet(t, ...) for t in texts] would, in the same order.
+
+    Steps 2–6 run as Polars string expressions; spaCy tokenization and
+    lemmatization run through nlp.pipe, spread over `n_process` workers.
+    """
+    import polars as pl
+
+    series = texts if isinstance(texts, pl.Series) else pl.Series(list(texts), dtype=pl.Utf8)
+    normed = _normalize_batch(series)
+
+    # 7. Tokenize (tokenizer only – no other component affects tok.text)
+    nlp = _nlp()
+    if nlp is not None:
+        docs = nlp.pipe(
+            normed,
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=nlp.pipe_names,
+        )
+        token_lists = [[tok.text for tok in doc if not tok.is_space] for doc in docs]
+    else:
+        token_lists = [_WORD.findall(t) for t in normed]
+
+    # 8. Remove stopwords
+    if remove_stopwords:
+        stops = _stopwords()
+        token_lists = [[t for t in toks if t not in stops] for toks in token_lists]
+
+    # 9. Lemmatize if requested
+    if lemmatize:
+        if nlp is not None:
+            docs = nlp.pipe(
+                (" ".join(toks) for toks in token_lists),
+                batch_size=batch_size,
+                n_process=n_process,
+            )
+            token_lists = [[tok.lemma_ for tok in doc] for doc in docs]
+        else:
+            lemmatizer = _lemmatizer()
+            token_lists = [[lemmatizer.lemmatize(t) for t in toks] for toks in token_lists]
+
+    return [" ".join(toks) for toks in token_lists]
+
 def extract_sentences(texts: list[str], max_sents: int = 300) -> list[str]:
     combined = " ".join(t.strip() for t in texts)
-    sents = sent_tokenize(combined)
+    sents = _punkt().tokenize(combined)   # same tokenizer sent_tokenize uses
     return sents[:max_sents]
 
+def sentence_ends(text: str) -> list[int]:
+    """End offsets of the sentences sent_tokenize() finds in `text`."""
+    return [end for _, end in _punkt().span_tokenize(text)]
+
 def extract_keywords(question: str) -> list[str]:
     words = re.findall(r"\w+", question.lower())
-    lemm = [NLTK_LEMMATIZER.lemmatize(w) for w in words]
-    return [w for w in lemm if w not in STOPWORDS]
-
-from quake_talk.gpt import ask  # ensure this import comes *after* gpt.py exists
+    lemmatizer, stops = _lemmatizer(), _stopwords()
+    lemm = [lemmatizer.lemmatize(w) for w in words]
+    return [w for w in lemm if w not in stops]
 
 def summarize_with_gpt4o(context: str) -> str:
+    from quake_talk.gpt import ask  # deferred: pulls in the OpenAI client
+
     prompt = "Please summarize the key concerns, themes, and sentiments expressed in these tweets."
-    return ask(prompt, context)
\ No newline at end of file
+    return ask(prompt, context)
@@ -0,0 +1,135 @@
+# quake_talk/preprocessing/dedup.py
+
+"""
+Exact and near-duplicate detection for cleaned tweets (retweets,
+copy-pasted appeals).
+
+1. Exact: rows with identical text share the earliest such row.
+2. Near: each distinct text gets a MinHash signature over its word
+   shingles; LSH banding proposes candidate pairs, which are kept when
+   their estimated Jaccard similarity reaches `threshold`.
+3. Connected components of the kept pairs form clusters, labelled by
+   their earliest row ID.
+
+Everything runs on numpy / Polars arrays; no per-pair Python loop.
+"""
+
+import numpy as np
+import polars as pl
+
+_PRIME = np.uint64((1 << 31) - 1)     # MinHash permutations: (a·x + b) mod p
+_MIX   = np.uint64(0x9E3779B97F4A7C15)
+
+
+def exact_duplicates(texts: pl.Series) -> np.ndarray:
+    """Row ID of the first row with the same text, per row (nulls = "")."""
+    df = pl.DataFrame({"text": texts.cast(pl.Utf8).fill_null("")}).with_row_index()
+    return df.select(pl.col("index").first().over("text")).to_series().to_numpy().astype(np.int64)
+
+
+def _shingle_hashes(texts: pl.Series, shingle: int) -> tuple[np.ndarray, np.ndarray]:
+    """(doc ID, 32-bit hash) per word `shingle`-gram; short texts use their words."""
+    words   = texts.cast(pl.Utf8).fill_null("").str.split(" ")
+    lengths = words.list.len().to_numpy().astype(np.int64)
+    h       = words.explode().hash(seed=0).to_numpy()
+    doc     = np.repeat(np.arange(len(lengths)), lengths)
+
+    # n-gram hash = rolling multiply-mix of the word hashes (uint64 wraps)
+    n     = max(len(h) - shingle + 1, 0)
+    ng    = h[:n].copy()
+    for j in range(1, shingle):
+        ng = ng * _MIX + h[j:j + n]
+    valid = doc[:n] == doc[shingle - 1:shingle - 1 + n]
+
+    short = (lengths < shingle)[doc]
+    docs  = np.concatenate([doc[:n][valid], doc[short]])
+    vals  = np.concatenate([ng[valid], h[short]])
+    order = np.argsort(docs, kind="stable")
+    vals  = vals[order]
+    return docs[order], (vals >> np.uint64(32)) ^ (vals & np.uint64(0xFFFFFFFF))
+
+
+def minhash_signatures(
+    texts: pl.Series,
+    num_perm: int = 64,
+    shingle: int = 3,
+    seed: int = 0,
+) -> np.ndarray:
+    """(len(texts), num_perm) uint32 MinHash signatures of word shingles."""
+    docs, x = _shingle_hashes(texts, shingle)
+    starts  = np.flatnonzero(np.r_[True, docs[1:] != docs[:-1]])
+
+    rng = np.random.default_rng(seed)
+    a   = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+    b   = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    sig = np.empty((len(starts), num_perm), dtype=np.uint32)
+    for i in range(num_perm):
+        sig[:, i] = np.minimum.reduceat((a[i] * x + b[i]) % _PRIME, starts)
+    return sig
+
+
+def lsh_pairs(signatures: np.ndarray, bands: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Candidate pairs (src, dst): rows whose signatures agree on every value
+    of at least one band. Each bucket contributes an edge from every member
+    to its first member, which is enough for connectivity.
+    """
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    src, dst = [], []
+    for band in range(bands):
+        cols = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        key  = np.zeros(n, dtype=np.uint64)
+        for c in range(rows):
+            key = key * _MIX + cols[:, c]
+        order = np.argsort(key, kind="stable")
+        k     = key[order]
+        new   = np.r_[True, k[1:] != k[:-1]]
+        first = order[np.maximum.accumulate(np.where(new, np.arange(n), 0))]
+        dup   = ~new
+        src.append(order[dup])
+        dst.append(first[dup])
+    return np.concatenate(src), np.concatenate(dst)
+
+
+def _components(n: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Min-label connected components of the graph with edges (a, b)."""
+    label = np.arange(n)
+    while True:
+        before = label.copy()
+        np.minimum.at(label, a, label[b])
+        np.minimum.at(label, b, label[a])
+        while not np.array_equal(nxt := label[label], label):
+            label = nxt
+        if np.array_equal(label, before):
+            return label
+
+
+def duplicate_clusters(
+    texts: pl.Series,
+    near: bool = True,
+    threshold: float = 0.8,
+    num_perm: int = 64,
+    bands: int = 16,
+    shingle: int = 3,
+) -> np.ndarray:
+    """
+    Cluster ID per row: the row ID of the earliest member of its exact
+    (and, with `near`, near-duplicate) cluster.
+    """
+    exact = exact_duplicates(texts)
+    if not near:
+        return exact
+
+    reps = np.flatnonzero(exact == np.arange(len(exact)))
+    sig  = minhash_signatures(texts.gather(reps), num_perm, shingle)
+    a, b = lsh_pairs(sig, bands)
+
+    # LSH over-proposes by design; keep pairs whose estimated Jaccard is high
+    similar = (sig[a] == sig[b]).mean(axis=1) >= threshold
+    label   = _components(len(reps), a[similar], b[similar])
+
+    # reps are ascending row IDs, so the min position is the earliest row
+    cluster_of_rep = reps[label]
+    return cluster_of_rep[np.searchsorted(reps, exact)]
@@ -1,30 +1,583 @@
 # quake_talk/search.py
 
 import os
+import json
+import time
+import hashlib
+import threading
+import contextvars
+import urllib.request
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+from typing import TYPE_CHECKING, Sequence
 
-@lru_cache(maxsize=1)
-def _load_faiss_index(index_path: str = os.getenv("INDEX_FILE", "artifacts/tweets.index")) -> faiss.Index:
-    """Read & cache the FAISS index."""
+from . import tracing
+from .lru import LRUCache
+
+# faiss and sentence_transformers are imported on first use: they dominate
+# `import quake_talk.search` time and most callers never need both.
+if TYPE_CHECKING:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+    from .corpus import CorpusStore
+
+INDEX_FILE      = os.getenv("INDEX_FILE", "artifacts/tweets.index")
+EMBEDDING_FILE  = os.getenv("EMBEDDING_FILE", "artifacts/tweet_embeddings.npy")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+BM25_INDEX_FILE = os.getenv("BM25_INDEX_FILE", "artifacts/bm25_index.npz")
+CLEANED_PARQUET = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+KEYWORD_INDEX   = os.getenv("KEYWORD_INDEX_FILE", "artifacts/keyword_index.npz")
+AGGREGATES_FILE = os.getenv("DAILY_AGGREGATES_FILE", "artifacts/daily_aggregates.parquet")
+
+# Several corpora in one process: CORPORA_FILE is a JSON object mapping a
+# corpus name to its artifacts, e.g. {"syria-2023": {"index": ...,
+# "embeddings": ..., "parquet": ..., "bm25": ..., "model": ...}}. The
+# DEFAULT_CORPUS name always resolves to the single-corpus settings above.
+# Loaded models, indexes and stores share one SEARCH_MEMORY_MB budget.
+CORPORA_FILE   = os.getenv("CORPORA_FILE", "")
+DEFAULT_CORPUS = os.getenv("DEFAULT_CORPUS", "default")
+MEMORY_BUDGET  = int(float(os.getenv("SEARCH_MEMORY_MB", 4096)) * 2**20)
+
+# Client mode: with SEARCH_SERVER_URL set (e.g. http://127.0.0.1:8765, see
+# quake_talk.server), searches and query embeddings go to the shared server
+# and only fall back to loading the model & index in-process while it is
+# unreachable.
+SEARCH_SERVER_URL     = os.getenv("SEARCH_SERVER_URL", "")
+SEARCH_SERVER_TIMEOUT = float(os.getenv("SEARCH_SERVER_TIMEOUT", 10))
+SEARCH_SERVER_RETRY_S = float(os.getenv("SEARCH_SERVER_RETRY_S", 30))
+
+# Loaders; the registry below caches what they return.
+def _load_faiss_index(index_path: str) -> "faiss.Index":
+    """Read the FAISS index (memory-mapped)."""
+    import faiss
     return faiss.read_index(
         index_path,
         faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
     )
 
-@lru_cache(maxsize=1)
-def _load_embedding_model(name: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")) -> SentenceTransformer:
-    """Instantiate & cache the SentenceTransformer."""
+def _load_embeddings(emb_path: str) -> np.ndarray:
+    """Memory-map the (float32 or float16) embedding matrix for exact re-ranking."""
+    return np.load(emb_path, mmap_mode="r")
+
+def _load_embedding_model(name: str) -> "SentenceTransformer":
+    """Instantiate the SentenceTransformer (int8-quantized with FAST_ENCODER=true)."""
+    from .fast_encoder import FAST_ENCODER, load_fast_encoder, set_threads
+    if FAST_ENCODER:
+        return load_fast_encoder(name)
+    from sentence_transformers import SentenceTransformer
+    set_threads()
     return SentenceTransformer(name)
 
-def semantic_search(question: str, top_k: int = 10):
-        # 1) load (cached) model & index
-    model = _load_embedding_model()
-    idx   = _load_faiss_index()
+def _load_store(parquet_path: str) -> "CorpusStore":
+    from .corpus import CorpusStore
+    return CorpusStore.load(parquet_path)
+
+def _load_bm25(bm25_path: str):
+    from .bm25 import BM25Index
+    return BM25Index.load(bm25_path)
+
+def _load_keywords(path: str):
+    from .keyword_index import KeywordIndex
+    return KeywordIndex.load(path)
+
+def _load_aggregates(path: str):
+    from .aggregates import DailyAggregates
+    return DailyAggregates.load(path)
+
+def _resident_bytes(kind: str, value, path: str) -> int:
+    """
+    Budget charge of a loaded artifact. Memory-mapped files count at their
+    full size: that is what the page cache holds once they are warm.
+    """
+    if kind == "model":
+        # state_dict, not parameters(): int8-packed weights are not parameters
+        state = getattr(value, "state_dict", None)
+        return sum(_tensor_bytes(t) for t in state().values()) if state else 0
+    if kind in ("store", "aggregates"):
+        return int(value.frame.estimated_size())
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return int(getattr(value, "nbytes", 0))
+
+def _tensor_bytes(value) -> int:
+    if hasattr(value, "element_size"):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(v) for v in value)
+    return 0
+
+def _signature(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CorpusSpec:
+    """Artifact paths and embedding model of one corpus ("" = not built)."""
+
+    def __init__(
+        self,
+        index: str,
+        embeddings: str,
+        parquet: str,
+        bm25: str = "",
+        keyword_index: str = "",
+        aggregates: str = "",
+        model: str = EMBEDDING_MODEL,
+    ):
+        self.index         = index
+        self.embeddings    = embeddings
+        self.parquet       = parquet
+        self.bm25          = bm25
+        self.keyword_index = keyword_index
+        self.aggregates    = aggregates
+        self.model         = model
+
+
+class CorpusRegistry:
+    """
+    Corpus name → artifacts, loaded on first use and kept while they fit in
+    `max_bytes` (least recently used evicted first). Artifacts are shared by
+    path, so corpora on the same embedding model hold one copy of it; a file
+    rewritten on disk (mtime/size) is loaded again. The artifact just loaded
+    is never evicted, even when it alone exceeds the budget.
+    """
+
+    def __init__(self, max_bytes: int = MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self.nbytes    = 0
+        self.loads     = 0
+        self.evictions = 0
+        self._specs: dict[str, CorpusSpec] = {}
+        self._lock     = threading.Lock()
+        self._loading: dict[tuple[str, str], threading.Lock] = {}
+        self._resident: "OrderedDict[tuple[str, str], tuple[object, int, tuple | None]]" = OrderedDict()
+
+    @classmethod
+    def from_file(cls, path: str = CORPORA_FILE, max_bytes: int = MEMORY_BUDGET) -> "CorpusRegistry":
+        registry = cls(max_bytes)
+        if path:
+            with open(path) as f:
+                for name, paths in json.load(f).items():
+                    registry.register(name, CorpusSpec(**paths))
+        return registry
+
+    def register(self, name: str, spec: CorpusSpec) -> None:
+        with self._lock:
+            self._specs[name] = spec
+
+    def names(self) -> list[str]:
+        """
+        Registered corpora; DEFAULT_CORPUS first when it is registered or its
+        single-corpus artifacts exist (or nothing else is configured).
+        """
+        others  = sorted(n for n in self._specs if n != DEFAULT_CORPUS)
+        default = self.spec(DEFAULT_CORPUS)
+        if (
+            DEFAULT_CORPUS in self._specs or not others
+            or os.path.exists(default.parquet) or os.path.exists(default.index)
+        ):
+            return [DEFAULT_CORPUS] + others
+        return others
+
+    def spec(self, name: str | None = None) -> CorpusSpec:
+        name = name or DEFAULT_CORPUS
+        spec = self._specs.get(name)
+        if spec is not None:
+            return spec
+        if name != DEFAULT_CORPUS:
+            raise KeyError(f"unknown corpus {name!r}")
+        # read at call time, so the module settings can be changed at runtime
+        return CorpusSpec(
+            INDEX_FILE, EMBEDDING_FILE, CLEANED_PARQUET, BM25_INDEX_FILE,
+            KEYWORD_INDEX, AGGREGATES_FILE, EMBEDDING_MODEL,
+        )
+
+    def index(self, name: str | None = None) -> "faiss.Index":
+        return self._get("index", self.spec(name).index, _load_faiss_index)
+
+    def embeddings(self, name: str | None = None) -> np.ndarray:
+        return self._get("embeddings", self.spec(name).embeddings, _load_embeddings)
+
+    def model(self, name: str | None = None) -> "SentenceTransformer":
+        return self._get("model", self.spec(name).model, _load_embedding_model)
+
+    def store(self, name: str | None = None) -> "CorpusStore":
+        return self._get("store", self.spec(name).parquet, _load_store)
+
+    def bm25(self, name: str | None = None):
+        """The corpus' BM25Index, or None if it has none."""
+        path = self.spec(name).bm25
+        return self._get("bm25", path, _load_bm25) if path and os.path.exists(path) else None
+
+    def keyword_index(self, name: str | None = None):
+        """The corpus' KeywordIndex, or None if it has none."""
+        path = self.spec(name).keyword_index
+        return self._get("keyword_index", path, _load_keywords) if path and os.path.exists(path) else None
+
+    def aggregates(self, name: str | None = None):
+        """The corpus' DailyAggregates, or None if not built."""
+        path = self.spec(name).aggregates
+        return self._get("aggregates", path, _load_aggregates) if path and os.path.exists(path) else None
+
+    def _get(self, kind: str, path: str, load):
+        key = (kind, path)
+        sig = _signature(path) if kind != "model" else None
+        with self._lock:
+            hit = self._resident.get(key)
+            if hit is not None and hit[2] == sig:
+                self._resident.move_to_end(key)
+                return hit[0]
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        # one load per artifact: concurrent first queries wait for it
+        with loading:
+            with self._lock:
+                hit = self._resident.get(key)
+                if hit is not None and hit[2] == sig:
+                    return hit[0]
+            value = load(path)
+            size  = _resident_bytes(kind, value, path)
+            with self._lock:
+                self._drop(key)
+                self._resident[key] = (value, size, sig)
+                self.nbytes += size
+                self.loads  += 1
+                while self.nbytes > self.max_bytes and len(self._resident) > 1:
+                    self._drop(next(iter(self._resident)))
+                    self.evictions += 1
+                self._loading.pop(key, None)
+        return value
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        entry = self._resident.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._resident.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "corpora": self.names(),
+                "resident": [f"{kind}:{path}" for kind, path in self._resident],
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+
+registry = CorpusRegistry.from_file()
+
+# In-process caches: Streamlit reruns the script on every widget change, so
+# the same question is encoded and searched again and again. Sizes of 0
+# disable a cache.
+def _env_cache(prefix: str, entries: int, megabytes: int, **kwargs) -> LRUCache | None:
+    max_entries = int(os.getenv(f"{prefix}_ENTRIES", entries))
+    max_bytes   = int(float(os.getenv(f"{prefix}_MB", megabytes)) * 2**20)
+    if not max_entries or not max_bytes:
+        return None
+    return LRUCache(max_entries, max_bytes, **kwargs)
+
+# (model, question) → embedding
+_query_cache  = _env_cache("QUERY_CACHE", 1024, 16)
+# (embedding, k, nprobe, filter) → (ids, dists)
+_result_cache = _env_cache("RESULT_CACHE", 4096, 64, sizeof=lambda r: r[0].nbytes + r[1].nbytes)
+
+_index_lock       = threading.Lock()
+_index_signatures: dict[str, tuple[int, int] | None] = {}
+
+def _check_index(corpus: str | None = None) -> None:
+    """
+    Drop both caches when the corpus' index file was replaced or rewritten,
+    i.e. its mtime or size changed (the registry reloads the index itself).
+    """
+    path = registry.spec(corpus).index
+    sig  = _signature(path)
+    with _index_lock:
+        if path in _index_signatures and _index_signatures[path] != sig:
+            for cache in (_query_cache, _result_cache):
+                if cache is not None:
+                    cache.clear()
+        _index_signatures[path] = sig
+
+def cache_stats() -> dict:
+    """Hit/miss statistics of the query-embedding and search-result caches."""
+    return {
+        name: cache.stats() if cache is not None else None
+        for name, cache in (("query_embeddings", _query_cache), ("search_results", _result_cache))
+    }
+
+def _normalize_question(question: str) -> str:
+    return " ".join(question.split())
+
+def _filter_key(id_range, ids) -> tuple:
+    if id_range is not None:
+        return ("range", int(id_range[0]), int(id_range[1]))
+    if ids is not None:
+        digest = hashlib.blake2b(np.asarray(ids, dtype="int64").tobytes(), digest_size=16)
+        return ("ids", digest.digest())
+    return ()
+
+def _encode(questions: Sequence[str], batch_size: int, corpus: str | None = None) -> np.ndarray:
+    """Embed `questions` with the corpus' model, running it only on ones not cached yet."""
+    keys = [(registry.spec(corpus).model, _normalize_question(q)) for q in questions]
+    vecs = [_query_cache.get(k) if _query_cache is not None else None for k in keys]
+
+    missing = [i for i, v in enumerate(vecs) if v is None]
+    if missing:
+        model = registry.model(corpus)
+        with tracing.span("search.encode"):
+            fresh = np.asarray(
+                model.encode([keys[i][1] for i in missing], batch_size=batch_size),
+                dtype="float32",
+            )
+        for i, v in zip(missing, fresh):
+            vecs[i] = v
+            if _query_cache is not None:
+                _query_cache.put(keys[i], v)
+    return np.stack(vecs)
+
+def embed_questions(
+    questions: Sequence[str],
+    batch_size: int = int(os.getenv("ENCODE_BATCH_SIZE", 64)),
+    corpus: str | None = None,
+) -> np.ndarray:
+    """Query embeddings (through the query cache), e.g. to compare with day centroids."""
+    remote = _remote_embed(questions, corpus)
+    if remote is not None:
+        return remote
+    return _encode(questions, batch_size, corpus)
+
+def _id_selector(
+    id_range: tuple[int, int] | None = None,
+    ids: Sequence[int] | None = None,
+) -> "faiss.IDSelector | None":
+    """
+    Build a FAISS ID filter: `id_range` is a half-open [lo, hi) row-ID range
+    (cheap; the cleaned Parquet is date-sorted so a date window is a range),
+    `ids` an arbitrary set of row IDs.
+    """
+    import faiss
+    if id_range is not None:
+        sel = faiss.IDSelectorRange(int(id_range[0]), int(id_range[1]))
+        sel.assume_sorted = True   # IVF lists hold IDs in insertion (row) order
+        return sel
+    if ids is not None:
+        return faiss.IDSelectorBatch(np.asarray(ids, dtype="int64"))
+    return None
+
+def _search(
+    idx: "faiss.Index",
+    xq: np.ndarray,
+    k: int,
+    sel: "faiss.IDSelector | None" = None,
+    nprobe: int | None = None,
+):
+    """
+    Search with optional ID filter and per-call nprobe (the shared index is
+    never mutated). For IVF indexes, a narrow window may have no members in
+    the `nprobe` closest lists, so a filtered search widens probing (×4, up
+    to nlist) until `k` in-window hits are found or every list was visited.
+    """
+    import faiss
+    ivf = faiss.try_extract_index_ivf(idx)
+    if ivf is None:
+        return idx.search(xq, k, params=faiss.SearchParameters(sel=sel) if sel else None)
+
+    nprobe = min(ivf.nlist, nprobe or ivf.nprobe)
+    while True:
+        D, I = idx.search(xq, k, params=faiss.SearchParametersIVF(sel=sel, nprobe=nprobe))
+        if sel is None or nprobe >= ivf.nlist or (I >= 0).sum(axis=1).min() >= k:
+            return D, I
+        nprobe = min(ivf.nlist, nprobe * 4)
+
+def _rerank(xq: np.ndarray, ids: np.ndarray, k: int, emb: np.ndarray):
+    """Exact squared-L2 re-scoring of candidate `ids` against stored embeddings."""
+    ids  = np.sort(ids)                                   # sequential mmap reads
+    vecs = np.asarray(emb[ids], dtype="float32")
+    dist = ((vecs - xq[0]) ** 2).sum(axis=1)
+    top  = np.argsort(dist, kind="stable")[:k]
+    return ids[top], dist[top]
+
+def semantic_search(
+    question: str,
+    top_k: int = 10,
+    id_range: tuple[int, int] | None = None,
+    ids: Sequence[int] | None = None,
+    rerank_factor: int = int(os.getenv("RERANK_FACTOR", 1)),
+    nprobe: int | None = int(os.getenv("NPROBE") or 0) or None,
+    corpus: str | None = None,
+):
+    """
+    Return (row IDs, distances) of the `top_k` nearest tweets of `corpus`
+    (a registry name; None = DEFAULT_CORPUS). The optional `id_range` /
+    `ids` filter is applied inside the FAISS search, so every returned hit
+    is in the window; fewer than `top_k` are returned only when the window
+    holds fewer than `top_k` tweets.
+
+    With `rerank_factor` > 1, FAISS returns top_k × rerank_factor PQ
+    candidates which are re-scored exactly against the corpus' embeddings.
+    """
+    return semantic_search_many([question], top_k, id_range, ids, rerank_factor, nprobe, corpus=corpus)[0]
+
+def semantic_search_many(
+    questions: Sequence[str],
+    top_k: int = 10,
+    id_range: tuple[int, int] | None = None,
+    ids: Sequence[int] | None = None,
+    rerank_factor: int = int(os.getenv("RERANK_FACTOR", 1)),
+    nprobe: int | None = int(os.getenv("NPROBE") or 0) or None,
+    batch_size: int = int(os.getenv("ENCODE_BATCH_SIZE", 64)),
+    corpus: str | None = None,
+) -> list[tuple[list[int], list[float]]]:
+    """
+    Batched semantic_search(): one (row IDs, distances) pair per question,
+    in order. All questions are encoded in one model.encode call and
+    searched as a single query matrix, which FAISS spreads over its
+    OpenMP threads. The ID filter applies to every question.
+    """
+    if not questions:
+        return []
+    remote = _remote_search_many(questions, top_k, id_range, ids, rerank_factor, nprobe, corpus)
+    if remote is not None:
+        return remote
+    return search_many_local(questions, top_k, id_range, ids, rerank_factor, nprobe, batch_size, corpus)
+
+_server_down_until = 0.0
+
+def _remote(path: str, payload: dict, field: str):
+    """`field` of SEARCH_SERVER_URL's reply to `payload`, or None if it is unset or unreachable."""
+    global _server_down_until
+    if not SEARCH_SERVER_URL or time.monotonic() < _server_down_until:
+        return None
+    req = urllib.request.Request(
+        SEARCH_SERVER_URL.rstrip("/") + path,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with tracing.span("search.remote"), urllib.request.urlopen(req, timeout=SEARCH_SERVER_TIMEOUT) as resp:
+            return json.load(resp)[field]
+    except (OSError, ValueError, KeyError):
+        # don't pay a connect timeout on every query while the server is down
+        _server_down_until = time.monotonic() + SEARCH_SERVER_RETRY_S
+        return None
+
+def _remote_embed(questions, corpus=None) -> np.ndarray | None:
+    """Query embeddings from SEARCH_SERVER_URL, or None if it is unset or unreachable."""
+    vecs = _remote("/embed", {"questions": list(questions), "corpus": corpus}, "embeddings")
+    return None if vecs is None else np.asarray(vecs, dtype="float32")
+
+def _remote_search_many(questions, top_k, id_range, ids, rerank_factor, nprobe, corpus=None):
+    """Results from SEARCH_SERVER_URL, or None if it is unset or unreachable."""
+    payload = {
+        "questions": list(questions),
+        "top_k": top_k,
+        "id_range": [int(v) for v in id_range] if id_range is not None else None,
+        "ids": np.asarray(ids, dtype="int64").tolist() if ids is not None else None,
+        "rerank_factor": rerank_factor,
+        "nprobe": nprobe,
+        "corpus": corpus,
+    }
+    results = _remote("/search", payload, "results")
+    return None if results is None else [(hits, dists) for hits, dists in results]
+
+def search_many_local(
+    questions: Sequence[str],
+    top_k: int = 10,
+    id_range: tuple[int, int] | None = None,
+    ids: Sequence[int] | None = None,
+    rerank_factor: int = int(os.getenv("RERANK_FACTOR", 1)),
+    nprobe: int | None = int(os.getenv("NPROBE") or 0) or None,
+    batch_size: int = int(os.getenv("ENCODE_BATCH_SIZE", 64)),
+    corpus: str | None = None,
+) -> list[tuple[list[int], list[float]]]:
+    """semantic_search_many() against the in-process model & index."""
+    if not questions:
+        return []
+    _check_index(corpus)
+
+    # 1) encode (cached per normalized question)
+    query_emb = _encode(questions, batch_size, corpus)
+
+    # 2) search only the rows whose result isn't cached
+    k    = top_k * max(1, rerank_factor)
+    opts = (registry.spec(corpus).index, top_k, k, nprobe, _filter_key(id_range, ids))
+    keys = [(row.tobytes(),) + opts for row in query_emb]
+    results = [_result_cache.get(key) if _result_cache is not None else None for key in keys]
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        idx = registry.index(corpus)
+        sel = _id_selector(id_range, ids)
+        with tracing.span("search.faiss"):
+            distances, indices = _search(idx, query_emb[missing], k, sel, nprobe)
+
+        for row, i in enumerate(missing):
+            keep = indices[row] >= 0
+            hits, dists = indices[row][keep], distances[row][keep]
+
+            # 3) optional exact re-rank of the oversampled candidates
+            if rerank_factor > 1:
+                with tracing.span("search.rerank"):
+                    hits, dists = _rerank(query_emb[i:i + 1], hits, top_k, registry.embeddings(corpus))
+            results[i] = (hits, dists)
+            if _result_cache is not None:
+                _result_cache.put(keys[i], results[i])
+    return [(hits.tolist(), dists.tolist()) for hits, dists in results]
+
+@lru_cache(maxsize=1)
+def _pool() -> ThreadPoolExecutor:
+    """Threads for running the dense and sparse retrievers side by side."""
+    return ThreadPoolExecutor(max_workers=int(os.getenv("HYBRID_THREADS", 4)))
+
+def hybrid_search(
+    question: str,
+    top_k: int = 10,
+    id_range: tuple[int, int] | None = None,
+    ids: Sequence[int] | None = None,
+    depth: int | None = None,
+    rrf_k: int = int(os.getenv("RRF_K", 60)),
+    corpus: str | None = None,
+) -> tuple[list[int], list[float]]:
+    """
+    Vector search and BM25 (the corpus' BM25 index) run in parallel, each
+    returning its top `depth` (default 2 × top_k) hits inside the ID
+    filter, merged by reciprocal rank fusion: score = Σ 1 / (rrf_k + rank).
+    Returns (row IDs, fused scores), best first. Without a BM25 index this
+    is semantic_search.
+    """
+    from .bm25 import tokenize
+
+    index = registry.bm25(corpus)
+    if index is None:
+        return semantic_search(question, top_k, id_range, ids, corpus=corpus)
+    depth = depth or 2 * top_k
+    ids   = np.sort(np.asarray(ids, dtype="int64")) if ids is not None else None
+
+    def bm25():
+        with tracing.span("search.bm25"):
+            return index.search(tokenize(question), depth, id_range, ids)[0]
+
+    # copied contexts: spans from the pool threads land in the caller's trace
+    dense  = _pool().submit(
+        contextvars.copy_context().run, semantic_search, question, depth, id_range, ids, corpus=corpus,
+    )
+    sparse = _pool().submit(contextvars.copy_context().run, bm25)
 
-    # 2) encode & search
-    query_emb = model.encode(question)
-    distances, indices = idx.search(np.array([query_emb]), top_k)
-    return indices.flatten().tolist(), distances.flatten().tolist()
\ No newline at end of file
+    fused: dict[int, float] = {}
+    for ranking in (dense.result()[0], sparse.result().tolist()):
+        for rank, row in enumerate(ranking):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (rrf_k + rank + 1)
+    best = sorted(fused.items(), key=lambda kv: (-kv[1], kv[0]))[:top_k]
+    return [row for row, _ in best], [score for _, score in best]
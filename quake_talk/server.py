@@ -0,0 +1,171 @@
+# quake_talk/server.py
+
+"""
+Local search service: one process holds the SentenceTransformer and the
+FAISS index, and every Streamlit session / Gradio worker queries it over
+localhost HTTP instead of loading its own copies.
+
+    python -m quake_talk.server            # SEARCH_SERVER_HOST / _PORT
+
+    POST /search   {"questions": [...], "top_k": 10, "id_range": [lo, hi],
+                    "ids": [...], "rerank_factor": 1, "nprobe": null,
+                    "corpus": null}
+                   → {"results": [[ids, dists], ...]}
+    POST /embed    {"questions": [...], "corpus": null}
+                   → {"embeddings": [[float, ...], ...]}   (Overview mode)
+    GET  /health   → {"ok": true, "batches": n, "queries": n, "cache": {...},
+                      "registry": {...}}
+    GET  /metrics  → stage latencies in Prometheus text format (TRACING=true)
+
+Concurrent requests are micro-batched: the batcher waits up to
+SEARCH_BATCH_WAIT_MS for more work (at most SEARCH_BATCH_MAX questions),
+then answers every request sharing the same options with one
+semantic_search_many call, i.e. one encode and one FAISS search.
+Clients opt in by setting SEARCH_SERVER_URL (see quake_talk.search).
+"""
+
+import os
+import json
+import queue
+import threading
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer
+
+from . import search, tracing
+
+HOST         = os.getenv("SEARCH_SERVER_HOST", "127.0.0.1")
+PORT         = int(os.getenv("SEARCH_SERVER_PORT", 8765))
+BATCH_MAX    = int(os.getenv("SEARCH_BATCH_MAX", 64))
+BATCH_WAIT   = float(os.getenv("SEARCH_BATCH_WAIT_MS", 5)) / 1000
+ENCODE_BATCH = int(os.getenv("ENCODE_BATCH_SIZE", 64))
+
+
+class MicroBatcher:
+    """Collects concurrent search requests and runs them as batched searches."""
+
+    def __init__(self, max_batch: int = BATCH_MAX, max_wait: float = BATCH_WAIT):
+        self.max_batch = max_batch
+        self.max_wait  = max_wait
+        self.batches   = 0
+        self.queries   = 0
+        self._queue: "queue.Queue[tuple[list[str], tuple, Future]]" = queue.Queue()
+        threading.Thread(target=self._run, name="search-batcher", daemon=True).start()
+
+    def submit(self, questions: list[str], options: dict) -> Future:
+        """Queue `questions`; the future resolves to their semantic_search_many results."""
+        fut = Future()
+        key = (
+            int(options.get("top_k", 10)),
+            tuple(options["id_range"]) if options.get("id_range") is not None else None,
+            tuple(options["ids"]) if options.get("ids") is not None else None,
+            int(options.get("rerank_factor") or 1),
+            options.get("nprobe"),
+            options.get("corpus"),
+        )
+        self._queue.put((list(questions), key, fut))
+        return fut
+
+    def _collect(self) -> list:
+        pending = [self._queue.get()]
+        n       = len(pending[0][0])
+        while n < self.max_batch:
+            try:
+                item = self._queue.get(timeout=self.max_wait)
+            except queue.Empty:
+                break
+            pending.append(item)
+            n += len(item[0])
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            # requests can only share a search call when their options match
+            groups: dict[tuple, list] = {}
+            for item in pending:
+                groups.setdefault(item[1], []).append(item)
+            for (top_k, id_range, ids, rerank_factor, nprobe, corpus), items in groups.items():
+                questions = [q for qs, _, _ in items for q in qs]
+                try:
+                    results = search.search_many_local(
+                        questions, top_k, id_range, ids, rerank_factor, nprobe, corpus=corpus,
+                    )
+                except Exception as e:
+                    for _, _, fut in items:
+                        fut.set_exception(e)
+                    continue
+                self.batches += 1
+                self.queries += len(questions)
+                start = 0
+                for qs, _, fut in items:
+                    fut.set_result(results[start:start + len(qs)])
+                    start += len(qs)
+
+
+class SearchHandler(tracing.MetricsHandler):
+    batcher: MicroBatcher
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            return self.send_metrics()
+        if self.path != "/health":
+            return self._reply(404, {"error": "not found"})
+        self._reply(200, {
+            "ok": True,
+            "batches": self.batcher.batches,
+            "queries": self.batcher.queries,
+            "cache": search.cache_stats(),
+            "registry": search.registry.stats(),
+        })
+
+    def do_POST(self) -> None:
+        if self.path not in ("/search", "/embed"):
+            return self._reply(404, {"error": "not found"})
+        try:
+            length  = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            if self.path == "/embed":
+                # through the query cache, without the batcher: no FAISS search to share
+                vecs = search._encode(request["questions"], ENCODE_BATCH, request.get("corpus"))
+                return self._reply(200, {"embeddings": vecs.tolist()})
+            results = self.batcher.submit(request["questions"], request).result()
+        except (KeyError, TypeError, ValueError) as e:
+            return self._reply(400, {"error": str(e)})
+        except Exception as e:
+            return self._reply(500, {"error": str(e)})
+        self._reply(200, {"results": results})
+
+    def log_message(self, format, *args) -> None:
+        pass   # one line per query is too noisy
+
+
+def make_server(host: str = HOST, port: int = PORT, batcher: MicroBatcher | None = None) -> ThreadingHTTPServer:
+    handler = type("Handler", (SearchHandler,), {"batcher": batcher or MicroBatcher()})
+    server  = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    # load model & index before accepting traffic
+    search.search_many_local(["warm up"], top_k=1)
+    server = make_server()
+    print(f"✅ Search server listening on http://{HOST}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# quake_talk/tracing.py
+
+"""
+Lightweight timing spans for the query path.
+
+    with tracing.span("search.faiss"):
+        ...
+
+Every finished span feeds a per-stage rolling window (the last
+TRACE_WINDOW durations) from which p50/p95/p99 are computed on demand,
+plus lifetime count/sum. Spans finished inside `with tracing.trace() as t`
+are also collected on `t`, so the app can show one question's breakdown.
+GPT token usage reported by the API is counted per model.
+
+Output: prometheus_text() (served on GET /metrics by quake_talk.server and
+by serve_metrics() for the app process) or dump_metrics() to a file.
+
+With TRACING=false (the default) span() returns a shared no-op context
+manager and record_usage() returns immediately, so instrumented code pays
+one global lookup per call.
+"""
+
+import os
+import time
+import threading
+import contextlib
+import contextvars
+from collections import deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENABLED      = os.getenv("TRACING", "false").lower() == "true"
+WINDOW       = int(os.getenv("TRACE_WINDOW", 1024))             # durations kept per stage
+METRICS_FILE = os.getenv("TRACE_METRICS_FILE", "")              # "" → no file dump
+METRICS_PORT = int(os.getenv("TRACE_METRICS_PORT", 0))          # 0 → no /metrics listener
+QUANTILES    = (0.5, 0.95, 0.99)
+
+_NOOP  = contextlib.nullcontext()
+_lock  = threading.Lock()
+_stats: dict[str, "_Stage"] = {}
+_tokens: dict[tuple[str, str], int] = {}
+_current: contextvars.ContextVar["Trace | None"] = contextvars.ContextVar("quake_talk_trace", default=None)
+
+
+class _Stage:
+    __slots__ = ("recent", "count", "total")
+
+    def __init__(self):
+        self.recent = deque(maxlen=WINDOW)
+        self.count  = 0
+        self.total  = 0.0
+
+
+class Trace:
+    """Spans (name, seconds) and token usage of one request, in finish order."""
+
+    def __init__(self):
+        self.spans: list[tuple[str, float]] = []
+        self.tokens = {"prompt": 0, "completion": 0}
+
+    def totals(self) -> dict[str, float]:
+        """Seconds per stage name (a stage may run several times)."""
+        out: dict[str, float] = {}
+        for name, seconds in self.spans:
+            out[name] = out.get(name, 0.0) + seconds
+        return out
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def enable(on: bool = True) -> None:
+    global ENABLED
+    ENABLED = on
+
+def span(name: str):
+    """Context manager timing the enclosed block as stage `name`."""
+    return _Span(name) if ENABLED else _NOOP
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration for `name` (what a finished span does)."""
+    with _lock:
+        stage = _stats.get(name)
+        if stage is None:
+            stage = _stats[name] = _Stage()
+        stage.recent.append(seconds)
+        stage.count += 1
+        stage.total += seconds
+    if (t := _current.get()) is not None:
+        t.spans.append((name, seconds))
+
+def record_usage(model: str, prompt_tokens: int | None, completion_tokens: int | None) -> None:
+    """Count the prompt / completion tokens an API response reported."""
+    if not ENABLED:
+        return
+    t = _current.get()
+    with _lock:
+        for kind, n in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+            _tokens[(model, kind)] = _tokens.get((model, kind), 0) + int(n or 0)
+            if t is not None:
+                t.tokens[kind] += int(n or 0)
+
+@contextlib.contextmanager
+def trace():
+    """Collect the spans finished in this context (threads/tasks started from it included)."""
+    t     = Trace()
+    token = _current.set(t)
+    try:
+        yield t
+    finally:
+        _current.reset(token)
+
+def snapshot() -> dict[str, dict]:
+    """Per stage: count, total seconds and rolling p50/p95/p99 (seconds)."""
+    with _lock:
+        stages = {name: (list(s.recent), s.count, s.total) for name, s in _stats.items()}
+    out = {}
+    for name, (recent, count, total) in sorted(stages.items()):
+        recent.sort()
+        out[name] = {"count": count, "sum": total, **{f"p{round(q * 100)}": _quantile(recent, q) for q in QUANTILES}}
+    return out
+
+def _quantile(values: list[float], q: float) -> float:
+    """Linearly interpolated quantile of sorted `values` (numpy's default)."""
+    if not values:
+        return 0.0
+    pos = (len(values) - 1) * q
+    lo  = int(pos)
+    hi  = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+def token_usage() -> dict[tuple[str, str], int]:
+    with _lock:
+        return dict(_tokens)
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+        _tokens.clear()
+
+def prometheus_text() -> str:
+    """Prometheus text exposition of the stage summaries and token counters."""
+    lines = [
+        "# HELP quake_talk_stage_seconds Query-path stage latency (quantiles over the last TRACE_WINDOW calls).",
+        "# TYPE quake_talk_stage_seconds summary",
+    ]
+    for name, s in snapshot().items():
+        label = _escape(name)
+        for q in QUANTILES:
+            lines.append(f'quake_talk_stage_seconds{{stage="{label}",quantile="{q}"}} {s[f"p{round(q * 100)}"]:.6g}')
+        lines.append(f'quake_talk_stage_seconds_sum{{stage="{label}"}} {s["sum"]:.6g}')
+        lines.append(f'quake_talk_stage_seconds_count{{stage="{label}"}} {s["count"]}')
+    lines += [
+        "# HELP quake_talk_gpt_tokens_total Tokens reported by the OpenAI API.",
+        "# TYPE quake_talk_gpt_tokens_total counter",
+    ]
+    for (model, kind), n in sorted(token_usage().items()):
+        lines.append(f'quake_talk_gpt_tokens_total{{model="{_escape(model)}",kind="{kind}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def dump_metrics(path: str = METRICS_FILE) -> None:
+    """Atomically (re)write prometheus_text() to `path` (node-exporter textfile style)."""
+    if not path:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def send_metrics(self) -> None:
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path != "/metrics":
+            return self.send_error(404)
+        self.send_metrics()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@lru_cache(maxsize=1)
+def serve_metrics(port: int = METRICS_PORT, host: str = "127.0.0.1") -> ThreadingHTTPServer | None:
+    """Start (once per process) a daemon thread serving GET /metrics."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
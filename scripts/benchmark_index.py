@@ -0,0 +1,163 @@
+# scripts/benchmark_index.py
+"""
+Recall/latency sweep over candidate FAISS index configurations.
+
+Holds out BENCH_QUERIES embeddings as queries, computes exact top-k ground
+truth with a flat index over the rest, then builds every factory string in
+BENCH_FACTORIES and sweeps nprobe (IVF) / efSearch (HNSW). Reports
+recall@k, p50/p99 single-query latency, build time and serialized size, and
+writes the results, the Pareto front and a recommended configuration to
+INDEX_TUNING_FILE (next to INDEX_FILE) for build_index.py to pick up.
+"""
+
+import os
+import json
+import time
+import numpy as np
+import faiss
+from dotenv import load_dotenv
+
+load_dotenv()
+EMB_FILE     = os.getenv("EMBEDDING_FILE", "artifacts/tweet_embeddings.npy")
+INDEX_FILE   = os.getenv("INDEX_FILE", "artifacts/tweets.index")
+TUNING_OUT   = os.getenv("INDEX_TUNING_FILE", INDEX_FILE + ".tuning.json")
+QUERY_FILE   = os.getenv("BENCH_QUERY_FILE")                  # optional .npy of question embeddings
+N_QUERIES    = int(os.getenv("BENCH_QUERIES", 1000))          # held-out rows when no QUERY_FILE
+N_BASE       = int(os.getenv("BENCH_BASE", 0))                # 0 → whole corpus
+K            = int(os.getenv("BENCH_K", 10))
+TRAIN_SAMPLE = int(os.getenv("IVF_TRAIN_SAMPLE", 262_144))
+THREADS      = int(os.getenv("BENCH_THREADS", 1))             # per-request latency → 1 thread
+TARGET_RECALL = float(os.getenv("TARGET_RECALL", 0.95))
+FACTORIES = os.getenv(
+    "BENCH_FACTORIES",
+    "IVF1024,Flat;IVF1024,PQ96;IVF1024,PQ48;OPQ96,IVF1024,PQ96;HNSW32,Flat",
+).split(";")
+NPROBES   = [int(v) for v in os.getenv("BENCH_NPROBE", "1,4,8,16,32,64").split(",")]
+EFSEARCH  = [int(v) for v in os.getenv("BENCH_EFSEARCH", "16,32,64,128,256").split(",")]
+
+
+def load_sets(rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Returns (base vectors, query vectors); held-out rows are not in base."""
+    vecs = np.load(EMB_FILE, mmap_mode="r")
+    n    = vecs.shape[0]
+    rows = np.arange(n)
+    if QUERY_FILE:
+        queries = np.load(QUERY_FILE).astype("float32")
+    else:
+        held    = rng.choice(n, size=min(N_QUERIES, n // 10), replace=False)
+        queries = np.asarray(vecs[np.sort(held)], dtype="float32")
+        rows    = np.setdiff1d(rows, held)
+    if N_BASE and len(rows) > N_BASE:
+        rows = np.sort(rng.choice(rows, size=N_BASE, replace=False))
+    return np.asarray(vecs[rows], dtype="float32"), queries
+
+
+def search_settings(index: faiss.Index) -> list[dict]:
+    """nprobe sweep for IVF, efSearch sweep for HNSW, nothing otherwise."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return [{"nprobe": p} for p in NPROBES if p <= ivf.nlist]
+    if "HNSW" in type(faiss.downcast_index(index)).__name__:
+        return [{"efSearch": ef} for ef in EFSEARCH]
+    return [{}]
+
+
+def measure(index: faiss.Index, queries: np.ndarray, truth: np.ndarray, params: dict) -> dict:
+    ps = faiss.ParameterSpace()
+    for name, value in params.items():
+        ps.set_index_parameter(index, name, value)
+
+    latencies = np.empty(len(queries))
+    found     = np.empty((len(queries), K), dtype=np.int64)
+    for i in range(len(queries)):
+        t0 = time.perf_counter()
+        _, I = index.search(queries[i:i + 1], K)
+        latencies[i] = time.perf_counter() - t0
+        found[i] = I[0]
+
+    hits = sum(len(np.intersect1d(f[f >= 0], t)) for f, t in zip(found, truth))
+    return {
+        "recall_at_k": hits / truth.size,
+        "p50_ms": float(np.percentile(latencies, 50) * 1e3),
+        "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+    }
+
+
+def pareto_front(results: list[dict]) -> list[dict]:
+    """Configs not dominated on (recall ↑, p50 ↓, size ↓)."""
+    def dominates(a, b):
+        better_eq = (a["recall_at_k"] >= b["recall_at_k"]
+                     and a["p50_ms"] <= b["p50_ms"]
+                     and a["index_bytes"] <= b["index_bytes"])
+        strictly  = (a["recall_at_k"] > b["recall_at_k"]
+                     or a["p50_ms"] < b["p50_ms"]
+                     or a["index_bytes"] < b["index_bytes"])
+        return better_eq and strictly
+    return [r for r in results if not any(dominates(o, r) for o in results)]
+
+
+def recommend(front: list[dict]) -> dict:
+    """Fastest front member meeting TARGET_RECALL, else the most accurate."""
+    ok = [r for r in front if r["recall_at_k"] >= TARGET_RECALL]
+    if ok:
+        return min(ok, key=lambda r: (r["p50_ms"], r["index_bytes"]))
+    return max(front, key=lambda r: r["recall_at_k"])
+
+
+def main():
+    rng = np.random.default_rng(0)
+    faiss.omp_set_num_threads(THREADS)
+
+    # 1. Held-out queries & exact ground truth
+    base, queries = load_sets(rng)
+    dim  = base.shape[1]
+    flat = faiss.IndexFlatL2(dim)
+    flat.add(base)
+    _, truth = flat.search(queries, K)
+    print(f"📐 {len(base)} base vectors, {len(queries)} queries, k={K}")
+
+    # 2. Build & sweep every candidate
+    results = []
+    for factory in FACTORIES:
+        t0 = time.perf_counter()
+        index = faiss.index_factory(dim, factory)
+        if not index.is_trained:
+            sample = rng.choice(len(base), size=min(len(base), TRAIN_SAMPLE), replace=False)
+            index.train(base[np.sort(sample)])
+        index.add(base)
+        build_s = time.perf_counter() - t0
+        size    = int(faiss.serialize_index(index).nbytes)
+
+        for params in search_settings(index):
+            r = {"factory": factory, "params": params, "build_s": build_s, "index_bytes": size}
+            r.update(measure(index, queries, truth, params))
+            results.append(r)
+            print(
+                f"   {factory:<24} {json.dumps(params):<20} "
+                f"recall@{K}={r['recall_at_k']:.3f}  p50={r['p50_ms']:.2f}ms  "
+                f"p99={r['p99_ms']:.2f}ms  build={build_s:.1f}s  size={size / 2**20:.1f}MiB"
+            )
+
+    # 3. Pareto front & recommendation
+    front = pareto_front(results)
+    best  = recommend(front)
+    with open(TUNING_OUT, "w") as f:
+        json.dump(
+            {
+                "k": K,
+                "n_base": int(len(base)),
+                "n_queries": int(len(queries)),
+                "target_recall": TARGET_RECALL,
+                "results": results,
+                "pareto": front,
+                "recommended": best,
+            },
+            f,
+            indent=2,
+        )
+    print(f"🏁 Recommended: {best['factory']} {best['params']} (recall@{K}={best['recall_at_k']:.3f})")
+    print(f"✅ Wrote tuning results to {TUNING_OUT}")
+
+
+if __name__ == "__main__":
+    main()
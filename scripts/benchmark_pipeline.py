@@ -0,0 +1,398 @@
+# scripts/benchmark_pipeline.py
+"""
+Offline end-to-end benchmark: every pipeline stage and the per-query app
+path, on a synthetic corpus, compared against a stored baseline.
+
+1. Generate BENCH_ROWS synthetic tweets (generate_synthetic_corpus.py).
+2. Time the build stages: clean_tweet (per-tweet loop on a sample),
+   clean_tweets, annotate_budget, dedup, keyword / BM25 / FAISS index
+   builds and loading the CorpusStore.
+3. Time BENCH_QUERIES questions through each query stage (keyword_filter,
+   bm25, semantic_search cold and cached, hybrid_search,
+   extract_sentences, build_context, truncate_by_tokens) and through the
+   whole app path: date window → search → collapse → context → streamed
+   answer.
+4. Write the results to BENCH_OUT and compare them with BENCH_BASELINE:
+   a stage more than BENCH_TOLERANCE× slower (and BENCH_NOISE_MS slower
+   in absolute terms) is a regression, and the script exits non-zero.
+   BENCH_SAVE_BASELINE=true stores this run as the new baseline.
+
+Nothing leaves the machine. GPT responses are stubbed, and the embedding
+model is replaced by a hash-seeded random encoder over Gaussian-mixture
+corpus vectors, so the semantic stages measure FAISS, ID filtering and
+the caches rather than sentence-transformers. Stages whose dependency is
+missing (no tiktoken encoding data, no NLTK punkt) are recorded as
+skipped instead of failing the run. When later stages need a skipped
+stage's output, it is computed a simpler way without timing it (e.g.
+cleaning without stopword removal, every tweet its own dedup cluster).
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import platform
+import tempfile
+import subprocess
+import itertools
+import datetime as dt
+
+import numpy as np
+import polars as pl
+import faiss
+from dotenv import load_dotenv
+
+load_dotenv()
+from generate_synthetic_corpus import generate_tweets, CITIES, NEEDS
+from dedup_dataset import add_dedup_columns
+from benchmark_search import CANNED
+from timing import latency
+from quake_talk import gpt, search
+from quake_talk.bm25 import BM25Index, tokenize
+from quake_talk.context import annotate_budget, build_context, truncate_by_tokens, TOKEN_ENCODING
+from quake_talk.corpus import CorpusStore
+from quake_talk.keyword_index import KeywordIndex, keyword_filter
+from quake_talk.preprocessing.clean_text import clean_tweet, clean_tweets, extract_sentences, extract_keywords
+
+BENCH_ROWS     = int(os.getenv("BENCH_ROWS", 500_000))
+BENCH_SEED     = int(os.getenv("BENCH_SEED", 0))
+N_QUERIES      = int(os.getenv("BENCH_QUERIES", 200))
+CLEAN_SAMPLE   = int(os.getenv("BENCH_CLEAN_SAMPLE", 5_000))   # rows for the clean_tweet loop
+REPEATS        = int(os.getenv("BENCH_REPEATS", 1))            # best-of timing for build stages
+TOP_K          = int(os.getenv("BENCH_K", 300))                # the app's default "Max sentences"
+MAX_TOKENS     = int(os.getenv("MAX_CONTEXT_TOKENS", 8000))
+DIM            = int(os.getenv("BENCH_DIM", 384))
+FACTORY        = os.getenv("BENCH_INDEX_FACTORY", "IVF1024,SQ8")  # PQ training alone takes minutes
+TRAIN_SAMPLE   = int(os.getenv("BENCH_TRAIN_SAMPLE", 65_536))
+BENCH_OUT      = os.getenv("BENCH_OUT", "artifacts/benchmarks/pipeline.json")
+BENCH_BASELINE = os.getenv("BENCH_BASELINE", "artifacts/benchmarks/pipeline_baseline.json")
+SAVE_BASELINE  = os.getenv("BENCH_SAVE_BASELINE", "false").lower() == "true"
+TOLERANCE      = float(os.getenv("BENCH_TOLERANCE", 1.25))     # slower than baseline × this → regression
+NOISE_MS       = float(os.getenv("BENCH_NOISE_MS", 0.5))       # ...and by at least this much
+
+REMOVE_STOPWORDS = os.getenv("REMOVE_STOPWORDS", "true").lower() == "true"
+LEMMATIZE        = os.getenv("LEMMATIZE", "false").lower() == "true"
+
+
+class HashEncoder:
+    """Stand-in SentenceTransformer: a fixed random unit vector per text."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, batch_size: int = 64, **kwargs) -> np.ndarray:
+        out = np.empty((len(texts), self.dim), dtype="float32")
+        for i, t in enumerate(texts):
+            seed = int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "little")
+            out[i] = np.random.default_rng(seed).standard_normal(self.dim)
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+class WhitespaceEncoder:
+    """tiktoken-shaped fallback when the BPE data can't be downloaded."""
+
+    def encode(self, text: str) -> list[str]:
+        return text.split()
+
+    def decode(self, tokens: list[str]) -> str:
+        return " ".join(tokens)
+
+
+# ── Timing helpers ────────────────────────────────────────────────────
+
+def timed(fn, repeats: int = REPEATS) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(max(1, repeats)):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def throughput(seconds: float, rows: int) -> dict:
+    return {"rows": rows, "seconds": round(seconds, 6), "rows_per_s": round(rows / max(seconds, 1e-9), 1)}
+
+SKIPPABLE = (ImportError, LookupError, OSError, ValueError)   # missing model data, punkt, …
+
+def _skip(stages: dict, name: str, e: Exception) -> None:
+    stages[name] = {"skipped": f"{type(e).__name__}: {e}".splitlines()[0][:200]}
+    print(f"   {name:<24} skipped ({stages[name]['skipped']})")
+
+def build_stage(
+    stages: dict, name: str, fn, rows: int, repeats: int = REPEATS, fallback=None, required: bool = False,
+):
+    """
+    Time fn() (best of `repeats`) as a throughput stage; returns its value.
+    A skipped stage returns fallback() (untimed), or None without one;
+    `required` stages without a usable fallback abort the run instead.
+    """
+    try:
+        seconds, out = timed(fn, repeats)
+    except SKIPPABLE as e:
+        _skip(stages, name, e)
+        try:
+            if fallback is not None:
+                return fallback()
+        except SKIPPABLE as e2:
+            e = e2
+        if required:
+            raise SystemExit(f"❌ Later stages need {name}, which cannot run here: {e}".splitlines()[0]) from e
+        return None
+    stages[name] = throughput(seconds, rows)
+    print(f"   {name:<24} {seconds:9.3f}s  {stages[name]['rows_per_s']:>12,.0f} rows/s")
+    return out
+
+def query_stage(stages: dict, name: str, fn, inputs) -> None:
+    """Time fn(x) per input as a latency stage."""
+    try:
+        stages[name] = latency(fn, inputs)
+    except SKIPPABLE as e:
+        return _skip(stages, name, e)
+    print(f"   {name:<24} p50={stages[name]['p50_ms']:9.3f}ms  p95={stages[name]['p95_ms']:9.3f}ms")
+
+
+# ── Baseline comparison ───────────────────────────────────────────────
+
+def compare(current: dict, baseline: dict, tolerance: float = TOLERANCE, noise_ms: float = NOISE_MS) -> list[dict]:
+    """
+    One entry per stage present (and not skipped) in both runs, with the
+    ratio of its headline metric – `seconds` for build stages, `p50_ms`
+    for query stages – and whether it counts as a regression.
+    """
+    rows = []
+    for name, now in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base or "skipped" in now or "skipped" in base:
+            continue
+        metric = "p50_ms" if "p50_ms" in now else "seconds"
+        if metric not in base:
+            continue
+        scale  = 1.0 if metric == "p50_ms" else 1e3
+        ratio  = now[metric] / max(base[metric], 1e-9)
+        slower = (now[metric] - base[metric]) * scale
+        rows.append({
+            "stage": name,
+            "metric": metric,
+            "baseline": base[metric],
+            "current": now[metric],
+            "ratio": round(ratio, 3),
+            "regression": ratio > tolerance and slower > noise_ms,
+        })
+    return rows
+
+def comparable(current: dict, baseline: dict) -> list[str]:
+    """Settings that differ between the runs (results would not be like for like)."""
+    keys = ("rows", "queries", "top_k", "dim", "index_factory", "token_encoder", "seed")
+    return [k for k in keys if current["meta"].get(k) != baseline.get("meta", {}).get(k)]
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────
+
+def questions(n: int) -> list[str]:
+    """Distinct questions (so the cold semantic stage misses the caches)."""
+    combos = itertools.islice(itertools.cycle(itertools.product(NEEDS, CITIES, CANNED)), n)
+    return [f"{q.rstrip('?')} about {need} in {city}?" for need, city, q in combos]
+
+def keywords(question: str) -> list[str]:
+    """extract_keywords(), or its plain token split without NLTK wordnet."""
+    try:
+        return extract_keywords(question)
+    except LookupError:
+        return tokenize(question)
+
+def token_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKEN_ENCODING), TOKEN_ENCODING
+    except Exception:
+        return WhitespaceEncoder(), "whitespace"
+
+def install_stubs(index_path: str, dim: int) -> None:
+    """Point quake_talk.search at the synthetic index and encoder; stub GPT."""
+    encoder = HashEncoder(dim)
+    search.SEARCH_SERVER_URL     = ""
+    search.INDEX_FILE            = index_path
+    search._load_faiss_index     = lambda path: faiss.read_index(path)
+    search._load_embedding_model = lambda name: encoder
+    search.registry.clear()
+
+    async def stream(system, user, temperature, max_tokens):
+        for word in ("Stubbed", " answer", " from", " the", " benchmark."):
+            yield word
+    gpt._astream_gpt = stream
+
+def undeduped(df: pl.DataFrame) -> pl.DataFrame:
+    """Dedup columns with every tweet its own cluster."""
+    ids = pl.int_range(0, pl.len(), dtype=pl.Int64)
+    return df.with_columns(ids.alias("cluster_id"), ids.alias("rep_id"), pl.lit(1, dtype=pl.UInt32).alias("dup_count"))
+
+def build_index(dim: int, ids: np.ndarray, rng: np.random.Generator) -> faiss.Index:
+    """Gaussian-mixture vectors for `ids`, added with explicit row IDs."""
+    centers = rng.standard_normal((256, dim)).astype("float32")
+    vecs    = centers[rng.integers(len(centers), size=len(ids))]
+    vecs   += 0.5 * rng.standard_normal(vecs.shape, dtype="float32")
+    vecs   /= np.linalg.norm(vecs, axis=1, keepdims=True)
+
+    index = faiss.index_factory(dim, FACTORY)
+    if not index.is_trained:
+        sample = rng.choice(len(vecs), size=min(len(vecs), TRAIN_SAMPLE), replace=False)
+        index.train(vecs[np.sort(sample)])
+    if faiss.try_extract_index_ivf(index) is None:
+        index = faiss.IndexIDMap(index)
+    index.add_with_ids(vecs, ids.astype("int64"))
+    return index
+
+def clear_search_caches() -> None:
+    for cache in (search._query_cache, search._result_cache):
+        if cache is not None:
+            cache.clear()
+
+def windows(store: CorpusStore, n: int, rng: np.random.Generator) -> list:
+    """Random 1–7 day date windows, like the app's date picker."""
+    span = (store.max_date - store.min_date).days + 1
+    out  = []
+    for _ in range(n):
+        start = store.min_date + dt.timedelta(days=int(rng.integers(span)))
+        out.append(store.date_window(start, start + dt.timedelta(days=int(rng.integers(1, 8)))))
+    return out
+
+def main():
+    rng     = np.random.default_rng(BENCH_SEED)
+    stages  = {}
+    enc, enc_name = token_encoder()
+    qs      = questions(N_QUERIES)
+    print(f"📐 {BENCH_ROWS} synthetic rows, {len(qs)} queries, k={TOP_K}, token encoder {enc_name}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1. Synthetic corpus
+        raw = build_stage(stages, "generate", lambda: generate_tweets(BENCH_ROWS, seed=BENCH_SEED), BENCH_ROWS, 1, required=True)
+
+        # 2. Build stages
+        sample = raw["content"].head(CLEAN_SAMPLE).to_list()
+        build_stage(stages, "clean_tweet", lambda: [
+            clean_tweet(t, remove_stopwords=REMOVE_STOPWORDS, lemmatize=LEMMATIZE) for t in sample
+        ], len(sample))
+        # skipped (e.g. no NLTK stopwords) → later stages get the plain cleaning
+        cleaned = build_stage(stages, "clean_tweets", lambda: clean_tweets(
+            raw["content"], remove_stopwords=REMOVE_STOPWORDS, lemmatize=LEMMATIZE,
+        ), raw.height, fallback=lambda: clean_tweets(raw["content"], remove_stopwords=False, lemmatize=False), required=True)
+        df = raw.with_columns(pl.Series("content_clean", cleaned, dtype=pl.Utf8)).sort("date", maintain_order=True)
+
+        df = build_stage(stages, "annotate_budget", lambda: annotate_budget(df), df.height, fallback=lambda: df)
+        df = build_stage(stages, "dedup", lambda: add_dedup_columns(df), df.height, fallback=lambda: undeduped(df))
+        reps = np.flatnonzero(df["rep_id"].to_numpy() == np.arange(df.height))
+
+        kw_index = build_stage(stages, "keyword_index_build", lambda: KeywordIndex.build(df["content_clean"]), df.height, required=True)
+        bm25     = build_stage(stages, "bm25_build", lambda: BM25Index.build(df["content_clean"], ids=reps), len(reps), required=True)
+        index    = build_stage(stages, "index_build", lambda: build_index(DIM, reps, np.random.default_rng(BENCH_SEED)), len(reps), 1, required=True)
+
+        parquet    = os.path.join(tmp, "corpus.parquet")
+        index_path = os.path.join(tmp, "bench.index")
+        df.write_parquet(parquet)
+        faiss.write_index(index, index_path)
+        store = build_stage(stages, "corpus_load", lambda: CorpusStore.load(parquet), df.height, required=True)
+
+        install_stubs(index_path, DIM)
+        search.BM25_INDEX_FILE = os.path.join(tmp, "bm25.npz")
+        bm25.save(search.BM25_INDEX_FILE)
+
+        # 3. Query stages (each job: question + date window filter)
+        wins = windows(store, len(qs), rng)
+        jobs = [(q, store.id_filter(w)) for q, w in zip(qs, wins)]
+        kws  = [(keywords(q), w) for q, w in zip(qs, wins)]
+
+        query_stage(stages, "keyword_filter", lambda j: keyword_filter(store, j[1], j[0], kw_index), kws)
+        query_stage(stages, "keyword_filter_scan", lambda j: keyword_filter(store, j[1], j[0]), kws[:20])
+        query_stage(stages, "bm25_search", lambda j: bm25.search(tokenize(j[0]), TOP_K, **j[1]), jobs)
+        clear_search_caches()
+        query_stage(stages, "semantic_search", lambda j: search.semantic_search(j[0], TOP_K, **j[1]), jobs)
+        query_stage(stages, "semantic_search_cached", lambda j: search.semantic_search(j[0], TOP_K, **j[1]), jobs)
+        query_stage(stages, "hybrid_search", lambda j: search.hybrid_search(j[0], TOP_K, **j[1]), jobs)
+
+        hits  = [store.collapse(search.semantic_search(q, TOP_K, **f)[0], "cluster_id") for q, f in jobs]
+        texts = [store.texts(h) for h in hits]
+        query_stage(stages, "extract_sentences", lambda t: extract_sentences(t, TOP_K), texts)
+        if "sent_tokens" in df.columns:
+            query_stage(stages, "build_context", lambda h: build_context(
+                store.take(h).select("content_clean", "sent_ends", "sent_tokens").iter_rows(), TOP_K, MAX_TOKENS,
+            ), hits)
+        query_stage(stages, "truncate_by_tokens", lambda t: truncate_by_tokens(" ".join(t), MAX_TOKENS, enc), texts)
+
+        # the app's per-question path (Semantic mode), GPT stubbed
+        def app_query(job):
+            question, id_filter = job
+            idxs, _ = search.semantic_search(question, top_k=TOP_K, **id_filter)
+            subset  = store.take(store.collapse(idxs, "cluster_id"))
+            if "sent_tokens" in subset.columns:
+                rows = subset.select("content_clean", "sent_ends", "sent_tokens").iter_rows()
+                ctx  = build_context(rows, TOP_K, MAX_TOKENS, enc)
+            else:
+                raw_ctx = " ".join(extract_sentences(subset["content_clean"].to_list(), TOP_K))
+                ctx     = truncate_by_tokens(raw_ctx, MAX_TOKENS, enc)
+            return asyncio.run(_drain(gpt.astream_ask(question, ctx)))
+
+        clear_search_caches()
+        query_stage(stages, "app_query", app_query, jobs)
+
+    # 4. Write results & compare against the baseline
+    result = {
+        "meta": {
+            "created": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "rows": BENCH_ROWS,
+            "queries": len(qs),
+            "top_k": TOP_K,
+            "dim": DIM,
+            "index_factory": FACTORY,
+            "token_encoder": enc_name,
+            "seed": BENCH_SEED,
+            "representatives": int(len(reps)),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "stages": stages,
+    }
+    os.makedirs(os.path.dirname(BENCH_OUT) or ".", exist_ok=True)
+    with open(BENCH_OUT, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"✅ Results written to {BENCH_OUT}")
+
+    if SAVE_BASELINE:
+        os.makedirs(os.path.dirname(BENCH_BASELINE) or ".", exist_ok=True)
+        with open(BENCH_BASELINE, "w") as f:
+            json.dump(result, f, indent=2)
+        return print(f"📌 Baseline saved to {BENCH_BASELINE}")
+    if not os.path.exists(BENCH_BASELINE):
+        return print(f"ℹ️  No baseline at {BENCH_BASELINE}; rerun with BENCH_SAVE_BASELINE=true to store one")
+
+    with open(BENCH_BASELINE) as f:
+        baseline = json.load(f)
+    if differs := comparable(result, baseline):
+        print(f"⚠️  Baseline was run with different settings ({', '.join(differs)}); ratios are indicative only")
+    rows = compare(result, baseline)
+    for r in rows:
+        flag = "❌" if r["regression"] else ("🚀" if r["ratio"] < 1 / TOLERANCE else "  ")
+        print(f"{flag} {r['stage']:<24} {r['metric']:<8} {r['baseline']:>12.4f} → {r['current']:>12.4f}  ×{r['ratio']:.2f}")
+    regressions = [r["stage"] for r in rows if r["regression"]]
+    if regressions:
+        raise SystemExit(f"❗ {len(regressions)} regression(s) vs baseline: {', '.join(regressions)}")
+    print(f"✅ No regressions vs baseline (tolerance ×{TOLERANCE})")
+
+async def _drain(stream) -> str:
+    return "".join([delta async for delta in stream])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# scripts/benchmark_search.py
+"""
+Throughput of semantic_search_many() against a loop of semantic_search().
+
+Runs BENCH_QUESTIONS questions (lines of BENCH_QUESTIONS_FILE, or a
+built-in canned set, cycled to length) through both paths against the
+configured model and INDEX_FILE, after one warm-up call that loads both.
+Reports queries/s for each, the speedup, and how far the top-k hits of
+the two paths agree (batched encoding pads inputs, so float rounding can
+reorder near-ties).
+"""
+
+import os
+import time
+import itertools
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+from quake_talk.search import semantic_search, semantic_search_many
+
+QUESTIONS_FILE = os.getenv("BENCH_QUESTIONS_FILE")            # optional, one question per line
+N_QUESTIONS    = int(os.getenv("BENCH_QUESTIONS", 256))
+K              = int(os.getenv("BENCH_K", 10))
+REPEATS        = int(os.getenv("BENCH_REPEATS", 3))           # best-of timing
+
+CANNED = [
+    "What were the main concerns expressed?",
+    "Where were people asking for rescue teams?",
+    "How did people describe the aid distribution?",
+    "Which cities reported the most damage?",
+    "What did people say about the government response?",
+    "Were there complaints about shelter or tents?",
+    "How did international aid get mentioned?",
+    "What was said about missing family members?",
+]
+
+
+def load_questions() -> list[str]:
+    if QUESTIONS_FILE:
+        with open(QUESTIONS_FILE, encoding="utf-8") as f:
+            base = [line.strip() for line in f if line.strip()]
+    else:
+        base = CANNED
+    return list(itertools.islice(itertools.cycle(base), N_QUESTIONS))
+
+
+def best_time(fn) -> tuple[float, object]:
+    best, out = float("inf"), None
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    questions = load_questions()
+
+    # 1. Warm-up: load model & index outside the timed region
+    semantic_search(questions[0], top_k=K)
+
+    # 2. Looped single-question path vs one batched call
+    loop_s,  looped  = best_time(lambda: [semantic_search(q, top_k=K) for q in questions])
+    batch_s, batched = best_time(lambda: semantic_search_many(questions, top_k=K))
+
+    # 3. Agreement of the two result sets
+    overlap = np.mean([
+        len(set(a[0]) & set(b[0])) / max(1, len(a[0]))
+        for a, b in zip(looped, batched)
+    ])
+
+    n = len(questions)
+    print(f"📐 {n} questions, k={K}, best of {REPEATS}")
+    print(f"   looped  semantic_search:      {loop_s:7.3f}s  {n / loop_s:8.1f} q/s")
+    print(f"   batched semantic_search_many: {batch_s:7.3f}s  {n / batch_s:8.1f} q/s")
+    print(f"✅ Speedup ×{loop_s / batch_s:.1f}, top-{K} overlap {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
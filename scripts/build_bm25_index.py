@@ -0,0 +1,30 @@
+# scripts/build_bm25_index.py
+import os
+import numpy as np
+import polars as pl
+from dotenv import load_dotenv
+from quake_talk.bm25 import BM25Index
+
+load_dotenv()
+PARQUET_IN = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+INDEX_OUT  = os.getenv("BM25_INDEX_FILE", "artifacts/bm25_index.npz")
+K1         = float(os.getenv("BM25_K1", 1.2))
+B          = float(os.getenv("BM25_B", 0.75))
+
+def main():
+    # 1. Load cleaned tweets (row order = FAISS / app row IDs)
+    schema = pl.read_parquet_schema(PARQUET_IN)
+    df = pl.read_parquet(PARQUET_IN, columns=["content_clean"] + (["rep_id"] if "rep_id" in schema else []))
+
+    # 2. Score & invert – only dedup representatives, like the FAISS index
+    ids = None
+    if "rep_id" in df.columns:
+        ids = np.flatnonzero(df["rep_id"].to_numpy() == np.arange(df.height))
+    index = BM25Index.build(df["content_clean"], ids=ids, k1=K1, b=B)
+
+    # 3. Save
+    index.save(INDEX_OUT)
+    print(f"✅ BM25-indexed {len(index.terms)} terms / {len(index.doc_ids)} postings at {INDEX_OUT}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# scripts/build_daily_aggregates.py
+"""
+Materialize per-day aggregates (see quake_talk.aggregates) for the app's
+Overview mode: tweet counts, top terms and embedding sums per day, plus,
+with AGG_SUMMARIES=true, one cached GPT summary per day.
+
+Run after build_embeddings.py (the embedding sums are skipped when
+EMBEDDING_FILE is missing or does not match the Parquet). Summaries from
+a previous build are kept for days whose tweet count is unchanged, so a
+re-run after ingest.py only summarizes the days that got new tweets.
+"""
+
+import os
+import time
+import asyncio
+import numpy as np
+import polars as pl
+from dotenv import load_dotenv
+
+load_dotenv()
+from quake_talk.aggregates import build_daily_aggregates, carry_summaries, day_expr
+from quake_talk.context import chunk_by_tokens
+from quake_talk.gpt import summarize_map_reduce
+
+PARQUET_IN     = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+EMB_FILE       = os.getenv("EMBEDDING_FILE", "artifacts/tweet_embeddings.npy")
+AGG_OUT        = os.getenv("DAILY_AGGREGATES_FILE", "artifacts/daily_aggregates.parquet")
+SUMMARIES      = os.getenv("AGG_SUMMARIES", "false").lower() == "true"
+SUMMARY_CHUNKS = int(os.getenv("AGG_SUMMARY_CHUNKS", 4))          # map calls per day (API-cost cap)
+CHUNK_TOKENS   = int(os.getenv("SUMMARY_CHUNK_TOKENS", 3000))
+
+def summarize_days(agg: pl.DataFrame, df: pl.DataFrame) -> pl.DataFrame:
+    """Fill missing summaries: each day's most-shared distinct tweets, map-reduced."""
+    todo = agg.filter(pl.col("summary").is_null())["day"].to_list()
+    if not todo:
+        return agg
+    if "rep_id" in df.columns:
+        # representatives only, most duplicated first
+        df = df.filter(pl.col("rep_id") == pl.int_range(0, pl.len())).sort("dup_count", descending=True)
+    df = df.with_columns(day_expr(df["date"].dtype)).filter(pl.col("day").is_in(todo))
+
+    summaries = {}
+    for day, tweets in df.group_by("day", maintain_order=True):
+        day    = day[0] if isinstance(day, tuple) else day
+        texts  = tweets["content_clean"].to_list()
+        counts = tweets["n_tokens"].to_list() if "n_tokens" in tweets.columns else [len(t.split()) for t in texts]
+        chunks = chunk_by_tokens(texts, counts, CHUNK_TOKENS)[:SUMMARY_CHUNKS]
+        summaries[day] = asyncio.run(summarize_map_reduce(chunks))
+        print(f"   📝 {day}: {len(texts)} tweets → {len(chunks)} batches")
+
+    filled = pl.DataFrame({"day": list(summaries), "_new": list(summaries.values())}, schema={"day": pl.Date, "_new": pl.Utf8})
+    return (
+        agg.join(filled, on="day", how="left", coalesce=True)
+           .with_columns(pl.coalesce("summary", "_new").alias("summary"))
+           .drop("_new")
+    )
+
+def main():
+    start = time.perf_counter()
+
+    # 1. Load cleaned tweets (+ row-aligned embeddings when they match)
+    schema  = pl.read_parquet_schema(PARQUET_IN)
+    columns = ["date", "content_clean"] + [c for c in ("cluster_id", "rep_id", "dup_count", "n_tokens") if c in schema]
+    df      = pl.read_parquet(PARQUET_IN, columns=columns)
+    emb     = np.load(EMB_FILE, mmap_mode="r") if os.path.exists(EMB_FILE) else None
+    if emb is not None and emb.shape[0] != df.height:
+        print(f"⚠️  {EMB_FILE} has {emb.shape[0]} rows, Parquet {df.height}; skipping embedding centroids")
+        emb = None
+
+    # 2. Aggregate per day
+    agg = build_daily_aggregates(df, emb)
+    if os.path.exists(AGG_OUT):
+        agg = carry_summaries(agg, pl.read_parquet(AGG_OUT))
+
+    # 3. Optional per-day GPT summaries (only days without one)
+    if SUMMARIES:
+        agg = summarize_days(agg, df)
+
+    # 4. Save (atomically: the app reloads the file by mtime)
+    tmp = AGG_OUT + ".tmp"
+    agg.write_parquet(tmp)
+    os.replace(tmp, AGG_OUT)
+    print(
+        f"✅ {agg.height} days ({df.height} tweets, "
+        f"{agg['summary'].is_not_null().sum()} summaries) → {AGG_OUT} in {time.perf_counter() - start:.1f}s"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,104 @@ import numpy as np
 import polars as pl
 from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
+from quake_talk.embedding_cache import EmbeddingCache
 
 load_dotenv()
 EMODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
 PARQUET_IN = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
 EMB_OUT    = os.getenv("EMBEDDING_FILE", "artifacts/tweet_embeddings.npy")
+STREAMING  = os.getenv("STREAMING", "false").lower() == "true"
+BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 50_000))   # rows per chunk in streaming mode
+CACHE_DIR  = os.getenv("EMBED_CACHE_DIR", "artifacts/embedding_cache")  # "" disables the cache
+EMB_DTYPE  = os.getenv("EMBEDDING_DTYPE", "float32")   # float16 halves the re-rank mmap
+
+def make_encoder(model: SentenceTransformer, show_progress_bar: bool):
+    """
+    Returns (encode, cache): encode(texts) goes through the content-addressed
+    cache when EMBED_CACHE_DIR is set, so only unseen texts hit the model.
+    """
+    def raw_encode(texts):
+        return model.encode(texts, show_progress_bar=show_progress_bar)
+
+    if not CACHE_DIR:
+        return raw_encode, None
+    cache = EmbeddingCache(CACHE_DIR, EMODEL)
+    dim   = model.get_sentence_embedding_dimension()
+    return (lambda texts: cache.encode(texts, raw_encode, dim)), cache
+
+def report_cache(cache: EmbeddingCache | None) -> None:
+    if cache is not None:
+        print(
+            f"♻️  Embedding cache: {cache.hits} reused / {cache.misses} encoded "
+            f"(hit ratio {cache.hit_ratio:.1%})"
+        )
+
+def input_columns() -> list[str]:
+    """content_clean, plus rep_id once dedup_dataset.py has run."""
+    return ["content_clean"] + (["rep_id"] if "rep_id" in pl.read_parquet_schema(PARQUET_IN) else [])
+
+def encode_into(out: np.ndarray, encode, df: pl.DataFrame, offset: int = 0) -> None:
+    """
+    Fill out[offset:offset + len(df)]. With a rep_id column only
+    representatives are encoded; every other row copies its
+    representative's vector (a rep never comes after its duplicates).
+    Rows with a negative rep_id are left for the caller (ingest.py copies
+    duplicates of already-embedded rows itself).
+    """
+    if "rep_id" not in df.columns:
+        out[offset:offset + df.height] = encode(df["content_clean"].to_list())
+        return
+    rep    = df["rep_id"].to_numpy()
+    rows   = np.arange(offset, offset + df.height)
+    is_rep = rep == rows
+    if is_rep.any():
+        out[rows[is_rep]] = encode(df["content_clean"].filter(pl.Series(is_rep)).to_list())
+    dup    = ~is_rep & (rep >= 0)
+    out[rows[dup]] = out[rep[dup]]
 
 def main():
+    if STREAMING:
+        return main_streaming()
+
     # 1. Load cleaned tweets
-    df = pl.read_parquet(PARQUET_IN, columns=["content_clean"])
-    texts = df["content_clean"].to_list()
+    df = pl.read_parquet(PARQUET_IN, columns=input_columns())
 
-    # 2. Encode
+    # 2. Encode (representatives only; only texts missing from the cache)
     model = SentenceTransformer(EMODEL)
-    embeddings = model.encode(texts, show_progress_bar=True)
+    encode, cache = make_encoder(model, show_progress_bar=True)
+    embeddings = np.empty((df.height, model.get_sentence_embedding_dimension()), dtype=EMB_DTYPE)
+    encode_into(embeddings, encode, df)
+    report_cache(cache)
 
     # 3. Save
     np.save(EMB_OUT, embeddings)
     print(f"✅ Saved {embeddings.shape[0]} embeddings to {EMB_OUT}")
 
+def main_streaming():
+    """
+    Encode BATCH_SIZE rows at a time straight into a memory-mapped .npy,
+    so neither the texts nor the full matrix are ever held in RAM.
+    """
+    # 1. Count rows without loading them
+    lf = pl.scan_parquet(PARQUET_IN).select(input_columns())
+    n  = lf.select(pl.len()).collect().item()
+
+    # 2. Pre-allocate the output (same .npy format as np.save)
+    model = SentenceTransformer(EMODEL)
+    dim   = model.get_sentence_embedding_dimension()
+    out   = np.lib.format.open_memmap(EMB_OUT, mode="w+", dtype=EMB_DTYPE, shape=(n, dim))
+    encode, cache = make_encoder(model, show_progress_bar=False)
+
+    # 3. Encode chunk by chunk
+    for start in range(0, n, BATCH_SIZE):
+        df = lf.slice(start, BATCH_SIZE).collect()
+        encode_into(out, encode, df, offset=start)
+        out.flush()
+        print(f"   … encoded {start + df.height}/{n}")
+
+    del out
+    report_cache(cache)
+    print(f"✅ Saved {n} embeddings to {EMB_OUT}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,8 @@
 # scripts/build_index.py
 import os
+import json
 import numpy as np
+import polars as pl
 import faiss
 from dotenv import load_dotenv
 
@@ -10,20 +12,154 @@ INDEX_OUT = os.getenv("INDEX_FILE", "artifacts/tweets.index")
 PQ_BYTES  = int(os.getenv("PQ_BYTES", 96))        # 96 → PQ96
 N_LIST    = int(os.getenv("IVF_NLIST", 1024))     # number of Voronoi cells
 EMB_FILE  = os.getenv("EMBEDDING_FILE", "artifacts/tweet_embeddings.npy")
+PARQUET_IN = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+STREAMING    = os.getenv("STREAMING", "false").lower() == "true"
+BATCH_SIZE   = int(os.getenv("STREAM_BATCH_SIZE", 50_000))    # vectors per index.add
+TRAIN_SAMPLE = int(os.getenv("IVF_TRAIN_SAMPLE", N_LIST * 256))  # vectors used for training
+INDEX_FACTORY = os.getenv("INDEX_FACTORY")                        # e.g. "OPQ96,IVF1024,PQ96"
+TUNING_FILE   = os.getenv("INDEX_TUNING_FILE", INDEX_OUT + ".tuning.json")
+META_FILE     = os.getenv("INDEX_META_FILE", INDEX_OUT + ".meta.json")     # drift baseline for ingest.py
+
+def index_config() -> tuple[str, dict]:
+    """
+    Factory string & search params: INDEX_FACTORY if set, else the
+    recommendation written by benchmark_index.py, else IVF{N_LIST},PQ{PQ_BYTES}.
+    """
+    if INDEX_FACTORY:
+        return INDEX_FACTORY, {}
+    if os.path.exists(TUNING_FILE):
+        with open(TUNING_FILE) as f:
+            best = json.load(f)["recommended"]
+        return best["factory"], best["params"]
+    return f"IVF{N_LIST},PQ{PQ_BYTES}", {}
+
+def new_index() -> tuple[faiss.Index, dict]:
+    factory, params = index_config()
+    print(f"🏗️  Building {factory} {params or ''}")
+    return faiss.index_factory(DIM, factory), params
+
+def representative_ids(n: int) -> np.ndarray | None:
+    """
+    Row IDs to index when dedup_dataset.py has run (rows that are their own
+    rep_id); None → index every row.
+    """
+    if not os.path.exists(PARQUET_IN) or "rep_id" not in pl.read_parquet_schema(PARQUET_IN):
+        return None
+    rep = pl.read_parquet(PARQUET_IN, columns=["rep_id"])["rep_id"].to_numpy()
+    if len(rep) != n:
+        print(f"⚠️  {PARQUET_IN} has {len(rep)} rows but {EMB_FILE} has {n}; indexing every row")
+        return None
+    ids = np.flatnonzero(rep == np.arange(n))
+    print(f"🧬 Indexing {len(ids)} representatives of {n} rows")
+    return ids
+
+def with_ids(index: faiss.Index, ids: np.ndarray | None) -> faiss.Index:
+    """IVF indexes take explicit IDs natively; anything else gets an IDMap."""
+    if ids is None or faiss.try_extract_index_ivf(index) is not None:
+        return index
+    return faiss.IndexIDMap(index)
+
+def add_batch(index: faiss.Index, vecs: np.ndarray, ids: np.ndarray | None) -> None:
+    if ids is None:
+        index.add(vecs)
+    else:
+        index.add_with_ids(vecs, ids.astype("int64"))
+
+def coarse_error(index: faiss.Index, vecs: np.ndarray) -> float | None:
+    """
+    Mean squared distance from `vecs` to their nearest IVF centroid – how
+    well the trained quantizer fits the data (None for non-IVF indexes).
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None or not len(vecs):
+        return None
+    x   = np.ascontiguousarray(vecs, dtype="float32")
+    top = faiss.downcast_index(index)
+    if isinstance(top, faiss.IndexPreTransform):   # e.g. OPQ rotation
+        for i in range(top.chain.size()):
+            x = top.chain.at(i).apply(x)
+    D, _ = ivf.quantizer.search(x, 1)
+    return float(D.mean())
+
+def list_imbalance(index: faiss.Index) -> float | None:
+    """FAISS imbalance factor of the inverted lists (1.0 = perfectly even)."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None or not ivf.ntotal:
+        return None
+    sizes = np.array([ivf.invlists.list_size(i) for i in range(ivf.nlist)], dtype=np.float64)
+    return float((sizes ** 2).sum() * ivf.nlist / sizes.sum() ** 2)
+
+def save_index(index: faiss.Index, params: dict, sample: np.ndarray) -> None:
+    """
+    Bake the tuned nprobe/efSearch into the index (both are serialized) and
+    record the quantizer's fit on `sample` as the drift baseline.
+    """
+    ps = faiss.ParameterSpace()
+    for name, value in params.items():
+        ps.set_index_parameter(index, name, value)
+    faiss.write_index(index, INDEX_OUT)
+    print(f"✅ Built FAISS index at {INDEX_OUT}")
+
+    meta = {
+        "generation": 1,
+        "indexed_rows": int(index.ntotal),
+        "appended_rows": 0,
+        "baseline_coarse_error": coarse_error(index, sample),
+        "baseline_imbalance": list_imbalance(index),
+    }
+    with open(META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
 
 def main():
-    # 1. Load embeddings
+    if STREAMING:
+        return main_streaming()
+
+    # 1. Load embeddings (only representatives after dedup)
     vecs = np.load(EMB_FILE).astype("float32")
+    ids  = representative_ids(len(vecs))
+    if ids is not None:
+        vecs = vecs[ids]
 
-    # 2. Build IVF + PQ index
-    quantizer = faiss.IndexFlatL2(DIM)
-    index = faiss.IndexIVFPQ(quantizer, DIM, N_LIST, PQ_BYTES, 8)
+    # 2. Build index (IVF + PQ unless tuned otherwise)
+    index, params = new_index()
     index.train(vecs)
-    index.add(vecs)
-    
+    index = with_ids(index, ids)
+    add_batch(index, vecs, ids)
+
     # 3. Serialize
-    faiss.write_index(index, INDEX_OUT)
-    print(f"✅ Built FAISS index at {INDEX_OUT}")
+    save_index(index, params, vecs[:TRAIN_SAMPLE])
+
+def main_streaming():
+    """
+    Train on a random sample and add vectors batch by batch from a
+    memory-mapped embedding file, keeping peak RSS ~ TRAIN_SAMPLE + BATCH_SIZE rows.
+    """
+    # 1. Map embeddings without loading them
+    vecs = np.load(EMB_FILE, mmap_mode="r")
+    n    = vecs.shape[0]
+    ids  = representative_ids(n)
+    rows = np.arange(n) if ids is None else ids
+
+    # 2. Train on a sample (sorted → sequential reads)
+    rng    = np.random.default_rng(0)
+    sample = np.sort(rng.choice(rows, size=min(len(rows), TRAIN_SAMPLE), replace=False))
+    index, params = new_index()
+    train = np.ascontiguousarray(vecs[sample], dtype="float32")
+    index.train(train)
+    index = with_ids(index, ids)
+
+    # 3. Add in batches (ascending IDs keep IVF lists sorted for range filters)
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        add_batch(
+            index,
+            np.ascontiguousarray(vecs[batch], dtype="float32"),
+            None if ids is None else batch,
+        )
+        print(f"   … added {min(start + BATCH_SIZE, len(rows))}/{len(rows)}")
+
+    # 4. Serialize
+    save_index(index, params, train)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
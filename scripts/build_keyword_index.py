@@ -0,0 +1,23 @@
+# scripts/build_keyword_index.py
+import os
+import polars as pl
+from dotenv import load_dotenv
+from quake_talk.keyword_index import KeywordIndex
+
+load_dotenv()
+PARQUET_IN = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+INDEX_OUT  = os.getenv("KEYWORD_INDEX_FILE", "artifacts/keyword_index.npz")
+
+def main():
+    # 1. Load cleaned tweets (row order = FAISS / app row IDs)
+    texts = pl.read_parquet(PARQUET_IN, columns=["content_clean"])["content_clean"]
+
+    # 2. Invert
+    index = KeywordIndex.build(texts)
+
+    # 3. Save
+    index.save(INDEX_OUT)
+    print(f"✅ Indexed {len(index.terms)} terms / {len(index.postings)} postings at {INDEX_OUT}")
+
+if __name__ == "__main__":
+    main()
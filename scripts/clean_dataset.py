@@ -16,8 +16,11 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # not strictly needed in Phase 1
 HF_TOKEN       = os.getenv("HF_TOKEN")
 
 # Section 2: Core script imports and configuration
+import time
+import tempfile
 import polars as pl
-from quake_talk.preprocessing.clean_text import clean_tweet
+from quake_talk.preprocessing.clean_text import clean_tweets
+from quake_talk.context import annotate_budget
 
 # Determine input and output paths (override via env vars if set)
 RAW_CSV         = os.getenv("RAW_CSV", "data/tweets_english.csv")
@@ -28,29 +31,66 @@ CLEANED_CSV     = os.getenv("CLEANED_CSV", None)  # e.g., "artifacts/tweets_clea
 REMOVE_STOPWORDS = os.getenv("REMOVE_STOPWORDS", "true").lower() == "true"
 LEMMATIZE        = os.getenv("LEMMATIZE",      "false").lower() == "true"
 
+# Batch engine options: spaCy worker processes and nlp.pipe batch size
+N_PROCESS  = int(os.getenv("CLEAN_N_PROCESS", 1))
+BATCH_SIZE = int(os.getenv("CLEAN_BATCH_SIZE", 1000))
+
+# Out-of-core mode: clean STREAM_BATCH_SIZE rows at a time (bounded memory)
+STREAMING         = os.getenv("STREAMING", "false").lower() == "true"
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 50_000))
+
+
+def clean_frame(df: pl.DataFrame, timings: dict | None = None) -> pl.DataFrame:
+    """
+    Adds `content_clean` plus the per-tweet sentence boundaries and token
+    counts used by the context builder to a batch of raw tweets. Seconds
+    spent in each stage are added to `timings` ("clean", "annotate").
+    """
+    start   = time.perf_counter()
+    cleaned = clean_tweets(
+        df["content"],
+        remove_stopwords=REMOVE_STOPWORDS,
+        lemmatize=LEMMATIZE,
+        n_process=N_PROCESS,
+        batch_size=BATCH_SIZE,
+    )
+    df = df.with_columns(pl.Series("content_clean", cleaned, dtype=pl.Utf8))
+    cleaned_at = time.perf_counter()
+    df = annotate_budget(df)
+    if timings is not None:
+        timings["clean"]    = timings.get("clean", 0.0) + cleaned_at - start
+        timings["annotate"] = timings.get("annotate", 0.0) + time.perf_counter() - cleaned_at
+    return df
+
+
+def report_timings(n_rows: int, timings: dict, total: float) -> None:
+    """Cleaning throughput (clean_tweets alone), then the other stages."""
+    clean = timings.get("clean", 0.0)
+    print(
+        f"🧹 Cleaned {n_rows} rows in {clean:.1f}s ({n_rows / max(clean, 1e-9):,.0f} rows/s); "
+        f"sentence/token annotation {timings.get('annotate', 0.0):.1f}s, "
+        f"{total:.1f}s in total with I/O"
+    )
+
 
 def main() -> None:
     """
     Main entry point: reads raw tweets, cleans text, and writes output.
     """
+    if STREAMING:
+        return main_streaming()
+
     # 1. Read raw CSV into a Polars DataFrame
     df = pl.read_csv(RAW_CSV)
 
-    # 2. Apply cleaning to the tweet content column
-    df = df.with_columns(
-        pl.col("content")
-          .map_elements(
-              lambda txt: clean_tweet(
-                  txt,
-                  remove_stopwords=REMOVE_STOPWORDS,
-                  lemmatize=LEMMATIZE
-              ),
-              return_dtype=pl.Utf8
-          )
-          .alias("content_clean")
-    )
+    # 2. Apply batch cleaning to the tweet content column
+    start, timings = time.perf_counter(), {}
+    df = clean_frame(df, timings)
+    report_timings(df.height, timings, time.perf_counter() - start)
 
-    # 3. Write cleaned data to Parquet
+    # 3. Write cleaned data to Parquet, date-sorted so that a date window is
+    #    a contiguous row-ID (= FAISS ID) range downstream
+    df = df.sort("date", maintain_order=True)
     df.write_parquet(CLEANED_PARQUET, compression="zstd")
     print(f"✅ Cleaned data written to {CLEANED_PARQUET}")
 
@@ -60,5 +100,46 @@ def main() -> None:
         print(f"✅ Cleaned data CSV written to {CLEANED_CSV}")
 
 
+def main_streaming() -> None:
+    """
+    Out-of-core variant of main(): only one batch of raw rows is held in
+    memory at a time. Each cleaned batch is written as a Parquet part file,
+    and the parts are then streamed into the final output with sink_parquet.
+    """
+    out_dir = os.path.dirname(CLEANED_PARQUET) or "."
+    total   = 0
+    start   = time.perf_counter()
+    timings = {}
+
+    with tempfile.TemporaryDirectory(dir=out_dir) as parts_dir:
+        # 1. Read & clean the raw CSV batch by batch
+        reader = pl.read_csv_batched(RAW_CSV, batch_size=STREAM_BATCH_SIZE)
+        part   = 0
+        while batches := reader.next_batches(1):
+            # raw row number: the sort key that keeps same-timestamp tweets in input order
+            df = clean_frame(batches[0], timings).with_row_index("_row", offset=total)
+            df.write_parquet(os.path.join(parts_dir, f"part-{part:05d}.parquet"))
+            total += df.height
+            part  += 1
+            print(f"   … batch {part}: {total} rows")
+
+        report_timings(total, timings, time.perf_counter() - start)
+
+        # 2. Stream the parts into one date-sorted Parquet file (out-of-core
+        #    sort); ties keep input order, so row IDs match the in-memory mode
+        parts = pl.scan_parquet(os.path.join(parts_dir, "part-*.parquet"))
+        parts.sort(["date", "_row"]).drop("_row").sink_parquet(
+            CLEANED_PARQUET,
+            compression="zstd",
+            row_group_size=STREAM_BATCH_SIZE,
+        )
+    print(f"✅ Cleaned data written to {CLEANED_PARQUET}")
+
+    # 3. Optionally write a CSV copy
+    if CLEANED_CSV:
+        pl.scan_parquet(CLEANED_PARQUET).sink_csv(CLEANED_CSV)
+        print(f"✅ Cleaned data CSV written to {CLEANED_CSV}")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
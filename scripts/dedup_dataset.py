@@ -0,0 +1,114 @@
+# scripts/dedup_dataset.py
+"""
+Collapse retweets and copy-paste appeals in the cleaned Parquet.
+
+Run after clean_dataset.py and before build_embeddings.py / build_index.py.
+Adds three columns (row IDs refer to the date-sorted Parquet):
+
+    cluster_id  earliest row of the exact / near-duplicate cluster
+    rep_id      earliest row of the cluster on the same day – the only
+                rows that get embedded and indexed
+    dup_count   rows sharing this row's rep_id (its weight)
+
+Representatives are chosen per day so that a date-window search still
+finds a cluster on every day it appears.
+"""
+
+import os
+import time
+import numpy as np
+import polars as pl
+from dotenv import load_dotenv
+from quake_talk.preprocessing.dedup import duplicate_clusters
+
+load_dotenv()
+PARQUET   = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+NEAR      = os.getenv("DEDUP_NEAR", "true").lower() == "true"    # false → exact duplicates only
+THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))             # min estimated Jaccard
+NUM_PERM  = int(os.getenv("DEDUP_NUM_PERM", 64))
+BANDS     = int(os.getenv("DEDUP_BANDS", 16))
+SHINGLE   = int(os.getenv("DEDUP_SHINGLE", 3))                   # words per shingle
+
+DEDUP_COLUMNS = ("cluster_id", "rep_id", "dup_count")
+
+def _clusters(texts: pl.Series) -> np.ndarray:
+    return duplicate_clusters(
+        texts, near=NEAR, threshold=THRESHOLD,
+        num_perm=NUM_PERM, bands=BANDS, shingle=SHINGLE,
+    )
+
+def _day(dtype: pl.DataType) -> pl.Expr:
+    date = pl.col("date")
+    if dtype == pl.Utf8:
+        date = date.str.to_datetime(strict=False)
+    return date.dt.date().alias("_day")
+
+def add_dedup_columns(df: pl.DataFrame) -> pl.DataFrame:
+    """Add cluster_id / rep_id / dup_count to `df`."""
+    cluster = _clusters(df["content_clean"])
+
+    # one representative per cluster and day
+    return (
+        df.with_row_index("_row")
+          .with_columns(pl.Series("cluster_id", cluster), _day(df["date"].dtype))
+          .with_columns(pl.col("_row").min().over("cluster_id", "_day").cast(pl.Int64).alias("rep_id"))
+          .with_columns(pl.len().over("rep_id").cast(pl.UInt32).alias("dup_count"))
+          .drop("_row", "_day")
+    )
+
+def append_deduped(old: pl.DataFrame, new: pl.DataFrame) -> pl.DataFrame:
+    """
+    `old` (already deduped) followed by `new`, for ingest.py. New rows are
+    clustered together with the earliest row of every existing cluster, so
+    a retweet of an old tweet joins its cluster and, on a day that cluster
+    already has a representative, that representative. dup_count is
+    recounted over the whole corpus.
+    """
+    n     = old.height
+    heads = np.flatnonzero(old["cluster_id"].to_numpy() == np.arange(n))
+    label = _clusters(pl.concat([old["content_clean"].gather(heads), new["content_clean"]]))[len(heads):]
+    # label: position of the cluster's earliest member among heads + new rows
+    cluster = np.r_[heads, np.arange(n, n + new.height)][label]
+
+    new = new.with_columns(
+        pl.Series("cluster_id", cluster, dtype=old["cluster_id"].dtype),
+        pl.lit(None, dtype=pl.Int64).alias("rep_id"),
+        pl.lit(None, dtype=pl.UInt32).alias("dup_count"),
+    )
+    return (
+        pl.concat([old, new.select(old.columns)], how="vertical_relaxed")
+          .with_row_index("_row")
+          .with_columns(_day(old["date"].dtype))
+          .with_columns(
+              pl.when(pl.col("_row") >= n)
+                .then(pl.col("_row").min().over("cluster_id", "_day").cast(pl.Int64))
+                .otherwise(pl.col("rep_id"))
+                .alias("rep_id")
+          )
+          .with_columns(pl.len().over("rep_id").cast(pl.UInt32).alias("dup_count"))
+          .drop("_row", "_day")
+    )
+
+def main():
+    # 1. Load cleaned tweets (row order = FAISS / app row IDs)
+    df = pl.read_parquet(PARQUET)
+    df = df.drop([c for c in DEDUP_COLUMNS if c in df.columns])   # re-runs start fresh
+
+    # 2. Cluster exact & near duplicates, one representative per cluster and day
+    start = time.perf_counter()
+    df    = add_dedup_columns(df)
+    n_reps = df.select((pl.col("rep_id") == pl.int_range(0, pl.len())).sum()).item()
+    print(
+        f"🧬 {df.height} rows → {df['cluster_id'].n_unique()} clusters, "
+        f"{n_reps} representatives ({1 - n_reps / max(df.height, 1):.1%} fewer to embed) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    # 3. Rewrite the Parquet in place (atomically)
+    tmp = PARQUET + ".tmp"
+    df.write_parquet(tmp, compression="zstd")
+    os.replace(tmp, PARQUET)
+    print(f"✅ Dedup columns written to {PARQUET}")
+
+if __name__ == "__main__":
+    main()
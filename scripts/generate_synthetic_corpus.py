@@ -0,0 +1,150 @@
+# scripts/generate_synthetic_corpus.py
+"""
+Write a synthetic raw tweet CSV (same `date` / `content` columns as
+RAW_CSV) for benchmarks and pipeline smoke runs without the real data.
+
+Tweets are assembled from earthquake-themed templates with city names,
+needs, hashtags, @mentions, t.co URLs, HTML entities and emoji, so every
+cleaning step has something to strip. Dates follow the shape of a
+disaster-driven stream: a spike on the first day decaying over the
+following weeks, with a day/night cycle. A share of the rows are
+retweets / copy-paste appeals of an earlier tweet (exact duplicates) or
+lightly edited copies (near duplicates), drawn with a heavy tail so a
+few appeals are shared thousands of times.
+
+SYNTH_ROWS=500000 python scripts/generate_synthetic_corpus.py
+"""
+
+import os
+import time
+import numpy as np
+import polars as pl
+from dotenv import load_dotenv
+
+load_dotenv()
+OUT_CSV       = os.getenv("SYNTH_CSV", "data/tweets_synthetic.csv")
+N_ROWS        = int(os.getenv("SYNTH_ROWS", 500_000))
+SEED          = int(os.getenv("SYNTH_SEED", 0))
+START_DATE    = os.getenv("SYNTH_START", "2023-02-06")
+DAYS          = int(os.getenv("SYNTH_DAYS", 30))
+DUP_RATE      = float(os.getenv("SYNTH_DUP_RATE", 0.25))       # exact copies of an earlier tweet
+NEAR_DUP_RATE = float(os.getenv("SYNTH_NEAR_DUP_RATE", 0.10))  # edited copies (URL / tag / prefix)
+DECAY_DAYS    = float(os.getenv("SYNTH_DECAY_DAYS", 4))        # e-folding time of the volume spike
+
+CITIES = [
+    "Hatay", "Antakya", "Kahramanmaras", "Gaziantep", "Adiyaman", "Malatya",
+    "Iskenderun", "Osmaniye", "Diyarbakir", "Sanliurfa", "Aleppo", "Idlib",
+    "Jandaris", "Latakia", "Adana", "Elbistan",
+]
+NEEDS = [
+    "blankets", "tents", "water", "baby formula", "insulin", "generators",
+    "heaters", "excavators", "rescue teams", "blood donors", "food", "diapers",
+]
+PEOPLE = ["my family", "my cousin", "an old man", "two children", "our neighbours", "a pregnant woman"]
+ORGS   = ["@AFADBaskanlik", "@ahbap", "@WHO", "@UN", "@SyriaCivilDef", "@RedCrescent"]
+TAGS   = [
+    "#TurkeyEarthquake", "#deprem", "#SyriaEarthquake", "#Hatay", "#help",
+    "#earthquake", "#Turkey", "#Syria", "#PrayForTurkey", "#enkazaltındayım",
+]
+EMOJI  = ["🙏", "💔", "😢", "🆘", "‼️", "🇹🇷", "🇸🇾", "❤️"]
+TEMPLATES = [
+    "URGENT: {people} still under the rubble in {city}, {street} street. Please send {need}!",
+    "We need {need} and {need2} in {city} right now, temperatures are below zero",
+    "{org} is there anyone coordinating {need} delivery to {city}? Nobody has come for {hours} hours",
+    "Aftershock just hit {city} again, buildings that survived Monday are collapsing",
+    "Volunteers in {city} are asking for {need} &amp; {need2}. Drop-off point at the {place}",
+    "Rescue teams pulled {people} out alive in {city} after {hours} hours!!! Miracles happen",
+    "Death toll passed {count} according to officials. {city} is devastated",
+    "Why is aid not reaching {city}? Roads are open, {people} slept in the car again",
+    "Donated {need} through {org}, please do the same, every bit helps",
+    "Border crossing to {city} still closed, no {need} for days &gt; people are desperate",
+    "Our team arrived in {city} with {need}, heading to the {place} next",
+    "Phone lines are down in {city}, if you hear from {people} please contact me",
+]
+PLACES = ["stadium", "mosque", "hospital", "school", "airport", "city square", "bus station"]
+PREFIXES = ["RT ", "Please share: ", "Copying this: ", "‼️ ", ""]
+
+
+def _fill(rng: np.random.Generator, n: int) -> list[str]:
+    """`n` fresh tweets from the templates."""
+    t     = rng.integers(len(TEMPLATES), size=n)
+    pick  = lambda pool: rng.integers(len(pool), size=n)
+    need, need2, city, ppl, org, place = (
+        pick(NEEDS), pick(NEEDS), pick(CITIES), pick(PEOPLE), pick(ORGS), pick(PLACES),
+    )
+    street, hours, count = rng.integers(1, 400, n), rng.integers(6, 160, n), rng.integers(1, 50, n) * 1000
+    n_tags, has_url, has_emoji = rng.integers(0, 4, n), rng.random(n) < 0.4, rng.random(n) < 0.3
+
+    out = []
+    for i in range(n):
+        text = TEMPLATES[t[i]].format(
+            people=PEOPLE[ppl[i]], city=CITIES[city[i]], need=NEEDS[need[i]],
+            need2=NEEDS[need2[i]], org=ORGS[org[i]], place=PLACES[place[i]],
+            street=street[i], hours=hours[i], count=f"{count[i]:,}",
+        )
+        if n_tags[i]:
+            text += " " + " ".join(TAGS[j] for j in rng.choice(len(TAGS), n_tags[i], replace=False))
+        if has_url[i]:
+            text += f" https://t.co/{rng.bytes(5).hex()}"
+        if has_emoji[i]:
+            text += " " + EMOJI[rng.integers(len(EMOJI))]
+        out.append(text)
+    return out
+
+def _dates(rng: np.random.Generator, n: int) -> list[str]:
+    """Timestamps with an exponentially decaying daily volume and a diurnal cycle."""
+    day = np.minimum(rng.exponential(DECAY_DAYS, n), DAYS - 1e-6).astype(np.int64)
+    # busier in daytime: hour of day from a mixture peaking in the afternoon
+    hour = np.where(rng.random(n) < 0.8, rng.normal(15, 4, n), rng.uniform(0, 24, n)) % 24
+    secs = day * 86_400 + (hour * 3_600).astype(np.int64) + rng.integers(0, 3_600, n)
+    ts   = np.datetime64(START_DATE, "ms") + np.sort(secs) * 1_000
+    return pl.Series(ts).dt.strftime("%Y-%m-%d %H:%M:%S+00:00").to_list()
+
+def generate_tweets(
+    n: int,
+    seed: int = SEED,
+    dup_rate: float = DUP_RATE,
+    near_dup_rate: float = NEAR_DUP_RATE,
+) -> pl.DataFrame:
+    """
+    `n` raw tweets in (roughly) date order. Duplicates always copy an
+    earlier row, as retweets do; which row is Zipf-distributed over the
+    originals, so popular appeals are copied many times.
+    """
+    rng   = np.random.default_rng(seed)
+    kind  = rng.choice(3, size=n, p=[1 - dup_rate - near_dup_rate, dup_rate, near_dup_rate])
+    kind[0] = 0                                            # something to copy from
+    texts = np.array(_fill(rng, n), dtype=object)
+
+    origin = np.flatnonzero(kind == 0)
+    copies = np.flatnonzero(kind != 0)
+    # Zipf rank among the originals that came before each copy
+    n_prior = np.searchsorted(origin, copies)
+    rank    = np.minimum(rng.zipf(1.3, len(copies)), n_prior) - 1
+    texts[copies] = texts[origin[rank]]
+
+    near = copies[kind[copies] == 2]
+    for i in near:
+        edit = rng.integers(3)
+        if edit == 0:
+            texts[i] = PREFIXES[rng.integers(len(PREFIXES))] + texts[i]
+        elif edit == 1:
+            texts[i] = texts[i] + " " + TAGS[rng.integers(len(TAGS))]
+        else:
+            texts[i] = texts[i] + f" https://t.co/{rng.bytes(5).hex()}"
+
+    return pl.DataFrame({"date": _dates(rng, n), "content": texts.tolist()})
+
+def main():
+    start = time.perf_counter()
+    df = generate_tweets(N_ROWS)
+    os.makedirs(os.path.dirname(OUT_CSV) or ".", exist_ok=True)
+    df.write_csv(OUT_CSV)
+    print(
+        f"🧪 {df.height} synthetic tweets ({df['content'].n_unique()} distinct texts, "
+        f"{df['date'].min()[:10]} → {df['date'].max()[:10]}) in {time.perf_counter() - start:.1f}s"
+    )
+    print(f"✅ Written to {OUT_CSV}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# scripts/ingest.py
+"""
+Live ingest: append a CSV of new raw tweets (INGEST_CSV, same columns as
+RAW_CSV) to an existing build without re-cleaning, re-embedding or
+retraining anything that is already there.
+
+1. Clean the new rows only (same options as clean_dataset.py), date-sorted.
+   Their row IDs continue after the existing rows.
+2. When the corpus carries dedup columns, cluster them with each other and
+   with the existing clusters: a copy of an old tweet joins its cluster
+   (and that day's representative) and bumps its dup_count.
+3. Embed only the new representatives and write them to EMBEDDING_FILE
+   in place, right after the Parquet's rows: rows left over by an
+   interrupted ingest are overwritten, never kept.
+4. Append the rows to CLEANED_PARQUET (atomic replace).
+5. Add the new representatives to the trained index with add_with_ids
+   (atomic replace), then rebuild the keyword / BM25 indexes and the
+   daily aggregates if present.
+6. Report quantizer drift against the baseline build_index.py stored in
+   INDEX_META_FILE, and say when a full rebuild is due.
+
+Files are replaced in that order, so the index never references rows the
+Parquet does not have yet. A running app picks up the new generation on
+its next query: quake_talk.corpus and quake_talk.search reload by mtime.
+"""
+
+import os
+import json
+import time
+import numpy as np
+import polars as pl
+import faiss
+from dotenv import load_dotenv
+
+load_dotenv()
+from clean_dataset import clean_frame
+from dedup_dataset import append_deduped
+from build_embeddings import make_encoder, encode_into, report_cache, EMODEL, SentenceTransformer
+from build_index import coarse_error, list_imbalance, META_FILE
+from quake_talk.keyword_index import KeywordIndex
+from quake_talk.bm25 import BM25Index
+from quake_talk.aggregates import build_daily_aggregates, carry_summaries
+
+INGEST_CSV    = os.getenv("INGEST_CSV", "data/tweets_new.csv")
+PARQUET       = os.getenv("CLEANED_PARQUET", "artifacts/tweets_cleaned.parquet")
+EMB_FILE      = os.getenv("EMBEDDING_FILE", "artifacts/tweet_embeddings.npy")
+INDEX_FILE    = os.getenv("INDEX_FILE", "artifacts/tweets.index")
+KEYWORD_INDEX = os.getenv("KEYWORD_INDEX_FILE", "artifacts/keyword_index.npz")
+BM25_INDEX    = os.getenv("BM25_INDEX_FILE", "artifacts/bm25_index.npz")
+AGGREGATES    = os.getenv("DAILY_AGGREGATES_FILE", "artifacts/daily_aggregates.parquet")
+
+# Retrain when new data sits this much further from the centroids than the
+# training data did, lists got this much more uneven, or this share of the
+# index was never seen by training.
+DRIFT_ERROR_RATIO     = float(os.getenv("DRIFT_ERROR_RATIO", 1.2))
+DRIFT_IMBALANCE_RATIO = float(os.getenv("DRIFT_IMBALANCE_RATIO", 1.5))
+DRIFT_MAX_APPENDED    = float(os.getenv("DRIFT_MAX_APPENDED", 0.5))
+
+
+def append_npy(path: str, rows: np.ndarray, at: int | None = None) -> None:
+    """
+    Append rows to a 2-D .npy in place, after its first `at` rows (default:
+    all of them; later rows are overwritten). The data goes first and the
+    header's row count last, so readers (and a crash midway) see the old
+    array.
+    """
+    fmt = np.lib.format
+    with open(path, "r+b") as f:
+        version = fmt.read_magic(f)
+        read_header = fmt.read_array_header_1_0 if version == (1, 0) else fmt.read_array_header_2_0
+        shape, fortran, dtype = read_header(f)
+        data_at = f.tell()
+        rows = np.ascontiguousarray(rows, dtype=dtype)
+        if fortran or rows.shape[1:] != shape[1:]:
+            raise ValueError(f"cannot append {rows.shape} rows to {shape} array in {path}")
+        at = shape[0] if at is None else at
+        if not 0 <= at <= shape[0]:
+            raise ValueError(f"cannot append after row {at} of {shape} array in {path}")
+
+        new_shape = (at + len(rows),) + shape[1:]
+        header = repr({"descr": fmt.dtype_to_descr(dtype), "fortran_order": False, "shape": new_shape})
+        room   = data_at - (10 if version == (1, 0) else 12) - 1
+        if len(header) > room:
+            raise ValueError(f"no room to grow the header of {path}; rebuild it with build_embeddings.py")
+
+        f.seek(data_at + at * rows[0:1].nbytes)
+        f.write(rows.tobytes())
+        f.truncate()
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(data_at - room - 1)
+        f.write(header.ljust(room).encode("latin1") + b"\n")
+
+
+def add_ids_supported(index: faiss.Index) -> bool:
+    return (
+        faiss.try_extract_index_ivf(index) is not None
+        or isinstance(faiss.downcast_index(index), faiss.IndexIDMap)
+    )
+
+
+def write_atomic(write, path: str) -> None:
+    root, ext = os.path.splitext(path)
+    tmp = f"{root}.tmp{ext}"   # np.savez insists on the .npz suffix
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def drift_report(index: faiss.Index, new_vecs: np.ndarray, n_added: int) -> dict:
+    meta = {}
+    if os.path.exists(META_FILE):
+        with open(META_FILE) as f:
+            meta = json.load(f)
+    meta["generation"]    = meta.get("generation", 1) + 1
+    meta["appended_rows"] = meta.get("appended_rows", 0) + n_added
+
+    error, imbalance = coarse_error(index, new_vecs), list_imbalance(index)
+    base_error, base_imbalance = meta.get("baseline_coarse_error"), meta.get("baseline_imbalance")
+    entry = {
+        "generation": meta["generation"],
+        "rows": n_added,
+        "error_ratio": error / base_error if error is not None and base_error else None,
+        "imbalance_ratio": imbalance / base_imbalance if imbalance is not None and base_imbalance else None,
+        "appended_share": meta["appended_rows"] / max(int(index.ntotal), 1),
+    }
+    reasons = []
+    if entry["error_ratio"] is not None and entry["error_ratio"] > DRIFT_ERROR_RATIO:
+        reasons.append(f"new vectors sit {entry['error_ratio']:.2f}× further from their centroids")
+    if entry["imbalance_ratio"] is not None and entry["imbalance_ratio"] > DRIFT_IMBALANCE_RATIO:
+        reasons.append(f"inverted lists {entry['imbalance_ratio']:.2f}× more uneven")
+    if entry["appended_share"] > DRIFT_MAX_APPENDED:
+        reasons.append(f"{entry['appended_share']:.0%} of the index was never seen by training")
+    entry["retrain"] = bool(reasons)
+
+    meta.setdefault("history", []).append(entry)
+    with open(META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if reasons:
+        print("⚠️  Retrain recommended: " + "; ".join(reasons))
+    else:
+        print(f"📈 Drift OK (error ×{entry['error_ratio'] or 0:.2f}, imbalance ×{entry['imbalance_ratio'] or 0:.2f})")
+    return entry
+
+
+def main():
+    start = time.perf_counter()
+
+    # 0. Existing build: row count, schema, and an index that takes explicit IDs
+    old   = pl.read_parquet(PARQUET)
+    n     = old.height
+    dedup = "rep_id" in old.columns
+    index = faiss.read_index(INDEX_FILE)
+    if not add_ids_supported(index) and (dedup or index.ntotal != n):
+        raise SystemExit(f"❗ {INDEX_FILE} cannot take explicit IDs; rebuild it with build_index.py")
+    # the embeddings are written before the Parquet, so a crash in between
+    # leaves extra rows behind; those are overwritten below
+    emb_rows = np.load(EMB_FILE, mmap_mode="r").shape[0]
+    if emb_rows < n:
+        raise SystemExit(f"❗ {EMB_FILE} has {emb_rows} rows for {n} tweets; rebuild it with build_embeddings.py")
+    if emb_rows > n:
+        print(f"⚠️  {EMB_FILE} has {emb_rows - n} rows past the Parquet's {n} (interrupted ingest?); overwriting them")
+
+    # 1. Clean the new rows only, IDs n … n + m − 1
+    new = clean_frame(pl.read_csv(INGEST_CSV)).sort("date", maintain_order=True)
+    m   = new.height
+    if not m:
+        return print("ℹ️  Nothing to ingest")
+
+    # 2. Dedup against the existing clusters and within the batch
+    if dedup:
+        corpus = append_deduped(old, new)
+    else:
+        corpus = pl.concat([old, new.select(old.columns)], how="vertical_relaxed")
+    new = corpus.slice(n)
+    ids = np.arange(n, n + m)
+    rep = new["rep_id"].to_numpy() == ids if dedup else np.ones(m, dtype=bool)
+
+    # 3. Embed new representatives; duplicates copy their rep's vector,
+    #    from the existing embeddings when the rep is an older row
+    model = SentenceTransformer(EMODEL)
+    encode, cache = make_encoder(model, show_progress_bar=False)
+    vecs  = np.empty((m, model.get_sentence_embedding_dimension()), dtype="float32")
+    local = new
+    if dedup:
+        rep_ids = new["rep_id"].to_numpy()
+        known   = rep_ids < n
+        if known.any():
+            vecs[known] = np.load(EMB_FILE, mmap_mode="r")[rep_ids[known]]
+        local = new.with_columns(pl.Series("rep_id", np.where(known, -1, rep_ids - n)))
+    encode_into(vecs, encode, local.select([c for c in ("content_clean", "rep_id") if c in local.columns]))
+    report_cache(cache)
+    append_npy(EMB_FILE, vecs, at=n)
+
+    # 4. Write the Parquet store (old rows' dup_count may have grown)
+    write_atomic(lambda p: corpus.write_parquet(p, compression="zstd"), PARQUET)
+
+    # 5. Extend the trained index (no retraining), then the lexical indexes & aggregates
+    if add_ids_supported(index):
+        index.add_with_ids(vecs[rep], ids[rep])
+    else:
+        index.add(vecs)
+    write_atomic(lambda p: faiss.write_index(index, p), INDEX_FILE)
+    if os.path.exists(KEYWORD_INDEX):
+        write_atomic(lambda p: KeywordIndex.build(corpus["content_clean"]).save(p), KEYWORD_INDEX)
+    if os.path.exists(BM25_INDEX):
+        # idf depends on the whole corpus, so BM25 is rebuilt rather than appended
+        reps = np.flatnonzero(corpus["rep_id"].to_numpy() == np.arange(corpus.height)) if dedup else None
+        write_atomic(lambda p: BM25Index.build(corpus["content_clean"], ids=reps).save(p), BM25_INDEX)
+    if os.path.exists(AGGREGATES):
+        # days that got new tweets lose their summary until build_daily_aggregates.py refills it
+        agg = carry_summaries(build_daily_aggregates(corpus, np.load(EMB_FILE, mmap_mode="r")), pl.read_parquet(AGGREGATES))
+        write_atomic(lambda p: agg.write_parquet(p), AGGREGATES)
+
+    print(f"✅ Ingested {m} rows ({int(rep.sum())} indexed) in {time.perf_counter() - start:.1f}s → {n + m} rows")
+
+    # 6. Drift
+    drift_report(index, vecs[rep], int(rep.sum()))
+
+
+if __name__ == "__main__":
+    main()
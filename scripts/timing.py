@@ -0,0 +1,20 @@
+# scripts/timing.py
+"""Latency helper shared by the benchmark and validation scripts."""
+
+import time
+import numpy as np
+
+def latency(fn, inputs) -> dict:
+    """Per-call latency percentiles of fn(x) over `inputs`."""
+    ms = []
+    for x in inputs:
+        t0 = time.perf_counter()
+        fn(x)
+        ms.append((time.perf_counter() - t0) * 1e3)
+    ms = np.asarray(ms)
+    return {
+        "queries": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+    }
@@ -0,0 +1,125 @@
+# scripts/validate_fast_encoder.py
+"""
+What does FAST_ENCODER=true cost in recall, and what does it buy?
+
+Encodes a sample of questions with the full-precision EMBEDDING_MODEL and
+with its int8 version (quake_talk.fast_encoder), then reports:
+
+  - query latency: one question per encode call, as the app does it,
+    p50/p95 for both encoders at ENCODER_THREADS threads, and the speedup
+  - embedding drift: cosine similarity of each question's two embeddings
+  - top-k overlap: the share of the full-precision top-k hits in
+    INDEX_FILE that the int8 query embedding also retrieves
+  - weight size of both models
+
+Questions are the lines of VALIDATE_QUESTIONS_FILE or, without one, the
+canned app questions of benchmark_search.py, cycled to VALIDATE_QUESTIONS
+calls for the latency figures; drift and overlap use each distinct
+question once. Results go to VALIDATE_OUT as JSON. The exit code is non-zero when the mean overlap is
+below VALIDATE_MIN_OVERLAP.
+
+ENCODER_THREADS=2 python scripts/validate_fast_encoder.py
+"""
+
+import os
+import json
+import time
+import itertools
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+from sentence_transformers import SentenceTransformer
+
+from quake_talk import search
+from quake_talk.fast_encoder import ENCODER_THREADS, load_fast_encoder, model_bytes, set_threads
+from benchmark_search import CANNED
+from timing import latency
+
+QUESTIONS_FILE = os.getenv("VALIDATE_QUESTIONS_FILE", "")            # optional, one question per line
+N_QUESTIONS    = int(os.getenv("VALIDATE_QUESTIONS", 200))
+TOP_K          = int(os.getenv("VALIDATE_TOP_K", 10))
+NPROBE         = int(os.getenv("NPROBE") or 0) or None
+MIN_OVERLAP    = float(os.getenv("VALIDATE_MIN_OVERLAP", 0.9))
+OUT            = os.getenv("VALIDATE_OUT", "artifacts/benchmarks/fast_encoder.json")
+
+def load_questions() -> list[str]:
+    if QUESTIONS_FILE:
+        with open(QUESTIONS_FILE, encoding="utf-8") as f:
+            base = [line.strip() for line in f if line.strip()]
+    else:
+        base = CANNED
+    return list(itertools.islice(itertools.cycle(base), N_QUESTIONS))
+
+def topk_overlap(full: np.ndarray, fast: np.ndarray) -> np.ndarray:
+    """Per question: share of the full-precision hits also in the int8 hits."""
+    out = []
+    for a, b in zip(full, fast):
+        a, b = set(a[a >= 0].tolist()), set(b[b >= 0].tolist())
+        out.append(len(a & b) / max(1, len(a)))
+    return np.asarray(out)
+
+def main():
+    questions = load_questions()
+    distinct  = list(dict.fromkeys(questions))
+    print(f"📐 {len(distinct)} distinct questions ({len(questions)} timed calls), {search.EMBEDDING_MODEL}, k={TOP_K}, threads={ENCODER_THREADS or 'default'}")
+
+    # 1. Both encoders; the full-precision one first (quantization is in place)
+    set_threads()
+    full = SentenceTransformer(search.EMBEDDING_MODEL, device="cpu")
+    full_bytes = model_bytes(full)
+    fast = load_fast_encoder(search.EMBEDDING_MODEL)
+
+    # 2. Latency, one question per call after a warm-up call
+    lat = {}
+    for name, model in (("full", full), ("int8", fast)):
+        model.encode(questions[:1])
+        lat[name] = latency(lambda q, m=model: m.encode([q]), questions)
+        print(f"   {name:<5} p50={lat[name]['p50_ms']:8.2f}ms  p95={lat[name]['p95_ms']:8.2f}ms")
+
+    # 3. Embedding drift and top-k overlap against the real index
+    xf = np.asarray(full.encode(distinct, batch_size=64), dtype="float32")
+    xq = np.asarray(fast.encode(distinct, batch_size=64), dtype="float32")
+    cos = (xf * xq).sum(axis=1) / np.maximum(np.linalg.norm(xf, axis=1) * np.linalg.norm(xq, axis=1), 1e-12)
+
+    index = search.registry.index()
+    _, hits_full = search._search(index, xf, TOP_K, nprobe=NPROBE)
+    _, hits_fast = search._search(index, xq, TOP_K, nprobe=NPROBE)
+    overlap = topk_overlap(hits_full, hits_fast)
+
+    # 4. Report
+    result = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "model": search.EMBEDDING_MODEL,
+        "index": search.INDEX_FILE,
+        "questions": len(distinct),
+        "top_k": TOP_K,
+        "threads": ENCODER_THREADS,
+        "latency": lat,
+        "speedup_p50": round(lat["full"]["p50_ms"] / max(lat["int8"]["p50_ms"], 1e-9), 3),
+        "cosine": {"mean": round(float(cos.mean()), 5), "min": round(float(cos.min()), 5)},
+        "overlap": {
+            "mean": round(float(overlap.mean()), 4),
+            "p5": round(float(np.percentile(overlap, 5)), 4),
+            "exact": round(float((overlap == 1).mean()), 4),
+        },
+        "model_mb": {"full": round(full_bytes / 2**20, 1), "int8": round(model_bytes(fast) / 2**20, 1)},
+    }
+    os.makedirs(os.path.dirname(OUT) or ".", exist_ok=True)
+    with open(OUT, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(
+        f"   speedup ×{result['speedup_p50']:.2f} (p50), cosine mean {result['cosine']['mean']:.4f} "
+        f"/ min {result['cosine']['min']:.4f}, weights {result['model_mb']['full']} → {result['model_mb']['int8']} MB"
+    )
+    print(
+        f"   top-{TOP_K} overlap mean {result['overlap']['mean']:.3f}, p5 {result['overlap']['p5']:.3f}, "
+        f"identical for {result['overlap']['exact']:.1%} of questions"
+    )
+    print(f"✅ Results written to {OUT}")
+    if overlap.mean() < MIN_OVERLAP:
+        raise SystemExit(f"❌ Mean top-{TOP_K} overlap {overlap.mean():.3f} < VALIDATE_MIN_OVERLAP={MIN_OVERLAP}")
+
+if __name__ == "__main__":
+    main()
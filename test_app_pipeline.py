@@ -3,22 +3,22 @@
 from app import load_data, truncate_by_tokens, get_token_encoder
 from quake_talk.search import semantic_search
 from quake_talk.gpt    import ask
-import pandas as pd
 
 
 def main():
     # 1) Load & inspect data
-    df = load_data()
-    print(f"✅ Loaded {len(df)} rows")
-    print("Columns:", df.columns.tolist())
+    store = load_data()
+    print(f"✅ Loaded {len(store)} rows")
+    print("Columns:", store.frame.columns)
 
     # 2) Date‐range check
-    min_date = df["date"].min().date()
-    max_date = df["date"].max().date()
+    min_date = store.min_date
+    max_date = store.max_date
     print(f"Date range in data: {min_date} → {max_date}")
 
     # 3) Full‐range filter sanity
-    subset = df[(df["date"].dt.date >= min_date) & (df["date"].dt.date <= max_date)]
+    window = store.date_window(min_date, max_date)
+    subset = store.window_frame(window)
     print(f"Rows after full‐range filter: {len(subset)}")
 
     # 4) Semantic search test
@@ -28,7 +28,7 @@ def main():
     print("Distances:", dists)
 
     # 5) Build a tiny context & truncate it
-    sample_texts = subset["content_clean"].tolist()[:5]
+    sample_texts = subset["content_clean"].head(5).to_list()
     raw_ctx = " ".join(sample_texts)
     encoder = get_token_encoder("all-MiniLM-L6-v2")
     truncated = truncate_by_tokens(raw_ctx, max_tokens=20, enc=encoder)
@@ -0,0 +1,65 @@
+# tests/test_aggregates.py
+import datetime as dt
+
+import numpy as np
+import polars as pl
+
+from quake_talk.aggregates import DailyAggregates, build_daily_aggregates, carry_summaries
+from quake_talk.search import CorpusRegistry, CorpusSpec
+
+
+DF = pl.DataFrame({
+    "date": [
+        "2023-02-07 10:00:00+00:00", "2023-02-06 09:00:00+00:00", None,
+        "2023-02-06 23:59:00+00:00", "2023-02-08 01:00:00+00:00", "2023-02-07 12:00:00+00:00",
+    ],
+    "content_clean": [
+        "hatay needs tents", "rescue teams in hatay", "undated tweet",
+        "rescue teams in hatay", "water water 2023", "tents and water",
+    ],
+})
+EMB = np.arange(12, dtype=np.float32).reshape(6, 2)
+
+
+def test_build_counts_terms_and_embedding_sums():
+    agg = build_daily_aggregates(DF, EMB)
+
+    assert agg["day"].to_list() == [dt.date(2023, 2, 6), dt.date(2023, 2, 7), dt.date(2023, 2, 8)]
+    assert agg["n_tweets"].to_list() == [2, 2, 1]
+    assert agg["n_unique"].to_list() == [1, 2, 1]
+    assert agg["terms"][0].to_list()[:3] == ["hatay", "rescue", "teams"]
+    assert agg["terms"][2].to_list() == ["water"]                      # digits / short terms dropped
+    assert agg["term_counts"][2].to_list() == [2]
+    expected = [EMB[[1, 3]].sum(0), EMB[[0, 5]].sum(0), EMB[4]]
+    np.testing.assert_allclose(np.stack(agg["emb_sum"].to_list()), np.stack(expected))
+    assert agg["summary"].null_count() == agg.height
+
+
+def test_range_stats_and_context():
+    aggs = DailyAggregates(build_daily_aggregates(DF, EMB))
+    stats = aggs.stats(dt.date(2023, 2, 6), dt.date(2023, 2, 7))
+
+    assert (stats["days"], stats["tweets"], stats["unique"]) == (2, 4, 3)
+    assert stats["top_terms"][:2] == [("hatay", 3), ("rescue", 2)]
+    c = EMB[[0, 1, 3, 5]].sum(0)
+    np.testing.assert_allclose(stats["centroid"], c / np.linalg.norm(c), rtol=1e-6)
+    assert aggs.days(dt.date(2023, 2, 9), dt.date(2023, 2, 10)).height == 0
+
+    ctx = aggs.context(dt.date(2023, 2, 6), dt.date(2023, 2, 8), max_days=1)
+    assert "5 tweets" in ctx
+    assert "2023-02-06 – 2 tweets" in ctx and "2023-02-08" not in ctx.splitlines()[-1]
+
+
+def test_carry_summaries_and_load(tmp_path):
+    path = tmp_path / "agg.parquet"
+    registry = CorpusRegistry()
+    registry.register("c", CorpusSpec("", "", "", aggregates=str(path)))
+    assert registry.aggregates("c") is None
+
+    old = build_daily_aggregates(DF).with_columns(pl.lit("old summary").alias("summary"))
+    old.write_parquet(path)
+    assert len(registry.aggregates("c")) == 3
+
+    grown = pl.concat([DF, pl.DataFrame({"date": ["2023-02-08 05:00:00+00:00"], "content_clean": ["more water"]})])
+    new = carry_summaries(build_daily_aggregates(grown), old)
+    assert new["summary"].to_list() == ["old summary", "old summary", None]
@@ -0,0 +1,42 @@
+# tests/test_bm25.py
+import math
+
+import numpy as np
+import polars as pl
+
+from quake_talk.bm25 import BM25Index, tokenize
+
+
+TEXTS = ["hatay tent tent", "water food", None, "hatay rescue team", "tent"]
+
+
+def _bm25(term, doc, k1=1.2, b=0.75):
+    """Textbook BM25 for one term, for checking the precomputed weights."""
+    docs  = [(t or "").split() for t in TEXTS]
+    avgdl = sum(map(len, docs)) / len(docs)
+    df    = sum(term in d for d in docs)
+    tf    = docs[doc].count(term)
+    idf   = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+    return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(docs[doc]) / avgdl))
+
+
+def test_scores_match_textbook_bm25(tmp_path):
+    path = tmp_path / "bm25.npz"
+    BM25Index.build(pl.Series(TEXTS)).save(str(path))
+    index = BM25Index.load(str(path))
+
+    ids, scores = index.search(tokenize("Hatay tent?"), k=10)
+    expected = {d: _bm25("hatay", d) + _bm25("tent", d) for d in (0, 3, 4)}
+    assert ids.tolist() == sorted(expected, key=lambda d: -expected[d])
+    assert np.allclose(scores, [expected[d] for d in ids.tolist()], rtol=1e-5)
+
+
+def test_filters_and_subset():
+    index = BM25Index.build(pl.Series(TEXTS))
+    assert index.search(["tent"], k=10, id_range=(1, 5))[0].tolist() == [4]
+    assert index.search(["hatay"], k=10, ids=[3, 4])[0].tolist() == [3]
+    assert index.search(["missing"], k=10)[0].tolist() == []
+
+    reps = BM25Index.build(pl.Series(TEXTS), ids=np.array([1, 3]))
+    assert reps.search(["hatay", "water"], k=10)[0].tolist() in ([1, 3], [3, 1])
+    assert reps.n_docs == len(TEXTS)
@@ -0,0 +1,53 @@
+# tests/test_clean_dataset.py
+import os
+import time
+import importlib
+
+import polars as pl
+import pytest
+
+N = 20_000
+
+
+@pytest.fixture
+def clean_dataset(monkeypatch, tmp_path):
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+    module = importlib.import_module("clean_dataset")
+    # cleaning and annotation have their own tests; here they pass text through
+    monkeypatch.setattr(module, "clean_tweets", lambda texts, **options: texts.to_list())
+    monkeypatch.setattr(module, "annotate_budget", lambda df: df)
+    monkeypatch.setattr(module, "RAW_CSV", str(tmp_path / "raw.csv"))
+    monkeypatch.setattr(module, "CLEANED_CSV", None)
+    return module
+
+
+def test_streaming_and_in_memory_assign_the_same_row_ids(clean_dataset, tmp_path, monkeypatch):
+    # bursts of identical timestamps, spread over several stream batches
+    pl.DataFrame({
+        "date":    [f"2023-02-06 04:{17 - i * 10 // N:02d}:00" for i in range(N)],
+        "content": [f"tweet {i}" for i in range(N)],
+    }).write_csv(tmp_path / "raw.csv")
+
+    outputs = []
+    for streaming in (False, True, True):
+        path = str(tmp_path / f"out-{len(outputs)}.parquet")
+        monkeypatch.setattr(clean_dataset, "CLEANED_PARQUET", path)
+        monkeypatch.setattr(clean_dataset, "STREAM_BATCH_SIZE", N // 7)
+        monkeypatch.setattr(clean_dataset, "STREAMING", streaming)
+        clean_dataset.main()
+        outputs.append(pl.read_parquet(path))
+
+    assert outputs[0].columns == outputs[1].columns
+    assert outputs[0].equals(outputs[1]) and outputs[1].equals(outputs[2])
+    # the earliest minute is the input's last burst, its ties kept in input order
+    first = N - N // 10
+    assert outputs[0]["content"][:3].to_list() == [f"tweet {i}" for i in range(first, first + 3)]
+
+
+def test_clean_frame_times_cleaning_apart_from_annotation(clean_dataset, monkeypatch):
+    monkeypatch.setattr(clean_dataset, "annotate_budget", lambda df: time.sleep(0.05) or df)
+    timings = {}
+    for _ in range(2):
+        clean_dataset.clean_frame(pl.DataFrame({"content": ["a", "b"]}), timings)
+    assert set(timings) == {"clean", "annotate"}
+    assert timings["annotate"] >= 0.1 > timings["clean"]
@@ -1,5 +1,5 @@
 # tests/test_clean_text.py
-from quake_talk.preprocessing.clean_text import clean_tweet
+from quake_talk.preprocessing.clean_text import clean_tweet, clean_tweets
 
 
 def test_empty_and_none():
@@ -23,3 +23,16 @@ def test_punctuation_stripped():
     inp = "Wow!!! So good: awesome, amazing;"
     out = clean_tweet(inp, remove_stopwords=False)
     assert all(ch not in out for ch in "!,:;" )
+
+
+def test_batch_matches_single():
+    inp = [
+        "Hello @user! Visit http://example.com. This is GREAT!!!",
+        "Help needed in #Hatay &amp; Antakya – mail help@ngo.org",
+        "Yardım   lütfen\t\ncafé &lt;3 www.site.com/x",
+        None,
+        "",
+    ]
+    for remove_stopwords in (True, False):
+        expected = [clean_tweet(t, remove_stopwords=remove_stopwords) for t in inp]
+        assert clean_tweets(inp, remove_stopwords=remove_stopwords) == expected
@@ -0,0 +1,55 @@
+# tests/test_context.py
+from quake_talk.context import build_context, chunk_by_tokens, spread
+
+
+ROWS = [
+    ("need water. need tents", [11, 22], [3, 3]),
+    ("bridge collapsed", [16], [2]),
+    ("power out in hatay", [18], [4]),
+]
+
+
+def test_sentence_budget():
+    assert build_context(iter(ROWS), max_sents=3, max_tokens=100) == (
+        "need water. need tents bridge collapsed"
+    )
+
+
+def test_token_budget_stops_before_overflow():
+    assert build_context(iter(ROWS), max_sents=100, max_tokens=8) == (
+        "need water. need tents bridge collapsed"
+    )
+
+
+class WordEncoder:
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def test_overlong_first_sentence_is_truncated_not_dropped():
+    rows = [("one two three four five six. next", [28, 33], [6, 1])]
+    assert build_context(iter(rows), max_sents=10, max_tokens=2, enc=WordEncoder()) == "one two"
+    assert build_context(iter(rows), max_sents=10, max_tokens=3) == "one two three"   # by character share
+    assert build_context(iter(ROWS), max_sents=100, max_tokens=2, enc=WordEncoder()) == "need water."
+
+
+def test_rows_past_budget_are_not_consumed():
+    rows = iter(ROWS)
+    build_context(rows, max_sents=1, max_tokens=100)
+    assert next(rows)[0] == "bridge collapsed"
+
+
+def test_chunk_by_tokens_packs_in_order():
+    texts = ["a", "b", "c", "long", "d"]
+    assert chunk_by_tokens(texts, [2, 2, 2, 9, 1], max_tokens=5) == ["a\nb", "c", "long", "d"]
+    assert chunk_by_tokens([], [], max_tokens=5) == []
+
+
+def test_spread_keeps_order_and_covers_the_range():
+    items = list(range(10))
+    assert spread(items, 0) == items and spread(items, 20) == items
+    assert spread(items, 3) == [0, 3, 6]
+    assert spread(items, 5) == [0, 2, 4, 6, 8]
@@ -0,0 +1,87 @@
+# tests/test_corpus.py
+import datetime as dt
+
+import numpy as np
+import polars as pl
+import pytest
+
+from quake_talk.corpus import CorpusStore
+from quake_talk.search import CorpusRegistry, CorpusSpec
+
+
+DATES = ["2023-02-06", "2023-02-06", None, "2023-02-08", "2023-02-07"]
+
+
+def _write(tmp_path, dates):
+    path = tmp_path / "corpus.parquet"
+    pl.DataFrame({
+        "date":          dates,
+        "content_clean": [f"tweet {i}" for i in range(len(dates))],
+        "unused":        list(range(len(dates))),
+    }).write_parquet(path)
+    return str(path)
+
+
+def _expected(dates, start, end):
+    return [i for i, d in enumerate(dates) if d and str(start) <= d <= str(end)]
+
+
+def test_unsorted_window_matches_filter(tmp_path):
+    store = CorpusStore.load(_write(tmp_path, DATES))
+    assert store.frame.columns == ["date", "content_clean"]
+    assert (store.min_date, store.max_date) == (dt.date(2023, 2, 6), dt.date(2023, 2, 8))
+
+    start, end = dt.date(2023, 2, 7), dt.date(2023, 2, 8)
+    window = store.date_window(start, end)
+    assert window.tolist() == _expected(DATES, start, end)
+    assert store.id_filter(window)["ids"] is window
+    assert store.restrict(np.array([4, 0, 3]), window).tolist() == [4, 3]
+
+
+def test_sorted_window_is_slice(tmp_path):
+    dates = sorted(d for d in DATES if d)
+    store = CorpusStore.load(_write(tmp_path, dates))
+
+    start, end = dt.date(2023, 2, 7), dt.date(2023, 2, 7)
+    window = store.date_window(start, end)
+    assert window == slice(2, 3)
+    assert store.id_filter(window) == {"id_range": (2, 3)}
+    assert store.window_frame(window)["content_clean"].to_list() == ["tweet 2"]
+    assert store.texts([3, 0]) == ["tweet 3", "tweet 0"]
+
+
+def test_collapse_and_weights(tmp_path):
+    path = tmp_path / "corpus.parquet"
+    pl.DataFrame({
+        "date":          ["2023-02-06"] * 4,
+        "content_clean": ["a", "a", "b", "a"],
+        "rep_id":        [0, 0, 2, 0],
+        "dup_count":     [3, 3, 1, 3],
+    }).write_parquet(path)
+    store = CorpusStore.load(str(path))
+
+    assert store.collapse([3, 2, 0, 1]).tolist() == [3, 2]
+    assert store.weights([2, 0]).tolist() == [1, 3]
+    assert store.collapse([1, 0], "cluster_id").tolist() == [1, 0]   # column absent → unchanged
+
+
+def test_registry_store_reloads_rewritten_file(tmp_path):
+    path = _write(tmp_path, DATES)
+    registry = CorpusRegistry()
+    registry.register("c", CorpusSpec("", "", path))
+    store = registry.store("c")
+    assert registry.store("c") is store
+
+    _write(tmp_path, DATES + ["2023-02-09"])            # e.g. scripts/ingest.py appended a row
+    assert len(registry.store("c")) == len(DATES) + 1
+
+
+def test_date_bounds_skip_undated_rows_and_fail_without_any(tmp_path):
+    store = CorpusStore.load(_write(tmp_path, [None, "2023-02-07", "2023-02-09"]))
+    assert (store.min_date, store.max_date) == (dt.date(2023, 2, 7), dt.date(2023, 2, 9))
+
+    store = CorpusStore(pl.DataFrame({"date": [None, None]}), np.full(2, np.iinfo(np.int32).min, dtype=np.int32))
+    with pytest.raises(ValueError):
+        store.min_date
+    with pytest.raises(ValueError):
+        store.max_date
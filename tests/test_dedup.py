@@ -0,0 +1,35 @@
+# tests/test_dedup.py
+import numpy as np
+import polars as pl
+
+from quake_talk.preprocessing.dedup import duplicate_clusters, exact_duplicates
+
+
+APPEAL = "urgent need tents blankets hatay antakya please share"
+
+TEXTS = [
+    APPEAL,
+    "water food needed kahramanmaras",
+    APPEAL,
+    APPEAL + " now",                   # near duplicate
+    None,
+    "",
+    "completely different tweet about rescue teams arriving",
+]
+
+
+def test_exact_duplicates_point_to_first_row():
+    assert exact_duplicates(pl.Series(TEXTS)).tolist() == [0, 1, 0, 3, 4, 4, 6]
+
+
+def test_near_duplicates_join_earliest_cluster():
+    clusters = duplicate_clusters(pl.Series(TEXTS))
+    assert clusters.tolist() == [0, 1, 0, 0, 4, 4, 6]
+    assert duplicate_clusters(pl.Series(TEXTS), near=False).tolist() == [0, 1, 0, 3, 4, 4, 6]
+
+
+def test_unrelated_texts_stay_apart():
+    rng   = np.random.default_rng(0)
+    vocab = [f"w{i}" for i in range(1000)]
+    texts = pl.Series([" ".join(rng.choice(vocab, 12)) for _ in range(500)])
+    assert duplicate_clusters(texts).tolist() == list(range(500))
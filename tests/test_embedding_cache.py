@@ -0,0 +1,59 @@
+# tests/test_embedding_cache.py
+import numpy as np
+
+from quake_talk.embedding_cache import EmbeddingCache
+
+
+DIM = 4
+
+
+class CountingEncoder:
+    """Deterministic encode_fn that records what it was asked to embed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.asarray(
+            [np.random.default_rng(sum(map(ord, t))).random(DIM) for t in texts], dtype="float64",
+        )
+
+
+def test_hits_misses_and_batch_dedup(tmp_path):
+    enc   = CountingEncoder()
+    cache = EmbeddingCache(str(tmp_path), "model-a")
+
+    vecs = cache.encode(["tents", "water", "tents"], enc, DIM)
+    assert len(enc.calls) == 1 and sorted(enc.calls[0]) == ["tents", "water"]   # duplicate encoded once
+    assert vecs.dtype == np.float32 and vecs.shape == (3, DIM)
+    assert np.array_equal(vecs[0], vecs[2])
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    again = cache.encode(["water", "food"], enc, DIM)
+    assert enc.calls[-1] == ["food"]
+    assert np.array_equal(again[0], vecs[1])
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert cache.hit_ratio == 2 / 5
+
+
+def test_persists_across_instances_per_model(tmp_path):
+    first = EmbeddingCache(str(tmp_path), "model-a")
+    vecs  = first.encode(["tents", "water"], CountingEncoder(), DIM)
+
+    enc    = CountingEncoder()
+    reopen = EmbeddingCache(str(tmp_path), "model-a")
+    assert np.array_equal(reopen.encode(["water", "tents"], enc, DIM), vecs[::-1])
+    assert enc.calls == [] and reopen.misses == 0
+
+    other = EmbeddingCache(str(tmp_path), "model-b")          # same text, other model → miss
+    other.encode(["tents"], enc, DIM)
+    assert enc.calls == [["tents"]]
+
+
+def test_null_texts_are_embedded_as_empty(tmp_path):
+    enc   = CountingEncoder()
+    cache = EmbeddingCache(str(tmp_path), "model-a")
+    vecs  = cache.encode([None, "", "tents"], enc, DIM)
+    assert len(enc.calls) == 1 and sorted(enc.calls[0]) == ["", "tents"]   # misses come in key order
+    assert np.array_equal(vecs[0], vecs[1])
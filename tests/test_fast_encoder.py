@@ -0,0 +1,33 @@
+# tests/test_fast_encoder.py
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from quake_talk.fast_encoder import model_bytes, quantize, set_threads
+
+
+def test_quantize_keeps_outputs_close_and_shrinks_weights():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(64, 256), torch.nn.ReLU(), torch.nn.Linear(256, 32)).eval()
+    x = torch.randn(16, 64)
+    with torch.no_grad():
+        expected = model(x)
+    full = model_bytes(model)
+
+    fast = quantize(model)
+    assert fast is model and not any(type(m) is torch.nn.Linear for m in fast.modules())
+    with torch.no_grad():
+        cos = torch.nn.functional.cosine_similarity(fast(x), expected, dim=1)
+    assert cos.min() > 0.99
+    assert model_bytes(fast) < full / 2
+
+
+def test_set_threads():
+    before = torch.get_num_threads()
+    try:
+        set_threads(1)
+        assert torch.get_num_threads() == 1
+        set_threads(0)                      # 0 leaves the setting alone
+        assert torch.get_num_threads() == 1
+    finally:
+        torch.set_num_threads(before)
@@ -0,0 +1,128 @@
+# tests/test_gpt_map_reduce.py
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from quake_talk import gpt
+
+
+class StubOpenAI(BaseHTTPRequestHandler):
+    """Minimal /v1/chat/completions: map calls answer "partial", merges "merged"."""
+
+    lock      = threading.Lock()
+    in_flight = 0
+    peak      = 0
+    calls     = []
+    failed    = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        user = body["messages"][-1]["content"]
+        cls  = type(self)
+        with cls.lock:
+            cls.calls.append(user)
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            time.sleep(0.05)
+            if "broken" in user:
+                return self._send(500, {"error": {"message": "boom", "type": "server_error"}})
+            if "flaky" in user and user not in cls.failed:
+                cls.failed.add(user)
+                return self._send(429, {"error": {"message": "slow down", "type": "rate_limit"}})
+            answer = "merged" if user.startswith("Summary 1:") else "partial"
+            if body.get("stream"):
+                return self._stream(answer)
+            self._send(200, {
+                "id": "x", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": answer}}],
+            })
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, answer):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for piece in (answer[:3], answer[3:]):
+            chunk = {"id": "x", "object": "chat.completion.chunk", "created": 0, "model": "m",
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubOpenAI.calls, StubOpenAI.failed, StubOpenAI.peak = [], set(), 0
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("GPT_BACKOFF_S", "0.01")
+    monkeypatch.setattr(gpt, "_cache_for", lambda temperature: None)
+    yield StubOpenAI
+    server.shutdown()
+    server.server_close()
+
+
+def test_map_reduce_bounded_concurrency_and_retry(stub, monkeypatch):
+    monkeypatch.setenv("SUMMARY_CONCURRENCY", "3")
+    monkeypatch.setenv("SUMMARY_FAN_IN", "2")
+    chunks = [f"tweet batch {i}" for i in range(9)] + ["flaky batch"]
+
+    assert asyncio.run(gpt.summarize_map_reduce(chunks)) == "merged"
+
+    merges = [c for c in stub.calls if c.startswith("Summary 1:")]
+    assert len(stub.calls) - len(merges) == 11      # 10 chunks + 1 retry after the 429
+    # merge levels: 10 partials → 5 → 3 → 2, then the final (streamed) merge
+    assert len(merges) == 5 + 3 + 2 + 1
+    assert stub.peak <= 3
+
+
+def test_single_chunk_is_one_streamed_call(stub):
+    assert asyncio.run(gpt.summarize_map_reduce(["only batch"])) == "partial"
+    assert len(stub.calls) == 1
+
+
+def test_map_failure_is_reported_after_reduce_levels(stub, monkeypatch):
+    monkeypatch.setenv("SUMMARY_FAN_IN", "2")
+    monkeypatch.setenv("GPT_MAX_RETRIES", "1")
+    chunks = [f"tweet batch {i}" for i in range(5)] + ["broken batch"]
+
+    out = asyncio.run(gpt.summarize_map_reduce(chunks))
+
+    assert out.startswith("_(1 of 6 batches could not be summarized.)_")
+    assert out.endswith("merged")
+    assert sum("broken batch" in c for c in stub.calls) == 2       # first try + 1 retry
+
+
+def test_retries_are_traced_apart_from_calls(stub, monkeypatch):
+    from quake_talk import tracing
+
+    monkeypatch.setattr(tracing, "ENABLED", True)
+    tracing.reset()
+    try:
+        assert asyncio.run(gpt._acomplete("system", "flaky batch", 0.0, 10)) == "partial"
+        stats = tracing.snapshot()
+    finally:
+        tracing.reset()
+    assert stats["gpt.call"]["count"] == 1              # one call, its retry included
+    assert stats["gpt.retry"]["count"] == 1
+    assert stats["gpt.call"]["sum"] > stats["gpt.retry"]["sum"]
@@ -0,0 +1,42 @@
+# tests/test_import_time.py
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cold-import budget per module, in seconds (override for slow CI hosts)
+BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", 1.0))
+
+HEAVY = ("spacy", "nltk", "faiss", "sentence_transformers", "torch", "openai", "polars", "tiktoken")
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(elapsed)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _cold_import(module: str) -> tuple[float, list[str]]:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout.splitlines()
+    return float(out[0]), [m for m in out[1].split(",") if m]
+
+
+@pytest.mark.parametrize("module", [
+    "quake_talk",
+    "quake_talk.preprocessing.clean_text",
+    "quake_talk.search",
+    "quake_talk.gpt",
+    "quake_talk.context",
+])
+def test_cold_import_is_lazy_and_fast(module):
+    elapsed, loaded = _cold_import(module)
+    assert loaded == [], f"{module} eagerly imported {loaded}"
+    assert elapsed < BUDGET_S, f"cold import of {module} took {elapsed:.2f}s (budget {BUDGET_S}s)"
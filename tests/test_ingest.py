@@ -0,0 +1,166 @@
+# tests/test_ingest.py
+import os
+import sys
+import json
+import types
+import importlib
+
+import faiss
+import numpy as np
+import polars as pl
+import pytest
+
+DIM = 8
+
+
+class HashModel:
+    """Deterministic stand-in for SentenceTransformer (no model download)."""
+
+    def __init__(self, name=None):
+        pass
+
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, show_progress_bar=False, batch_size=32):
+        return np.asarray(
+            [np.random.default_rng(sum(map(ord, t or ""))).random(DIM) for t in texts], dtype="float32",
+        )
+
+
+@pytest.fixture
+def ingest(monkeypatch):
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(__file__), "..", "scripts"))
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=HashModel))
+    module = importlib.import_module("ingest")
+    monkeypatch.setattr(module, "SentenceTransformer", HashModel)
+    monkeypatch.setattr(sys.modules["build_embeddings"], "CACHE_DIR", "")
+    return module
+
+
+def test_append_npy_grows_header_and_overwrites_tail(ingest, tmp_path):
+    path = str(tmp_path / "emb.npy")
+    base = np.arange(9 * 3, dtype="float32").reshape(9, 3)
+    np.save(path, base)
+
+    more = np.ones((991, 3), dtype="float32")              # 9 → 1000 rows: a longer header
+    ingest.append_npy(path, more)
+    assert np.array_equal(np.load(path), np.vstack([base, more]))
+
+    ingest.append_npy(path, np.zeros((2, 3)), at=9)        # rerun after an interrupted ingest
+    assert np.array_equal(np.load(path), np.vstack([base, np.zeros((2, 3))]))
+
+    with pytest.raises(ValueError):
+        ingest.append_npy(path, np.zeros((1, 4)))
+    with pytest.raises(ValueError):
+        ingest.append_npy(path, np.zeros((1, 3)), at=12)
+
+
+def _raw(n, day):
+    return pl.DataFrame({
+        "date":    [f"2023-02-{day:02d} {h % 24:02d}:00:00+00:00" for h in range(n)],
+        "content": [f"Need tents in Hatay block {day}-{i} #deprem" for i in range(n)],
+    })
+
+
+def _build(ingest, tmp_path, monkeypatch, n=30):
+    paths = {name: str(tmp_path / name) for name in ("tweets.parquet", "emb.npy", "tweets.index", "meta.json", "new.csv")}
+    monkeypatch.setattr(ingest, "PARQUET", paths["tweets.parquet"])
+    monkeypatch.setattr(ingest, "EMB_FILE", paths["emb.npy"])
+    monkeypatch.setattr(ingest, "INDEX_FILE", paths["tweets.index"])
+    monkeypatch.setattr(ingest, "META_FILE", paths["meta.json"])
+    monkeypatch.setattr(ingest, "INGEST_CSV", paths["new.csv"])
+    for name in ("KEYWORD_INDEX", "BM25_INDEX", "AGGREGATES"):
+        monkeypatch.setattr(ingest, name, str(tmp_path / f"missing-{name}"))
+
+    # cleaning has its own tests; here it only has to add content_clean
+    monkeypatch.setattr(ingest, "clean_frame", lambda df: df.with_columns(pl.col("content").str.to_lowercase().alias("content_clean")))
+    corpus = ingest.clean_frame(_raw(n, 6))
+    corpus.write_parquet(paths["tweets.parquet"])
+    vecs = HashModel().encode(corpus["content_clean"].to_list())
+    np.save(paths["emb.npy"], vecs)
+    index = faiss.IndexIDMap(faiss.IndexFlatL2(DIM))
+    index.add_with_ids(vecs, np.arange(n))
+    faiss.write_index(index, paths["tweets.index"])
+    return paths
+
+
+def test_ingest_appends_rows_everywhere(ingest, tmp_path, monkeypatch):
+    paths = _build(ingest, tmp_path, monkeypatch)
+    _raw(5, 7).write_csv(paths["new.csv"])
+
+    ingest.main()
+
+    corpus = pl.read_parquet(paths["tweets.parquet"])
+    emb    = np.load(paths["emb.npy"])
+    assert corpus.height == emb.shape[0] == faiss.read_index(paths["tweets.index"]).ntotal == 35
+    assert np.allclose(emb[30:], HashModel().encode(corpus["content_clean"][30:].to_list()))
+    with open(paths["meta.json"]) as f:
+        assert json.load(f)["history"][-1]["rows"] == 5
+
+
+def test_ingest_joins_copies_of_existing_tweets_to_their_clusters(ingest, tmp_path, monkeypatch):
+    from dedup_dataset import add_dedup_columns
+
+    paths  = _build(ingest, tmp_path, monkeypatch)
+    corpus = add_dedup_columns(pl.read_parquet(paths["tweets.parquet"]))
+    corpus.write_parquet(paths["tweets.parquet"])
+    old = corpus["content"]
+    pl.DataFrame({
+        "date":    ["2023-02-06 23:00:00+00:00", "2023-02-07 01:00:00+00:00", "2023-02-07 02:00:00+00:00"],
+        "content": [old[3], old[4], "Bridge down near Antakya station"],
+    }).write_csv(paths["new.csv"])
+
+    ingest.main()
+
+    corpus = pl.read_parquet(paths["tweets.parquet"])
+    emb    = np.load(paths["emb.npy"])
+    assert corpus["cluster_id"][30:].to_list() == [3, 4, 32]
+    assert corpus["rep_id"][30:].to_list() == [3, 31, 32]     # same day → the old rep; new day → a new one
+    assert corpus["dup_count"][3] == 2 and corpus["dup_count"][30] == 2
+    assert np.array_equal(emb[30], emb[3])                    # copied, not re-encoded
+    assert faiss.read_index(paths["tweets.index"]).ntotal == 32
+
+
+def test_ingest_overwrites_rows_of_an_interrupted_run(ingest, tmp_path, monkeypatch):
+    paths = _build(ingest, tmp_path, monkeypatch)
+    ingest.append_npy(paths["emb.npy"], np.full((3, DIM), 9.0))   # died before the Parquet write
+    _raw(5, 7).write_csv(paths["new.csv"])
+
+    ingest.main()
+
+    assert np.load(paths["emb.npy"]).shape[0] == pl.read_parquet(paths["tweets.parquet"]).height == 35
+    assert not (np.load(paths["emb.npy"]) == 9.0).any()
+
+
+def test_ingest_refuses_short_embeddings(ingest, tmp_path, monkeypatch):
+    paths = _build(ingest, tmp_path, monkeypatch)
+    np.save(paths["emb.npy"], np.load(paths["emb.npy"])[:-1])
+    _raw(5, 7).write_csv(paths["new.csv"])
+    with pytest.raises(SystemExit):
+        ingest.main()
+
+
+def test_drift_report_flags_far_vectors(ingest, tmp_path, monkeypatch):
+    from build_index import coarse_error, list_imbalance
+
+    monkeypatch.setattr(ingest, "META_FILE", str(tmp_path / "meta.json"))
+    rng   = np.random.default_rng(0)
+    train = rng.random((400, DIM), dtype="float32")
+    index = faiss.IndexIVFFlat(faiss.IndexFlatL2(DIM), DIM, 4)
+    index.train(train)
+    index.add(train)
+    with open(ingest.META_FILE, "w") as f:
+        json.dump({"baseline_coarse_error": coarse_error(index, train), "baseline_imbalance": list_imbalance(index)}, f)
+
+    near = ingest.drift_report(index, train[:10], 10)
+    assert near["generation"] == 2 and not near["retrain"]
+
+    far = train[:50] * 10
+    index.add(far)
+    entry = ingest.drift_report(index, far, 50)
+    assert entry["retrain"] and entry["error_ratio"] > ingest.DRIFT_ERROR_RATIO
+    assert entry["generation"] == 3 and entry["appended_share"] == pytest.approx(60 / 450)
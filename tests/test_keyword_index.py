@@ -0,0 +1,69 @@
+# tests/test_keyword_index.py
+import re
+
+import numpy as np
+import polars as pl
+
+from quake_talk.corpus import CorpusStore
+from quake_talk.keyword_index import KeywordIndex, keyword_filter
+
+
+TEXTS = ["help needed hatay", "water food", None, "Hatay tent help", "foo's tent"]
+
+
+def _regex_rows(keywords):
+    pattern = r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")\b"
+    return [i for i, t in enumerate(TEXTS) if re.search(pattern, t or "", re.IGNORECASE)]
+
+
+def test_matches_regex_filter(tmp_path):
+    path = tmp_path / "kw.npz"
+    KeywordIndex.build(pl.Series(TEXTS)).save(str(path))
+    index = KeywordIndex.load(str(path))
+
+    for kw in (["hatay"], ["tent", "water"], ["foo"], ["missing"]):
+        assert index.match(kw).tolist() == _regex_rows(kw)
+
+
+def test_intersection_and_mask():
+    index = KeywordIndex.build(pl.Series(TEXTS))
+    assert index.match(["help", "tent"], mode="all").tolist() == [3]
+    assert np.flatnonzero(index.mask(["water"])).tolist() == [1]
+
+
+def test_keyword_filter_index_matches_scan(tmp_path):
+    path = tmp_path / "corpus.parquet"
+    pl.DataFrame({
+        "date":          ["2023-02-06", "2023-02-06", "2023-02-07", "2023-02-07", "2023-02-08"],
+        "content_clean": [t or "" for t in TEXTS],
+    }).write_parquet(path)
+    store  = CorpusStore.load(str(path))
+    index  = KeywordIndex.build(store.frame["content_clean"])
+    window = slice(1, 5)
+
+    for kw in (["hatay"], ["tent", "water"], ["missing"]):
+        expected = [i for i in _regex_rows(kw) if 1 <= i < 5]
+        assert keyword_filter(store, window, kw, index).tolist() == expected
+        assert keyword_filter(store, window, kw).tolist() == expected
+    assert keyword_filter(store, window, []).tolist() == [1, 2, 3, 4]
+
+
+def test_built_from_rejects_reordered_or_edited_parquet(tmp_path):
+    def store(texts):
+        path = tmp_path / "corpus.parquet"
+        pl.DataFrame({"date": ["2023-02-06"] * len(texts), "content_clean": texts}).write_parquet(path)
+        return CorpusStore.load(str(path))
+
+    texts = [t or "" for t in TEXTS]
+    path  = tmp_path / "kw.npz"
+    KeywordIndex.build(pl.Series(texts)).save(str(path))
+    index = KeywordIndex.load(str(path))
+
+    assert index.built_from(store(texts))
+    assert not index.built_from(store(texts[::-1]))                       # same row count
+    assert not index.built_from(store(texts[:-1] + ["foo's tents"]))
+
+    # indexes saved before the digest existed are never trusted
+    with np.load(path) as z:
+        np.savez(path, **{k: z[k] for k in z.files if k != "digest"})
+    assert not KeywordIndex.load(str(path)).built_from(store(texts))
@@ -0,0 +1,37 @@
+# tests/test_llm_cache.py
+import time
+
+from quake_talk.llm_cache import ResponseCache
+
+
+def test_key_covers_every_input():
+    base = ResponseCache.key("gpt-4o", "sys", "user", 0.4, 1000)
+    assert base == ResponseCache.key("gpt-4o", "sys", "user", 0.4, 1000)
+    assert base != ResponseCache.key("gpt-4o-mini", "sys", "user", 0.4, 1000)
+    assert base != ResponseCache.key("gpt-4o", "sys", "user", 0.7, 1000)
+    assert base != ResponseCache.key("gpt-4o", "sys", "user", 0.4, 500)
+
+
+def test_hit_miss_and_persistence(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    assert cache.get("k") is None
+    cache.put("k", "answer")
+    assert cache.get("k") == "answer"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    assert ResponseCache(path).get("k") == "answer"
+
+
+def test_eviction_by_size_and_age(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")                     # b is now least recently used
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    cache.max_age = 0.01
+    time.sleep(0.02)
+    assert cache.get("a") is None
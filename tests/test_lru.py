@@ -0,0 +1,25 @@
+# tests/test_lru.py
+import numpy as np
+
+from quake_talk.lru import LRUCache
+
+
+def test_evicts_least_recently_used_by_count():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")                     # b is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_evicts_by_bytes():
+    cache = LRUCache(max_entries=None, max_bytes=1000)
+    for i in range(4):
+        cache.put(i, np.zeros(50, dtype="float32"))   # 200 bytes each
+    cache.put("big", np.zeros(200, dtype="float32"))  # 800 bytes: evicts 0–2
+    assert len(cache) == 2 and cache.nbytes == 1000
+    cache.put("huge", np.zeros(1000, dtype="float32"))
+    assert cache.get("huge") is None and len(cache) == 2
@@ -0,0 +1,216 @@
+# tests/test_search.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+import polars as pl
+import pytest
+
+from quake_talk import search, server
+
+
+DIM = 8
+
+
+class HashEncoder:
+    """Deterministic stand-in for SentenceTransformer.encode."""
+
+    def encode(self, texts, batch_size=32):
+        single = isinstance(texts, str)
+        rows = [np.random.default_rng(sum(map(ord, t))).random(DIM) for t in ([texts] if single else texts)]
+        return np.asarray(rows[0] if single else rows, dtype="float32")
+
+
+@pytest.fixture
+def flat_index(monkeypatch):
+    index = faiss.IndexFlatL2(DIM)
+    index.add(np.random.default_rng(0).random((200, DIM), dtype="float32"))
+    monkeypatch.setattr(search, "_load_embedding_model", lambda name: HashEncoder())
+    monkeypatch.setattr(search, "_load_faiss_index", lambda path: index)
+    search.registry.clear()
+    for cache in (search._query_cache, search._result_cache):
+        cache.clear()
+        cache.hits = cache.misses = 0
+    return index
+
+
+QUESTIONS = ["where is aid", "rescue teams", "tents", "where is aid"]
+
+
+def test_many_matches_looped(flat_index):
+    batched = search.semantic_search_many(QUESTIONS, top_k=5)
+    assert batched == [search.semantic_search(q, top_k=5) for q in QUESTIONS]
+    assert all(len(ids) == 5 for ids, _ in batched)
+
+
+def test_many_applies_filter_to_every_question(flat_index):
+    for ids, _ in search.semantic_search_many(QUESTIONS, top_k=5, id_range=(50, 60)):
+        assert ids and all(50 <= i < 60 for i in ids)
+    assert search.semantic_search_many([], top_k=5) == []
+
+
+def test_caches_skip_encode_and_search(flat_index, monkeypatch):
+    calls = []
+    real_search = search._search
+    monkeypatch.setattr(search, "_search", lambda idx, xq, *a: calls.append(len(xq)) or real_search(idx, xq, *a))
+
+    first = search.semantic_search("  Where is   aid ", top_k=3)
+    assert search.semantic_search("Where is aid", top_k=3) == first
+    assert calls == [1]
+
+    stats = search.cache_stats()
+    assert stats["query_embeddings"]["hits"] == 1
+    assert stats["search_results"]["hits"] == 1
+
+    search.semantic_search("Where is aid", top_k=3, id_range=(0, 100))   # new filter → new search
+    assert calls == [1, 1]
+
+
+def test_index_change_clears_caches(flat_index, tmp_path, monkeypatch):
+    path = tmp_path / "tweets.index"
+    path.write_bytes(b"v1")
+    monkeypatch.setattr(search, "INDEX_FILE", str(path))
+    search.semantic_search("tents", top_k=3)
+    assert len(search._query_cache) == len(search._result_cache) == 1
+
+    search.semantic_search("tents", top_k=3)      # unchanged → served from cache
+    assert search.cache_stats()["search_results"]["hits"] == 1
+    path.write_bytes(b"v2, rebuilt")
+    search._check_index()
+    assert len(search._query_cache) == len(search._result_cache) == 0
+
+
+def test_client_mode_uses_server_and_falls_back(flat_index, monkeypatch):
+    local = search.semantic_search_many(QUESTIONS, top_k=5, id_range=(10, 120))
+
+    # the pool keeps 8 requests in flight; a batcher that waits for 8 questions
+    # (rather than a few ms) batches them whatever the thread scheduling
+    srv = server.make_server(port=0, batcher=server.MicroBatcher(max_batch=8, max_wait=5.0))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    monkeypatch.setattr(search, "SEARCH_SERVER_URL", f"http://127.0.0.1:{srv.server_port}")
+    monkeypatch.setattr(search, "_server_down_until", 0.0)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            remote = list(pool.map(
+                lambda q: search.semantic_search(q, top_k=5, id_range=(10, 120)), QUESTIONS * 4,
+            ))
+        assert remote == local * 4
+        batcher = srv.RequestHandlerClass.batcher
+        assert batcher.queries == 16 and batcher.batches == 2   # concurrent requests were batched
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+    # server gone → in-process search, and no retry until the back-off expires
+    assert search.semantic_search_many(QUESTIONS, top_k=5, id_range=(10, 120)) == local
+    assert search._server_down_until > 0
+
+
+def test_hybrid_fuses_dense_and_bm25_ranks(flat_index, tmp_path, monkeypatch):
+    from quake_talk.bm25 import BM25Index
+
+    texts = [f"tweet {i}" for i in range(200)]
+    texts[57] = "collapsed bridge in antakya"
+    path = tmp_path / "bm25.npz"
+    BM25Index.build(pl.Series(texts)).save(str(path))
+    monkeypatch.setattr(search, "BM25_INDEX_FILE", str(path))
+
+    dense, _ = search.semantic_search("antakya bridge", top_k=20, id_range=(50, 100))   # depth = 2 × top_k
+    ids, scores = search.hybrid_search("antakya bridge", top_k=10, id_range=(50, 100))
+
+    assert 57 in ids and all(50 <= i < 100 for i in ids)
+    assert scores == sorted(scores, reverse=True)
+    rrf = {row: 1 / (61 + rank) for rank, row in enumerate(dense)}
+    rrf[57] = rrf.get(57, 0) + 1 / 61
+    assert scores[ids.index(57)] == rrf[57]
+
+
+def _write_index(path, seed, n=100):
+    index = faiss.IndexFlatL2(DIM)
+    index.add(np.random.default_rng(seed).random((n, DIM), dtype="float32"))
+    faiss.write_index(index, str(path))
+    return path.stat().st_size
+
+
+def test_registry_serves_corpora_and_evicts_by_budget(flat_index, tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "_load_faiss_index", faiss.read_index)
+    size = _write_index(tmp_path / "a.index", 1)
+    _write_index(tmp_path / "b.index", 2, n=50)
+
+    registry = search.CorpusRegistry(max_bytes=size + size // 2)   # room for one index
+    for name in ("a", "b"):
+        registry.register(name, search.CorpusSpec(str(tmp_path / f"{name}.index"), "", ""))
+    monkeypatch.setattr(search, "registry", registry)
+
+    a = search.semantic_search("tents", top_k=5, corpus="a")
+    b = search.semantic_search("tents", top_k=5, corpus="b")
+    assert a != b and all(i < 50 for i in b[0])           # result cache is per corpus
+    resident = registry.stats()["resident"]
+    assert f"index:{tmp_path / 'b.index'}" in resident and f"index:{tmp_path / 'a.index'}" not in resident
+    assert registry.nbytes <= registry.max_bytes
+
+    loads = registry.loads
+    assert search.search_many_local(["tents"], top_k=5, corpus="a") == [a]   # result cached: no reload
+    assert registry.loads == loads
+    search.semantic_search("rescue", top_k=5, corpus="a")                      # reloaded after eviction
+    assert f"index:{tmp_path / 'a.index'}" in registry.stats()["resident"]
+
+    with pytest.raises(KeyError):
+        search.semantic_search("tents", corpus="missing")
+
+
+def test_registry_reloads_rewritten_file(tmp_path):
+    path = tmp_path / "a.index"
+    _write_index(path, 1)
+    registry = search.CorpusRegistry()
+    registry.register("a", search.CorpusSpec(str(path), "", ""))
+    first = registry.index("a")
+    assert registry.index("a") is first
+
+    _write_index(path, 2, n=30)
+    assert registry.index("a").ntotal == 30 and registry.loads == 2
+    assert registry.names() == [search.DEFAULT_CORPUS, "a"]
+
+
+def test_registry_lists_default_only_when_built(tmp_path, monkeypatch):
+    from quake_talk.aggregates import build_daily_aggregates
+    from quake_talk.keyword_index import KeywordIndex
+
+    monkeypatch.setattr(search, "INDEX_FILE", str(tmp_path / "missing.index"))
+    monkeypatch.setattr(search, "CLEANED_PARQUET", str(tmp_path / "missing.parquet"))
+    registry = search.CorpusRegistry()
+    assert registry.names() == [search.DEFAULT_CORPUS]      # nothing else configured
+
+    texts = pl.Series(["tents in hatay", "water"])
+    KeywordIndex.build(texts).save(str(tmp_path / "kw.npz"))
+    frame = pl.DataFrame({"date": ["2023-02-06", "2023-02-07"], "content_clean": texts})
+    build_daily_aggregates(frame).write_parquet(tmp_path / "agg.parquet")
+    registry.register("syria", search.CorpusSpec(
+        "", "", "", keyword_index=str(tmp_path / "kw.npz"), aggregates=str(tmp_path / "agg.parquet"),
+    ))
+    assert registry.names() == ["syria"]
+
+    assert registry.keyword_index("syria").lookup("hatay").tolist() == [0]
+    assert len(registry.aggregates("syria")) == 2
+    resident = registry.stats()["resident"]
+    assert f"keyword_index:{tmp_path / 'kw.npz'}" in resident and registry.nbytes > 0
+    assert registry.bm25("syria") is None
+
+
+def test_client_mode_embeds_on_server_and_falls_back(flat_index, monkeypatch):
+    expected = HashEncoder().encode(["where is aid", "tents"])
+
+    srv = server.make_server(port=0)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    monkeypatch.setattr(search, "SEARCH_SERVER_URL", f"http://127.0.0.1:{srv.server_port}")
+    monkeypatch.setattr(search, "_server_down_until", 0.0)
+    try:
+        np.testing.assert_array_equal(search.embed_questions(["where is aid", "tents"]), expected)
+        assert search._server_down_until == 0.0          # answered by the server, no fallback
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+    np.testing.assert_array_equal(search.embed_questions(["where is aid", "tents"]), expected)
+    assert search._server_down_until > 0
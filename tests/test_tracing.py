@@ -0,0 +1,73 @@
+# tests/test_tracing.py
+import socket
+import threading
+import contextvars
+import urllib.request
+
+import pytest
+
+from quake_talk import tracing
+
+
+@pytest.fixture
+def traced():
+    tracing.reset()
+    tracing.enable(True)
+    yield tracing
+    tracing.enable(False)
+    tracing.reset()
+
+
+def test_disabled_spans_are_shared_noops():
+    tracing.enable(False)
+    assert tracing.span("a") is tracing.span("b")
+    with tracing.trace() as t, tracing.span("a"):
+        tracing.record_usage("m", 10, 5)
+    assert t.spans == [] and t.tokens == {"prompt": 0, "completion": 0}
+    assert "a" not in tracing.snapshot()
+
+
+def test_spans_feed_trace_and_rolling_quantiles(traced):
+    for ms in range(1, 101):
+        traced.observe("search.faiss", ms / 1000)
+    with traced.trace() as t:
+        with traced.span("query"):
+            # pool threads see the trace through a copied context
+            worker = threading.Thread(target=contextvars.copy_context().run, args=(traced.observe, "search.bm25", 0.5))
+            worker.start()
+            worker.join()
+            traced.record_usage("gpt-4o", 120, 30)
+
+    assert [name for name, _ in t.spans] == ["search.bm25", "query"]
+    assert t.tokens == {"prompt": 120, "completion": 30}
+    faiss = traced.snapshot()["search.faiss"]
+    assert faiss["count"] == 100
+    assert faiss["p50"] == pytest.approx(0.0505)
+    assert faiss["p99"] == pytest.approx(0.09901)
+
+
+def test_prometheus_text_and_endpoint(traced, tmp_path):
+    traced.observe('odd"stage', 0.25)
+    traced.record_usage("gpt-4o", 7, 3)
+    text = traced.prometheus_text()
+    assert '# TYPE quake_talk_stage_seconds summary' in text
+    assert 'quake_talk_stage_seconds{stage="odd\\"stage",quantile="0.95"} 0.25' in text
+    assert 'quake_talk_stage_seconds_count{stage="odd\\"stage"} 1' in text
+    assert 'quake_talk_gpt_tokens_total{model="gpt-4o",kind="completion"} 3' in text
+
+    traced.dump_metrics(str(tmp_path / "metrics.prom"))
+    assert (tmp_path / "metrics.prom").read_text() == text
+
+    server = traced.serve_metrics.__wrapped__(port=_free_port())   # uncached: own server per test
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as resp:
+            assert resp.read().decode() == traced.prometheus_text()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]